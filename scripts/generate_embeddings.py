@@ -20,6 +20,8 @@ import psycopg2.extras
 import vertexai
 from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
 
+from src.core.ai_agent.db_data import try_invalidate_user_cache
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -98,6 +100,7 @@ def main():
 
         conn.commit()
         logger.info("완료! 모든 임베딩이 DB에 저장되었습니다.")
+        try_invalidate_user_cache()
 
     except Exception as e:
         conn.rollback()
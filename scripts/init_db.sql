@@ -42,6 +42,30 @@ CREATE TABLE IF NOT EXISTS campaigns (
     embedding vector(768)
 );
 
+-- 카탈로그 변경 버전 컬럼 (in-process 벡터 인덱스 증분 갱신용)
+ALTER TABLE contents  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE products  ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+CREATE OR REPLACE FUNCTION touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS contents_touch_updated_at ON contents;
+CREATE TRIGGER contents_touch_updated_at BEFORE UPDATE ON contents
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS products_touch_updated_at ON products;
+CREATE TRIGGER products_touch_updated_at BEFORE UPDATE ON products
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS campaigns_touch_updated_at ON campaigns;
+CREATE TRIGGER campaigns_touch_updated_at BEFORE UPDATE ON campaigns
+    FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
 -- 벡터 인덱스 (HNSW - 소규모 데이터셋에 적합, IVFFlat은 대량 데이터 필요)
 CREATE INDEX IF NOT EXISTS users_long_term_vector_idx
     ON users USING hnsw (long_term_vector vector_cosine_ops);
@@ -58,11 +82,66 @@ CREATE INDEX IF NOT EXISTS products_embedding_idx
 CREATE INDEX IF NOT EXISTS campaigns_embedding_idx
     ON campaigns USING hnsw (embedding vector_cosine_ops);
 
+-- 전문 검색 컬럼 (하이브리드 검색 / 임베딩 미생성 시 fallback)
+-- 'simple' 사전: 한국어/영어 혼합 텍스트를 형태소 분석 없이 소문자 토큰으로 색인
+ALTER TABLE campaigns ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple',
+        coalesce(campaign_data->>'product', '') || ' ' ||
+        coalesce(campaign_data->>'brand', '') || ' ' ||
+        coalesce(campaign_data->>'category', '') || ' ' ||
+        coalesce(campaign_data->>'description', '') || ' ' ||
+        coalesce(targeting_rules->>'tags', ''))
+) STORED;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple',
+        coalesce(product_data->>'name', '') || ' ' ||
+        coalesce(product_data->>'brand', '') || ' ' ||
+        coalesce(product_data->>'category', '') || ' ' ||
+        coalesce(product_data->>'description', ''))
+) STORED;
+ALTER TABLE contents ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple',
+        coalesce(metadata->>'text', '') || ' ' ||
+        coalesce(metadata->>'brand', '') || ' ' ||
+        coalesce(metadata->>'category', ''))
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_campaigns_search_tsv ON campaigns USING gin (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_products_search_tsv ON products USING gin (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_contents_search_tsv ON contents USING gin (search_tsv);
+
 -- 일반 인덱스
 CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
 CREATE INDEX IF NOT EXISTS idx_contents_type ON contents(content_type);
 CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand_id);
 CREATE INDEX IF NOT EXISTS idx_campaigns_brand ON campaigns(brand_id);
+CREATE INDEX IF NOT EXISTS idx_contents_updated_at ON contents(updated_at);
+CREATE INDEX IF NOT EXISTS idx_products_updated_at ON products(updated_at);
+CREATE INDEX IF NOT EXISTS idx_campaigns_updated_at ON campaigns(updated_at);
+
+-- 에이전트 체크포인트 (AGENT_CHECKPOINT=postgres, 재시도 시 완료된 단계부터 이어서 실행)
+CREATE TABLE IF NOT EXISTS agent_checkpoints (
+    generation_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_agent_checkpoints_updated_at ON agent_checkpoints(updated_at);
+
+-- 비동기 생성 작업 (JOB_STORE=postgres, POST /v1/ai/jobs)
+CREATE TABLE IF NOT EXISTS agent_jobs (
+    job_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    status TEXT NOT NULL,                 -- queued | running | succeeded | failed
+    request TEXT NOT NULL,                -- 생성 요청 JSON
+    webhook_url TEXT,
+    operation TEXT,                       -- 진행 중 Veo operation JSON (재시작 후 이어서 폴링)
+    result TEXT,                          -- 성공 응답 JSON
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_agent_jobs_status_updated ON agent_jobs(status, updated_at);
 
 -- 사용자 데이터 삽입
 INSERT INTO users (user_id, profile) VALUES
@@ -21,6 +21,8 @@ import psycopg2.extras
 import vertexai
 from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
 
+from src.core.ai_agent.db_data import try_invalidate_user_cache
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
@@ -442,6 +444,7 @@ def main():
         insert_contents(conn, contents, emb_contents)
         conn.commit()
         logger.info("✅ 모든 데모 데이터 삽입 완료!")
+        try_invalidate_user_cache()
     except Exception as e:
         conn.rollback()
         logger.error(f"오류: {e}", exc_info=True)
@@ -3,27 +3,60 @@ AI Agent FastAPI Application
 """
 import asyncio
 import base64
+import hashlib
 import json
 import os
 import uuid
-from typing import Any, Dict, Optional
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import logging
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+from src.core.cache import TieredCache
+from src.core.http_client import aclose_http_clients, http_request, http_stats
+from src.core.singleflight import SingleFlight, SingleFlightConflict
+from src.core.stages import StageOverloaded, ensure_capacity, get_stage, shutdown_stages, stage_stats
+
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 logger = logging.getLogger(__name__)
 
 
-def _try_parse_json(s: str, default: dict = None) -> dict:
+def _db_pool_stats() -> dict:
+    try:
+        from src.core.db import pool_stats
+        return pool_stats()
+    except Exception:
+        return {}
+
+
+def _cache_stats() -> dict:
+    try:
+        from src.core.cache import cache_stats
+        return cache_stats()
+    except Exception:
+        return {}
+
+
+def _llm_output_stats() -> dict:
+    try:
+        from src.core.ai_agent.schemas import output_stats
+        return output_stats()
+    except Exception:
+        return {}
+
+
+def _singleflight_stats() -> dict:
     try:
-        return json.loads(s)
+        from src.core.singleflight import singleflight_stats
+        return singleflight_stats()
     except Exception:
-        return default or {}
+        return {}
+
 
 # 환경 변수
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -34,6 +67,23 @@ USE_MOCK_GRAPH_DB = os.getenv("USE_MOCK_GRAPH_DB", "true").lower() == "true"
 MEDIA_OUTPUT_DIR = os.getenv("MEDIA_OUTPUT_DIR", "/tmp/ai_agent_media")
 os.makedirs(MEDIA_OUTPUT_DIR, exist_ok=True)
 
+# Idempotency-Key 결과 저장소: 같은 키의 재시도는 저장된 응답을 그대로 반환 (성공 응답만 저장)
+_idempotency_results = TieredCache(
+    "idempotency",
+    maxsize=int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600")),
+    serialize=lambda value: json.dumps(value, ensure_ascii=False).encode("utf-8"),
+    deserialize=lambda raw: json.loads(raw),
+)
+# 같은 키로 동시에 들어온 요청은 진행 중인 처리 결과를 함께 기다림
+_idempotency_flight = SingleFlight("idempotency_key")
+
+# 수락 제어로 429를 보낼 때 Retry-After (초)
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2"))
+
+# 비동기 생성 작업 실행기 (startup에서 생성)
+_jobs = None
+
 # FastAPI 앱
 app = FastAPI(
     title="AI Agent API",
@@ -71,6 +121,12 @@ class AIGenerateRequest(BaseModel):
     prompt: str
     media_type: Optional[str] = None   # "image" | "video" | "text" (없으면 MEDIA_TYPE 환경변수)
     options: Optional[Dict[str, Any]] = None
+    latency_budget_ms: Optional[int] = None   # 요청 지연 예산 (없으면 AGENT_LATENCY_BUDGET_SECONDS, 0이면 무제한)
+    generation_id: Optional[str] = None       # 재시도 시 이전 응답의 generation_id → 완료된 단계부터 이어서 실행
+
+
+class AIJobRequest(AIGenerateRequest):
+    webhook_url: Optional[str] = None   # 작업이 끝나면 작업 상태(GET /v1/ai/jobs/{id}와 같은 형태)를 POST
 
 
 # ──────────────────────────────────────────
@@ -97,6 +153,13 @@ async def health_check():
             "ai_provider": AI_PROVIDER,
             "media_provider": MEDIA_PROVIDER,
             "use_mock_graph_db": USE_MOCK_GRAPH_DB,
+            "db_pool": _db_pool_stats(),
+            "caches": _cache_stats(),
+            "singleflight": _singleflight_stats(),
+            "llm_outputs": _llm_output_stats(),
+            "stages": stage_stats(),
+            "http": http_stats(),
+            "jobs": _jobs.stats() if _jobs is not None else {},
         },
     )
 
@@ -120,100 +183,364 @@ async def get_feed(user_id: str, limit: int = 10, offset: int = 0):
 
 
 @app.post("/v1/ai/generate-feed")
-async def generate_ai_feed(request: AIGenerateRequest):
-    """AI 피드 생성 (온디맨드) - LangGraph 에이전트 실행"""
+async def generate_ai_feed(
+    request: AIGenerateRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """AI 피드 생성 (온디맨드) - LangGraph 에이전트 실행
+
+    Idempotency-Key 헤더가 있으면:
+        - 같은 키의 성공 응답이 저장돼 있으면 재실행 없이 반환 (Idempotent-Replayed: true)
+        - 같은 키로 동시에 온 요청은 진행 중인 처리 하나의 결과를 공유
+        - 같은 키를 다른 요청 본문에 쓰면 422
+        - 실패한 요청의 재시도는 키에서 파생한 generation_id로 체크포인트부터 이어서 실행
+    """
     logger.info(f"AI generate request - user_id: {request.user_id}, prompt: {request.prompt}")
 
+    if not idempotency_key:
+        return await _generate_feed(request, _generation_id(request), resume=request.generation_id is not None)
+
+    scope = hashlib.sha256(f"{request.user_id}:{idempotency_key}".encode("utf-8")).hexdigest()[:32]
+    fingerprint = _request_fingerprint(request)
+
+    stored = await _idempotency_results.aget(scope)
+    if stored is not None:
+        if stored["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key가 다른 요청 본문에 이미 사용되었습니다")
+        logger.info(f"Idempotent replay - user_id: {request.user_id}")
+        return JSONResponse(stored["response"], headers={"Idempotent-Replayed": "true"})
+
+    async def generate_once() -> dict:
+        response = await _generate_feed(request, request.generation_id or f"idem_{scope}")
+        await _idempotency_results.aset(scope, {"fingerprint": fingerprint, "response": response})
+        return response
+
+    # 키 단위로 합침: 같은 키 + 다른 본문이 동시에 오면 둘 다 실행하지 않고 뒤 요청을 422
+    try:
+        return await _idempotency_flight.run(scope, generate_once, token=fingerprint)
+    except SingleFlightConflict:
+        raise HTTPException(status_code=422, detail="Idempotency-Key가 다른 요청 본문에 이미 사용되었습니다")
+
+
+async def _generate_feed(
+    request: AIGenerateRequest, generation_id: str, admission: bool = True, resume: bool = True,
+) -> dict:
+    """피드 생성. resume=False면 generation_id가 새로 발급된 값 (체크포인트는 실패 시에만 기록)."""
     # media_type: 요청값 우선, 없으면 환경변수
     media_type = request.media_type or os.getenv("MEDIA_TYPE", "text")
+    # 입구 수락 제어 (작업 API는 이미 수락된 작업이므로 생략 → 미디어를 낮추지 않고 slot을 기다림)
+    admitted: List[str] = []
+    if admission:
+        media_type, admitted = _admit(media_type)
+    # 실패 응답에도 generation_id를 실어 클라이언트가 같은 값으로 재시도(이어서 실행)할 수 있게 함
+    retry_headers = {"X-Generation-Id": generation_id}
 
     try:
         from src.core.ai_agent.agent import get_agent
 
         agent = get_agent()
 
-        # 동기 에이전트를 스레드풀에서 실행 (이벤트 루프 블로킹 방지)
-        result = await asyncio.to_thread(agent.run, request.user_id, request.prompt, media_type)
+        # 에이전트 그래프를 이벤트 루프에서 직접 실행 (노드가 모두 async)
+        result = await agent.arun(
+            request.user_id, request.prompt, media_type, _latency_budget(request), generation_id, resume
+        )
 
         if result.get("error"):
-            raise HTTPException(status_code=500, detail=result["error"])
+            raise HTTPException(status_code=500, detail=result["error"], headers=retry_headers)
+
+        # 미디어 저장/다운로드는 블로킹 I/O → media 스테이지에서 실행
+        media_result = await get_stage("media").run(_build_media_result, result)
+        return _build_feed_response(request, result, media_result, admitted)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"AI generation failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"AI 생성 실패: {str(e)}", headers=retry_headers)
+
+
+@app.post("/v1/ai/jobs", status_code=202)
+async def create_ai_job(request: AIJobRequest):
+    """AI 피드 생성 작업 제출 - 생성을 기다리지 않고 job_id를 바로 반환
+
+    영상처럼 오래 걸리는 생성용. 결과는 GET /v1/ai/jobs/{job_id} 또는 webhook_url로 받는다.
+    작업은 저장소(JOB_STORE)에 영속화되어 프로세스가 재시작돼도 이어서 실행된다.
 
-        # JSON 필드 파싱
-        strategy = _try_parse_json(result.get("strategy", "{}"))
-        state_analysis = _try_parse_json(result.get("state_analysis", "{}"))
+    수락 제어는 제출 시점에 적용: llm / db 대기열 초과 또는 대기/실행 중 작업이 JOB_MAX_ACTIVE개면 429,
+    video / media 대기열 초과면 낮춘 media_type으로 작업을 저장 (응답의 degradations).
+    """
+    from src.core.ai_agent.jobs import JobQueueFull, WebhookRejected, check_webhook_url, public_view
 
-        # 선택된 광고 이미지 URL 추출
-        ad_candidates = result.get("ad_candidates", [])
-        selected_ad = next(
-            (ad for ad in ad_candidates if ad.get("ad_id") == strategy.get("selected_ad_id")),
-            ad_candidates[0] if ad_candidates else {},
+    if _jobs is None:
+        raise HTTPException(status_code=503, detail="작업 실행기가 초기화되지 않았습니다")
+    if request.webhook_url:
+        try:
+            await check_webhook_url(request.webhook_url)
+        except WebhookRejected as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    logger.info(f"AI job request - user_id: {request.user_id}, prompt: {request.prompt}")
+    media_type, admitted = _admit(request.media_type or os.getenv("MEDIA_TYPE", "text"))
+    body = {**request.dict(exclude={"webhook_url"}), "media_type": media_type}
+    try:
+        job = await _jobs.submit(request.user_id, body, request.webhook_url)
+    except JobQueueFull as e:
+        logger.warning(f"Job admission rejected: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail="대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도하세요.",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+
+    return {**public_view(job), "status_url": f"/v1/ai/jobs/{job['job_id']}", "degradations": admitted}
+
+
+@app.get("/v1/ai/jobs/{job_id}")
+async def get_ai_job(job_id: str):
+    """AI 피드 생성 작업 상태 조회 (succeeded면 result가 /v1/ai/generate-feed 응답과 같은 형태)"""
+    from src.core.ai_agent.jobs import public_view
+
+    job = await _jobs.get(job_id) if _jobs is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public_view(job)
+
+
+async def _execute_job(job: dict) -> dict:
+    """작업 하나 실행 (JobManager executor). 작업의 generation_id로 체크포인트부터 이어서 실행.
+
+    수락 제어는 제출 시점(create_ai_job)에 끝났으므로 다시 낮추지 않고 slot을 기다린다.
+    """
+    request = AIGenerateRequest(**job["request"])
+    return await _generate_feed(request, request.generation_id, admission=False)
+
+
+@app.post("/v1/ai/generate-feed/stream")
+async def generate_ai_feed_stream(request: AIGenerateRequest, http_request: Request):
+    """AI 피드 생성 스트리밍 - 노드가 끝날 때마다 이벤트 전송
+
+    기본은 SSE(text/event-stream), Accept: application/x-ndjson이면 NDJSON.
+    이벤트 순서:
+        state_analysis → candidates → selected_ad → content → media → done
+        (AGENT_PIPELINE=fused: candidates → state_analysis → selected_ad → content → media → done)
+    실패 시 error 이벤트 후 종료. done의 data는 /v1/ai/generate-feed 응답과 같은 형태.
+    """
+    logger.info(f"AI generate stream request - user_id: {request.user_id}, prompt: {request.prompt}")
+
+    media_type, admitted = _admit(request.media_type or os.getenv("MEDIA_TYPE", "text"))
+    ndjson = "application/x-ndjson" in http_request.headers.get("accept", "")
+    generation_id = _generation_id(request)
+
+    def encode(event: str, data: dict) -> str:
+        if ndjson:
+            return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    async def events():
+        try:
+            from src.core.ai_agent.agent import get_agent
+
+            agent = get_agent()
+            result: Dict[str, Any] = {}
+            # aclosing: error 이벤트로 끝내거나 클라이언트가 끊기면 그래프를 즉시 닫아
+            # 선행 시작된 미디어 태스크 취소 + 체크포인트 마무리 (GC 시점까지 미루지 않음)
+            async with aclosing(agent.astream(
+                request.user_id, request.prompt, media_type, _latency_budget(request), generation_id,
+                resume=request.generation_id is not None,
+            )) as stream:
+                async for node, state in stream:
+                    result = state
+                    if state.get("error"):
+                        yield encode("error", {"node": node, "detail": state["error"], "generation_id": generation_id})
+                        return
+
+                    if node == "media_generator":
+                        media_result = await get_stage("media").run(_build_media_result, state)
+                        yield encode("media", {"media": media_result})
+                        yield encode("done", _build_feed_response(request, result, media_result, admitted))
+                        return
+
+                    for formatter in _STREAM_EVENTS.get(node, ()):
+                        event, data = formatter(state)
+                        yield encode(event, data)
+
+        except Exception as e:
+            logger.error(f"AI generation stream failed: {e}", exc_info=True)
+            yield encode("error", {"detail": f"AI 생성 실패: {str(e)}", "generation_id": generation_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson" if ndjson else "text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Generation-Id": generation_id},
+    )
+
+
+# ──────────────────────────────────────────
+# 응답 구성 헬퍼
+# ──────────────────────────────────────────
+
+def _admit(media_type: str) -> Tuple[str, List[str]]:
+    """스테이지 대기열 기준 요청 수락 제어. (실제 media_type, 적용한 저하 태그) 반환.
+
+    - llm / db 대기열이 가득 차면 429 (Retry-After) — 모든 요청이 거치는 스테이지
+    - video 대기열이 가득 차면 이미지로, media 대기열이 가득 차면 텍스트만으로 낮춰 수락
+    """
+    try:
+        ensure_capacity("llm", "db")
+    except StageOverloaded as e:
+        logger.warning(f"Admission rejected: {e}")
+        raise HTTPException(
+            status_code=429,
+            detail=f"서버가 혼잡합니다 ({e.stage} 대기열 초과). 잠시 후 다시 시도하세요.",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)},
         )
-        ad_image_url = selected_ad.get("image_url", "")
-
-        # 미디어 결과 구성
-        # data_type="url"  → GCS public URL 직접 사용 (개발환경에서는 로컬에도 저장)
-        # data_type="base64" → 로컬 파일 저장 후 /v1/media/{filename} 반환 (fallback)
-        media_result = None
-        if result.get("media_data"):
-            media_metadata = result.get("media_metadata", {})
-            mime_type = media_metadata.get("mime_type", "image/webp")
-            data_type = media_metadata.get("data_type", "base64")
-
-            if data_type == "url":
-                media_url = result["media_data"]
-                # 개발/스테이징 환경에서는 GCS 파일을 로컬에도 저장
-                if ENVIRONMENT == "development":
-                    try:
-                        import httpx as _httpx
-                        ext = mime_type.split("/")[-1]
-                        filename = f"{uuid.uuid4().hex}.{ext}"
-                        filepath = os.path.join(MEDIA_OUTPUT_DIR, filename)
-                        resp = _httpx.get(media_url, timeout=60)
-                        resp.raise_for_status()
-                        with open(filepath, "wb") as f:
-                            f.write(resp.content)
-                        logger.info(f"Media saved locally: {filepath}")
-                    except Exception as e:
-                        logger.warning(f"Local save skipped: {e}")
-            else:
+
+    admitted: List[str] = []
+    for stage, from_type, to_type in (("video", "video", "image"), ("media", "image", "text")):
+        if media_type == from_type and get_stage(stage).overloaded():
+            get_stage(stage).reject()
+            media_type = to_type
+            admitted.append(f"admission:{from_type}_to_{to_type}")
+            logger.warning(f"Admission degraded: {stage} queue full → {to_type}")
+    return media_type, admitted
+
+
+def _request_fingerprint(request: AIGenerateRequest) -> str:
+    """Idempotency-Key 재사용 검증용 요청 본문 해시"""
+    body = json.dumps(request.dict(), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _generation_id(request: AIGenerateRequest) -> str:
+    """재시도면 요청의 generation_id, 아니면 새로 발급"""
+    return request.generation_id or uuid.uuid4().hex
+
+
+def _latency_budget(request: AIGenerateRequest) -> Optional[float]:
+    """latency_budget_ms → 초. 없으면 None (에이전트 기본 예산 사용)"""
+    if request.latency_budget_ms is None:
+        return None
+    return request.latency_budget_ms / 1000
+
+
+def _selected_ad(result: dict, strategy: dict) -> dict:
+    ad_candidates = result.get("ad_candidates", [])
+    return next(
+        (ad for ad in ad_candidates if ad.get("ad_id") == strategy.get("selected_ad_id")),
+        ad_candidates[0] if ad_candidates else {},
+    )
+
+
+def _build_media_result(result: dict) -> Optional[dict]:
+    """미디어 결과 구성
+
+    data_type="url"    → GCS public URL 직접 사용 (개발환경에서는 로컬에도 저장)
+    data_type="base64" → 로컬 파일 저장 후 /v1/media/{filename} 반환 (fallback)
+    """
+    if not result.get("media_data"):
+        return None
+
+    media_metadata = result.get("media_metadata", {})
+    mime_type = media_metadata.get("mime_type", "image/webp")
+    data_type = media_metadata.get("data_type", "base64")
+
+    if data_type == "url":
+        media_url = result["media_data"]
+        # 개발/스테이징 환경에서는 GCS 파일을 로컬에도 저장
+        if ENVIRONMENT == "development":
+            try:
                 ext = mime_type.split("/")[-1]
                 filename = f"{uuid.uuid4().hex}.{ext}"
                 filepath = os.path.join(MEDIA_OUTPUT_DIR, filename)
+                resp = http_request("GET", media_url, timeout=60)
+                resp.raise_for_status()
                 with open(filepath, "wb") as f:
-                    f.write(base64.b64decode(result["media_data"]))
-                media_url = f"/v1/media/{filename}"
-
-            media_result = {
-                "type": result.get("media_type", "image"),
-                "url": media_url,
-                "mime_type": mime_type,
-                "metadata": media_metadata,
-            }
-
-        return {
-            "user_id": request.user_id,
-            "prompt": request.prompt,
-            "result": {
-                "id": f"ai_feed_{request.user_id}",
-                "type": "ai_generated",
-                "content": result.get("generated_content", ""),
-                "media": media_result,
-                "metadata": {
-                    "llm_provider": result.get("provider_name", AI_PROVIDER),
-                    "media_provider": result.get("media_provider_name", MEDIA_PROVIDER),
-                    "state_analysis": state_analysis,
-                    "selected_ad": strategy.get("selected_product", ""),
-                    "ad_image_url": ad_image_url,
-                    "combination_method": strategy.get("combination_method", ""),
-                },
+                    f.write(resp.content)
+                logger.info(f"Media saved locally: {filepath}")
+            except Exception as e:
+                logger.warning(f"Local save skipped: {e}")
+    else:
+        ext = mime_type.split("/")[-1]
+        filename = f"{uuid.uuid4().hex}.{ext}"
+        filepath = os.path.join(MEDIA_OUTPUT_DIR, filename)
+        with open(filepath, "wb") as f:
+            f.write(base64.b64decode(result["media_data"]))
+        media_url = f"/v1/media/{filename}"
+
+    return {
+        "type": result.get("media_type", "image"),
+        "url": media_url,
+        "mime_type": mime_type,
+        "metadata": media_metadata,
+    }
+
+
+def _build_feed_response(
+    request: AIGenerateRequest, result: dict, media_result: Optional[dict], admitted: Sequence[str] = (),
+) -> dict:
+    # 노드 출력은 에이전트가 검증한 dict (schemas.py)
+    strategy = result.get("strategy") or {}
+    state_analysis = result.get("state_analysis") or {}
+
+    return {
+        "user_id": request.user_id,
+        "prompt": request.prompt,
+        "generation_id": result.get("generation_id"),
+        "result": {
+            "id": f"ai_feed_{request.user_id}",
+            "type": "ai_generated",
+            "content": result.get("generated_content", ""),
+            "media": media_result,
+            "metadata": {
+                "llm_provider": result.get("provider_name", AI_PROVIDER),
+                "media_provider": result.get("media_provider_name", MEDIA_PROVIDER),
+                "state_analysis": state_analysis,
+                "selected_ad": strategy.get("selected_product", ""),
+                "ad_image_url": _selected_ad(result, strategy).get("image_url", ""),
+                "combination_method": strategy.get("combination_method", ""),
+                "degradations": [*admitted, *(result.get("degradations") or [])],
             },
-        }
+        },
+    }
+
+
+def _stream_state_analysis(state: dict) -> tuple:
+    return "state_analysis", {"state_analysis": state.get("state_analysis") or {}}
+
+
+def _stream_candidates(state: dict) -> tuple:
+    return "candidates", {
+        "ads": [
+            {"ad_id": ad.get("ad_id"), "brand": ad.get("brand"), "product": ad.get("product")}
+            for ad in state.get("ad_candidates", [])
+        ],
+        "products": len(state.get("product_candidates", [])),
+        "contents": len(state.get("reference_contents", [])),
+    }
+
+
+def _stream_selected_ad(state: dict) -> tuple:
+    strategy = state.get("strategy") or {}
+    return "selected_ad", {
+        "selected_ad": strategy.get("selected_product", ""),
+        "brand": strategy.get("selected_brand", ""),
+        "ad_image_url": _selected_ad(state, strategy).get("image_url", ""),
+        "combination_method": strategy.get("combination_method", ""),
+    }
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"AI generation failed: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"AI 생성 실패: {str(e)}")
+
+def _stream_content(state: dict) -> tuple:
+    return "content", {"content": state.get("generated_content", "")}
+
+
+# 노드 이름 → (이벤트 이름, data) 변환 목록 (load_context는 이벤트 없음)
+_STREAM_EVENTS = {
+    "state_interpreter": (_stream_state_analysis,),
+    "retrieve_candidates": (_stream_candidates,),
+    "strategy_planner": (_stream_selected_ad,),
+    "creative_generator": (_stream_content,),
+    "fused_planner": (_stream_state_analysis, _stream_selected_ad, _stream_content),
+}
 
 
 @app.get("/v1/media/{filename}")
@@ -228,9 +555,9 @@ async def download_media(filename: str):
 @app.get("/v1/user/{user_id}")
 async def get_user(user_id: str):
     """사용자 정보 조회"""
-    from src.core.ai_agent.db_data import get_user as _get_user
+    from src.core.ai_agent.db_data import aget_user
 
-    user = _get_user(user_id)
+    user = await aget_user(user_id)
     return {
         "user_id": user_id,
         "profile": {
@@ -256,15 +583,43 @@ async def startup_event():
     # 에이전트 사전 초기화 (첫 요청 지연 방지)
     try:
         from src.core.ai_agent.agent import get_agent
-        get_agent()
+        agent = get_agent()
         logger.info("FeedAgent initialized successfully")
+        # LLM 예열은 백그라운드로 (로컬 CPU 모델 로드는 수십 초 걸릴 수 있음 → 기동을 막지 않음)
+        asyncio.ensure_future(agent.awarm_up())
     except Exception as e:
         logger.warning(f"FeedAgent initialization warning: {e}")
 
+    # 비동기 생성 작업: 실행기 생성 + 죽은 작업 복구 루프 시작
+    global _jobs
+    try:
+        from src.core.ai_agent.jobs import JobManager, get_job_store
+        _jobs = JobManager(get_job_store(), _execute_job)
+        _jobs.start_recovery()
+    except Exception as e:
+        logger.warning(f"Job manager initialization warning: {e}")
+
+    # in-process 벡터 인덱스 워밍 (VECTOR_INDEX_ENABLED=true일 때만 갱신 스레드 시작)
+    try:
+        from src.core.ai_agent.vector_index import get_vector_index
+        get_vector_index()
+    except Exception as e:
+        logger.warning(f"Vector index warm-up warning: {e}")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down AI Agent API")
+    # 실행 중 작업은 중단만 하고 상태는 유지 → heartbeat가 끊겨 다음 프로세스가 이어서 실행
+    if _jobs is not None:
+        await _jobs.stop()
+    try:
+        from src.core.db import close_pool
+        close_pool()
+    except Exception as e:
+        logger.warning(f"DB pool shutdown warning: {e}")
+    shutdown_stages()
+    await aclose_http_clients()
 
 
 if __name__ == "__main__":
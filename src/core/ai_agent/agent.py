@@ -3,8 +3,8 @@ LangGraph 기반 피드 생성 에이전트
 
 Pipeline (6단계):
     1. load_context        → 사용자 컨텍스트 로드 (DB)
-    2. state_interpreter   → 사용자 의도/감정 분석 (LLM)
-    3. retrieve_candidates → 광고/상품/콘텐츠 후보 검색 (pgvector)
+    2. state_interpreter   → 사용자 의도/감정 분석 (LLM)         ┐ 서로 독립 → 동시 실행
+    3. retrieve_candidates → 광고/상품/콘텐츠 후보 검색 (pgvector) ┘ (pipeline.plan_stages)
     4. strategy_planner    → 결합 전략 수립 (LLM)
     5. creative_generator  → 텍스트 콘텐츠 + 이미지 프롬프트 생성 (LLM)
     6. media_generator     → 이미지/영상 생성 (Imagen / LCM-LoRA / Replicate)
@@ -15,32 +15,89 @@ Pipeline (6단계):
     IMAGE_MODEL=lcm-lora-sdxl | lcm-lora-sd15 | sdxl | sd15 | flux-schnell
     VIDEO_MODEL=animatediff-lcm | animate-diff | svd
     MEDIA_TYPE=image | video | text
+    AGENT_PARALLEL_NODES=true     독립 노드 병렬 실행 (false면 직렬 체인)
+    AGENT_EARLY_MEDIA=true        creative_generator 스트리밍 중 image_prompt가 완성되면 미디어 생성 시작
+    AGENT_PIPELINE=standard | fused
+    LLM_CACHE_NODES=state_interpreter,strategy_planner   응답 캐시 opt-in 노드 (providers/cached.py)
+    AGENT_LATENCY_BUDGET_SECONDS=0   요청 기본 지연 예산 (budget.py, 0이면 무제한)
+    AGENT_CHECKPOINT=sqlite | postgres | none   재시도용 체크포인트 저장소 (checkpoint.py)
+    AGENT_COALESCE=true           같은 (user_id, prompt, media_type) 동시 실행을 하나로 합침
+
+파이프라인 프로파일 (AGENT_PIPELINE):
+    standard  위 6단계. LLM 3회 직렬 호출 (state_interpreter → strategy_planner → creative_generator)
+    fused     load_context → retrieve_candidates → fused_planner → media_generator
+              상태 분석 + 전략 + 크리에이티브를 구조화된 LLM 1회 호출로 생성 (지연 민감 트래픽용).
+              같은 FeedAgentState 필드를 채우고, 섹션별 파싱 실패 시 개별 노드와 같은 기본값 사용.
+
+실행:
+    모든 노드는 async 함수이며 graph.ainvoke로 실행 (FeedAgent.arun).
+    LLM은 ModelProvider.agenerate, 미디어는 MediaProvider.agenerate_*, DB는 db_data.a* 사용.
+    FeedAgent.run은 asyncio.run(arun(...))을 감싼 동기 래퍼.
+    FeedAgent.astream은 노드 완료마다 중간 state를 yield (스트리밍 API용).
+
+미디어 선행 시작 (AGENT_EARLY_MEDIA):
+    creative_generator는 LLM 응답을 스트리밍으로 받으며 JsonObjectStream으로 증분 파싱.
+    image_prompt / negative_prompt가 완성되는 즉시 미디어 생성 태스크를 띄워 state["media_task"]로
+    넘기고, text_content 디코딩과 이미지/영상 생성을 겹친다. media_generator는 태스크를 await만 한다.
+
+체크포인트 (checkpoint.py):
+    같은 generation_id로 재시도하면 완료된 스테이지는 건너뛰고 저장된 결과를 재사용한다.
+    resume=True (클라이언트가 준 generation_id / 작업): 체크포인트를 조회하고, 스테이지가
+        깨끗하게(새 error/degradation 없이) 끝날 때마다 저장.
+    resume=False (서버가 방금 발급한 generation_id): 조회/스테이지별 저장 없이, 실행이 깨끗하게
+        끝나지 않았을 때만 마지막에 한 번 저장 → 정상 경로는 저장소를 건드리지 않음.
+
+구조화 출력 (schemas.py):
+    LLM 노드마다 출력 모델(StateAnalysis / Strategy / Creative / FusedPlan)의 JSON 스키마를 프로바이더에
+    넘겨 디코딩을 제한하고, 응답은 모델로 검증한다. state["state_analysis"] / state["strategy"]는 검증된
+    dict. 검증 실패는 노드별로 집계(/health의 llm_outputs)하고 기존과 같은 기본값을 쓴다.
+
+지연 예산 (budget.py):
+    state["deadline"]까지 남은 시간으로 각 노드가 LLM 생략(JSON 기본값), 영상→이미지, 빠른 이미지,
+    텍스트만 순으로 품질을 낮추고 state["degradations"]에 기록한다.
 """
+import asyncio
 import json
 import logging
 import os
 import re
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
 
 from langgraph.graph import StateGraph, END
 
-from .providers import get_provider, ModelProvider
+from .providers import get_provider, with_response_cache, ModelProvider, StagedProvider
+from .providers.base import EARLY_STOP
 from .media_providers import get_media_provider, MediaProvider
 from .state import FeedAgentState
-from .db_data import get_user, retrieve_ad_candidates, retrieve_products, retrieve_reference_contents
+from .pipeline import GraphNode, NodeSpec, make_parallel_node, plan_stages, stage_name
+from .db_data import aget_user, aretrieve_all_candidates
+from .json_stream import JsonObjectStream
+from .schemas import (
+    Creative, FusedPlan, StateAnalysis, Strategy, coerce, parse_output, prompt_skeleton, response_schema,
+)
+from . import budget
+from .checkpoint import CheckpointStore, get_checkpoint_store, make_payload, matches
+from src.core.singleflight import SingleFlight
+from src.core.stages import get_stage
 
 logger = logging.getLogger(__name__)
 
 MEDIA_TYPE = os.getenv("MEDIA_TYPE", "image")  # image | video | text
+EARLY_MEDIA = os.getenv("AGENT_EARLY_MEDIA", "true").lower() == "true"
+PIPELINE = os.getenv("AGENT_PIPELINE", "standard").lower()  # standard | fused
+COALESCE = os.getenv("AGENT_COALESCE", "true").lower() == "true"
+
+# (state, image_prompt, negative_prompt) → 미디어 생성 태스크 (시작하지 않으면 None)
+MediaStarter = Callable[[dict, str, str], Optional["asyncio.Task"]]
 
 
 # ══════════════════════════════════════════════
 # 노드 1: 사용자 컨텍스트 로드
 # ══════════════════════════════════════════════
 
-def _load_context_node(state: FeedAgentState) -> FeedAgentState:
+async def _load_context_node(state: FeedAgentState) -> FeedAgentState:
     user_id = state["user_id"]
-    user_data = get_user(user_id)
+    user_data = await aget_user(user_id)
 
     # long_term_vector를 user_context에서 분리해 state에 별도 저장
     # (retrieve_candidates에서 임베딩 재생성 없이 재사용)
@@ -49,7 +106,7 @@ def _load_context_node(state: FeedAgentState) -> FeedAgentState:
     logger.info(
         f"[1/6 load_context] user={user_id}, "
         f"interests={user_data.get('interests')}, "
-        f"vector={'있음' if user_vector else '없음'}"
+        f"vector={'있음' if user_vector is not None else '없음'}"
     )
     state["user_context"] = user_data
     state["user_vector"] = user_vector
@@ -61,39 +118,34 @@ def _load_context_node(state: FeedAgentState) -> FeedAgentState:
 # ══════════════════════════════════════════════
 
 def _make_state_interpreter_node(provider: ModelProvider):
-    def node(state: FeedAgentState) -> FeedAgentState:
+    async def node(state: FeedAgentState) -> FeedAgentState:
         user = state["user_context"]
         prompt = state["prompt"]
 
-        system = "당신은 SNS 사용자의 상태를 분석하는 전문가입니다. 간결하고 정확하게 JSON으로만 응답하세요."
+        system = _STATE_INTERPRETER_SYSTEM
 
-        llm_prompt = f"""사용자 정보:
-- 관심사: {', '.join(user.get('interests', []))}
-- 최근 활동: {', '.join(user.get('recent_activities', []))}
-- 성향 요약: {user.get('vector_summary', '')}
-
-사용자 요청: "{prompt}"
+        llm_prompt = f"""{_user_context_text(user, prompt)}
 
 다음 JSON 형식으로만 응답하세요:
-{{
-  "intent": "사용자의 핵심 의도 (한 문장)",
-  "mood": "현재 감정 상태 (예: 설레는, 편안한, 호기심 있는)",
-  "needs": "현재 필요한 것 (한 문장)",
-  "recommendation_direction": "어떤 방향의 콘텐츠가 어울리는지 (한 문장)"
-}}"""
+{_STATE_ANALYSIS_SCHEMA}"""
+
+        fallback = _fallback_state_analysis(user, prompt).model_dump()
+        if budget.is_short(state.get("deadline"), budget.MIN_LLM_SECONDS):
+            state["state_analysis"] = fallback
+            budget.degrade(state, "state_interpreter:fallback")
+            return state
 
         logger.info(f"[2/6 state_interpreter] calling {provider.name}")
         try:
-            result = _strip_md_json(provider.generate(llm_prompt, system=system))
-            json.loads(result)  # 유효성 검증
-            state["state_analysis"] = result
-        except json.JSONDecodeError:
-            state["state_analysis"] = json.dumps({
-                "intent": prompt,
-                "mood": "중립적",
-                "needs": "맞춤형 콘텐츠",
-                "recommendation_direction": f"{user.get('interests', ['lifestyle'])[0]} 관련 콘텐츠",
-            }, ensure_ascii=False)
+            result = await budget.within(
+                state.get("deadline"),
+                provider.agenerate_json(llm_prompt, system=system, schema=response_schema(StateAnalysis)),
+            )
+            analysis = parse_output("state_interpreter", StateAnalysis, result)
+            state["state_analysis"] = analysis.model_dump() if analysis is not None else fallback
+        except asyncio.TimeoutError:
+            state["state_analysis"] = fallback
+            budget.degrade(state, "state_interpreter:fallback")
         except Exception as e:
             logger.error(f"[state_interpreter] error: {e}")
             state["error"] = f"state_interpreter 실패: {e}"
@@ -106,16 +158,21 @@ def _make_state_interpreter_node(provider: ModelProvider):
 # 노드 3: 광고 후보 검색 (Mock/Vector DB)
 # ══════════════════════════════════════════════
 
-def _retrieve_candidates_node(state: FeedAgentState) -> FeedAgentState:
+async def _retrieve_candidates_node(state: FeedAgentState) -> FeedAgentState:
     user = state["user_context"]
     interests = user.get("interests", ["lifestyle"])
     prompt = state["prompt"]
     user_vector = state.get("user_vector")  # load_context에서 받은 long_term_vector
 
-    # user_vector 재사용으로 임베딩 API 호출 최소화
-    candidates = retrieve_ad_candidates(interests, prompt, top_k=3, user_vector=user_vector)
-    products = retrieve_products(interests, prompt, top_k=3, user_vector=user_vector)
-    contents = retrieve_reference_contents(interests, prompt, top_k=2, user_vector=user_vector)
+    # user_vector 재사용으로 임베딩 API 호출 최소화, 세 후보군을 1 round trip으로 조회
+    retrieved = await aretrieve_all_candidates(
+        interests, prompt,
+        ad_top_k=3, product_top_k=3, content_top_k=2,
+        user_vector=user_vector,
+    )
+    candidates = retrieved["ads"]
+    products = retrieved["products"]
+    contents = retrieved["contents"]
 
     logger.info(
         f"[3/6 retrieve_candidates] ads={len(candidates)}, "
@@ -133,47 +190,35 @@ def _retrieve_candidates_node(state: FeedAgentState) -> FeedAgentState:
 # ══════════════════════════════════════════════
 
 def _make_strategy_planner_node(provider: ModelProvider):
-    def node(state: FeedAgentState) -> FeedAgentState:
-        candidates_text = "\n".join([
-            f"- [{ad['ad_id']}] {ad['brand']} {ad['product']}: {ad['description']} (관련도: {ad['relevance_score']})"
-            for ad in state["ad_candidates"]
-        ])
-
-        system = "당신은 SNS 광고 전략 전문가입니다. JSON으로만 응답하세요."
+    async def node(state: FeedAgentState) -> FeedAgentState:
+        system = _STRATEGY_PLANNER_SYSTEM
         llm_prompt = f"""사용자 상태 분석:
-{state['state_analysis']}
+{_json_text(state['state_analysis'])}
 
 광고 후보:
-{candidates_text}
+{_candidates_text(state["ad_candidates"])}
 
 가장 적합한 광고를 선택하고 전략을 수립하세요.
 다음 JSON 형식으로만 응답하세요:
-{{
-  "selected_ad_id": "선택한 광고 ID",
-  "selected_product": "상품명",
-  "selected_brand": "브랜드명",
-  "combination_method": "story_blend | inline | subtle 중 선택",
-  "rationale": "이 광고를 선택한 이유 (한 문장)",
-  "key_message": "핵심 메시지 (한 문장)",
-  "visual_direction": "이미지/영상의 시각적 방향 (한 문장, 영어로)"
-}}"""
+{_STRATEGY_SCHEMA}"""
+
+        fallback = _fallback_strategy(state["ad_candidates"]).model_dump()
+        if budget.is_short(state.get("deadline"), budget.MIN_LLM_SECONDS):
+            state["strategy"] = fallback
+            budget.degrade(state, "strategy_planner:fallback")
+            return state
 
         logger.info(f"[4/6 strategy_planner] calling {provider.name}")
         try:
-            result = _strip_md_json(provider.generate(llm_prompt, system=system))
-            json.loads(result)
-            state["strategy"] = result
-        except json.JSONDecodeError:
-            first = state["ad_candidates"][0] if state["ad_candidates"] else {}
-            state["strategy"] = json.dumps({
-                "selected_ad_id": first.get("ad_id", "ad_001"),
-                "selected_product": first.get("product", "추천 상품"),
-                "selected_brand": first.get("brand", "브랜드"),
-                "combination_method": "subtle",
-                "rationale": "사용자 관심사와 가장 부합",
-                "key_message": "자연스러운 라이프스타일과 함께",
-                "visual_direction": "lifestyle photography, natural lighting",
-            }, ensure_ascii=False)
+            result = await budget.within(
+                state.get("deadline"),
+                provider.agenerate_json(llm_prompt, system=system, schema=response_schema(Strategy)),
+            )
+            strategy = parse_output("strategy_planner", Strategy, result)
+            state["strategy"] = strategy.model_dump() if strategy is not None else fallback
+        except asyncio.TimeoutError:
+            state["strategy"] = fallback
+            budget.degrade(state, "strategy_planner:fallback")
         except Exception as e:
             logger.error(f"[strategy_planner] error: {e}")
             state["error"] = f"strategy_planner 실패: {e}"
@@ -188,80 +233,52 @@ def _make_strategy_planner_node(provider: ModelProvider):
 #   - 이미지/영상 생성용 프롬프트 (영어)
 # ══════════════════════════════════════════════
 
-def _make_creative_generator_node(provider: ModelProvider):
-    def node(state: FeedAgentState) -> FeedAgentState:
-        strategy = _parse_json(state.get("strategy", "{}"))
-        candidates = state["ad_candidates"]
+def _make_creative_generator_node(provider: ModelProvider, start_media: Optional[MediaStarter] = None):
+    async def node(state: FeedAgentState) -> FeedAgentState:
+        strategy = coerce(Strategy, state.get("strategy")) or _fallback_strategy(state["ad_candidates"])
         media_type = state.get("media_type", MEDIA_TYPE)
+        selected_ad = _select_ad(state["ad_candidates"], strategy)
 
-        selected_ad = next(
-            (ad for ad in candidates if ad["ad_id"] == strategy.get("selected_ad_id")),
-            candidates[0] if candidates else {},
-        )
-
-        # 관련 상품 컨텍스트 (최대 2개)
-        product_context = ""
-        product_candidates = state.get("product_candidates", [])
-        if product_candidates:
-            lines = [
-                f"- {p['brand']} {p['name']} ({p['category']}, {p['price']}원): {p['description']}"
-                for p in product_candidates[:2]
-            ]
-            product_context = "\n관련 상품 참고 (이미지 분위기 및 텍스트에 자연스럽게 반영):\n" + "\n".join(lines)
-
-        # 참고 콘텐츠 컨텍스트 (최대 2개)
-        content_context = ""
-        reference_contents = state.get("reference_contents", [])
-        if reference_contents:
-            lines = [
-                f"- [{c['content_type']}] {c['text'][:80]}"
-                for c in reference_contents if c.get("text")
-            ]
-            if lines:
-                content_context = "\n참고 콘텐츠 스타일 (톤앤매너 참고용):\n" + "\n".join(lines)
-
-        system = "당신은 SNS 콘텐츠 크리에이터이자 AI 이미지 프롬프트 전문가입니다. JSON으로만 응답하세요."
-        llm_prompt = f"""사용자 상태: {state['state_analysis']}
+        system = _CREATIVE_GENERATOR_SYSTEM
+        llm_prompt = f"""사용자 상태: {_json_text(state['state_analysis'])}
 
 결합 전략:
-- 방식: {strategy.get('combination_method', 'subtle')}
-- 핵심 메시지: {strategy.get('key_message', '')}
-- 시각 방향: {strategy.get('visual_direction', 'lifestyle photography')}
+- 방식: {strategy.combination_method}
+- 핵심 메시지: {strategy.key_message}
+- 시각 방향: {strategy.visual_direction}
 
 선택된 광고 상품:
 - {selected_ad.get('brand', '')} {selected_ad.get('product', '')}
 - 설명: {selected_ad.get('description', '')}
-{product_context}{content_context}
+{_reference_context(state)}
 
 생성할 미디어 타입: {media_type}
 
-다음 JSON 형식으로만 응답하세요:
-{{
-  "text_content": "SNS 텍스트 게시물 (100~200자, 해시태그 2~3개 포함, 광고가 자연스럽게 녹아들도록)",
-  "image_prompt": "Stable Diffusion / Imagen 최적화 영어 프롬프트 (상품/브랜드 분위기 묘사, 50~80단어, 사진 스타일 포함)",
-  "negative_prompt": "bad quality, blurry, watermark, text overlay, low resolution, deformed"
-}}"""
+다음 JSON 형식으로만 응답하세요 (필드 순서 유지):
+{_CREATIVE_SCHEMA}"""
+
+        stream = _EarlyMediaStream(provider, start_media, "5/6 creative_generator")
+        if budget.is_short(state.get("deadline"), budget.MIN_LLM_SECONDS):
+            _apply_fallback_creative(state, stream, selected_ad, strategy)
+            budget.degrade(state, "creative_generator:fallback")
+            return state
 
         logger.info(f"[5/6 creative_generator] calling {provider.name}")
         try:
-            result = _strip_md_json(provider.generate(llm_prompt, system=system))
-            parsed = json.loads(result)
-
-            state["generated_content"] = parsed.get("text_content", "")
-            state["image_prompt"] = parsed.get("image_prompt", "")
-            state["negative_prompt"] = parsed.get(
-                "negative_prompt",
-                "bad quality, blurry, watermark, text overlay"
+            await budget.within(
+                state.get("deadline"), stream.run(state, llm_prompt, system, response_schema(Creative)),
             )
-        except json.JSONDecodeError:
-            # LLM이 JSON을 못 만든 경우 raw text를 text_content로
-            state["generated_content"] = result.strip() if 'result' in locals() else ""
-            state["image_prompt"] = (
-                f"{selected_ad.get('brand', '')} {selected_ad.get('product', '')}, "
-                f"lifestyle photography, natural lighting, Instagram style, "
-                f"{strategy.get('visual_direction', '')}"
-            )
-            state["negative_prompt"] = "bad quality, blurry, watermark"
+            creative = parse_output("creative_generator", Creative, stream.json_text)
+            if creative is not None:
+                _apply_creative(state, creative)
+            else:
+                # LLM이 형식에 맞는 JSON을 못 만든 경우 raw text를 text_content로
+                state["generated_content"] = stream.text.strip()
+                state["image_prompt"] = _fallback_image_prompt(selected_ad, strategy)
+                state["negative_prompt"] = "bad quality, blurry, watermark"
+        except asyncio.TimeoutError:
+            _apply_fallback_creative(state, stream, selected_ad, strategy)
+            budget.degrade(state, "creative_generator:fallback")
         except Exception as e:
             logger.error(f"[creative_generator] error: {e}")
             state["error"] = f"creative_generator 실패: {e}"
@@ -269,22 +286,405 @@ def _make_creative_generator_node(provider: ModelProvider):
             state["image_prompt"] = "lifestyle photography, natural lighting"
             state["negative_prompt"] = "bad quality, blurry"
 
+        stream.attach(state)
+
         logger.info(f"[5/6 creative_generator] text={state['generated_content'][:60]}...")
         logger.info(f"[5/6 creative_generator] image_prompt={state['image_prompt'][:60]}...")
         return state
     return node
 
 
+# ══════════════════════════════════════════════
+# 노드 2+4+5 통합: fused_planner (AGENT_PIPELINE=fused)
+#   상태 분석 + 결합 전략 + 크리에이티브를 LLM 1회 호출로 생성
+# ══════════════════════════════════════════════
+
+def _make_fused_planner_node(provider: ModelProvider, start_media: Optional[MediaStarter] = None):
+    async def node(state: FeedAgentState) -> FeedAgentState:
+        user = state["user_context"]
+        prompt = state["prompt"]
+        candidates = state["ad_candidates"]
+        media_type = state.get("media_type", MEDIA_TYPE)
+
+        system = _FUSED_PLANNER_SYSTEM
+        llm_prompt = f"""{_user_context_text(user, prompt)}
+
+광고 후보:
+{_candidates_text(candidates)}
+{_reference_context(state)}
+
+생성할 미디어 타입: {media_type}
+
+1) 사용자 상태를 분석하고 2) 가장 적합한 광고를 골라 결합 전략을 세운 뒤
+3) 그 전략에 맞는 이미지 프롬프트와 SNS 게시물을 작성하세요.
+다음 JSON 형식으로만 응답하세요 (필드 순서 유지):
+{_FUSED_PLAN_SCHEMA}"""
+
+        stream = _EarlyMediaStream(provider, start_media, "fused_planner")
+        plan = None
+        timed_out = budget.is_short(state.get("deadline"), budget.MIN_LLM_SECONDS)
+        if not timed_out:
+            logger.info(f"[fused_planner] calling {provider.name}")
+        try:
+            if not timed_out:
+                await budget.within(
+                    state.get("deadline"), stream.run(state, llm_prompt, system, response_schema(FusedPlan)),
+                )
+                plan = parse_output("fused_planner", FusedPlan, stream.json_text)
+        except asyncio.TimeoutError:
+            timed_out = True
+        except Exception as e:
+            logger.error(f"[fused_planner] error: {e}")
+            state["error"] = f"fused_planner 실패: {e}"
+
+        if plan is not None:
+            analysis, strategy = plan.state_analysis, plan.strategy
+        else:
+            # 부분 응답도 살릴 수 있도록 스트리밍 중 완성된 섹션별로 검증 → 없으면 개별 노드와 같은 기본값
+            analysis = coerce(StateAnalysis, stream.fields.get("state_analysis")) or _fallback_state_analysis(user, prompt)
+            strategy = coerce(Strategy, stream.fields.get("strategy")) or _fallback_strategy(candidates)
+        state["state_analysis"] = analysis.model_dump()
+        state["strategy"] = strategy.model_dump()
+
+        if plan is not None:
+            _apply_creative(state, plan)
+        elif timed_out:
+            _apply_fallback_creative(state, stream, _select_ad(candidates, strategy), strategy)
+            budget.degrade(state, "fused_planner:fallback")
+        elif state.get("error"):
+            state["generated_content"] = ""
+            state["image_prompt"] = "lifestyle photography, natural lighting"
+            state["negative_prompt"] = "bad quality, blurry"
+        else:
+            state["generated_content"] = stream.text.strip()
+            state["image_prompt"] = _fallback_image_prompt(_select_ad(candidates, strategy), strategy)
+            state["negative_prompt"] = "bad quality, blurry, watermark"
+
+        stream.attach(state)
+
+        logger.info(
+            f"[fused_planner] ad={strategy.selected_ad_id}, "
+            f"text={state['generated_content'][:60]}..."
+        )
+        return state
+    return node
+
+
+# ──────────────────────────────────────────
+# LLM 노드 공통 (프롬프트 조각 / 기본값 / 스트리밍)
+# ──────────────────────────────────────────
+
+# 노드별 system 프롬프트 (고정 문자열 → 로컬 LLM 기동 시 KV 캐시 예열 대상)
+_STATE_INTERPRETER_SYSTEM = "당신은 SNS 사용자의 상태를 분석하는 전문가입니다. 간결하고 정확하게 JSON으로만 응답하세요."
+_STRATEGY_PLANNER_SYSTEM = "당신은 SNS 광고 전략 전문가입니다. JSON으로만 응답하세요."
+_CREATIVE_GENERATOR_SYSTEM = "당신은 SNS 콘텐츠 크리에이터이자 AI 이미지 프롬프트 전문가입니다. JSON으로만 응답하세요."
+_FUSED_PLANNER_SYSTEM = (
+    "당신은 SNS 사용자 분석가, 광고 전략가, 콘텐츠 크리에이터 역할을 한 번에 수행합니다. "
+    "JSON으로만 응답하세요."
+)
+
+# 프롬프트의 JSON 형식 안내 (프로바이더에 넘기는 응답 스키마와 같은 모델에서 생성)
+_STATE_ANALYSIS_SCHEMA = prompt_skeleton(StateAnalysis)
+_STRATEGY_SCHEMA = prompt_skeleton(Strategy)
+_CREATIVE_SCHEMA = prompt_skeleton(Creative)
+_FUSED_PLAN_SCHEMA = prompt_skeleton(FusedPlan)
+
+
+def _json_text(value: dict) -> str:
+    """state의 검증된 노드 출력을 다음 노드 프롬프트에 넣을 JSON 텍스트로"""
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _user_context_text(user: dict, prompt: str) -> str:
+    return f"""사용자 정보:
+- 관심사: {', '.join(user.get('interests', []))}
+- 최근 활동: {', '.join(user.get('recent_activities', []))}
+- 성향 요약: {user.get('vector_summary', '')}
+
+사용자 요청: "{prompt}\""""
+
+
+def _candidates_text(candidates: List[dict]) -> str:
+    return "\n".join([
+        f"- [{ad['ad_id']}] {ad['brand']} {ad['product']}: {ad['description']} (관련도: {ad['relevance_score']})"
+        for ad in candidates
+    ])
+
+
+def _reference_context(state: FeedAgentState) -> str:
+    """관련 상품 / 참고 콘텐츠 컨텍스트 (각 최대 2개)"""
+    product_context = ""
+    product_candidates = state.get("product_candidates", [])
+    if product_candidates:
+        lines = [
+            f"- {p['brand']} {p['name']} ({p['category']}, {p['price']}원): {p['description']}"
+            for p in product_candidates[:2]
+        ]
+        product_context = "\n관련 상품 참고 (이미지 분위기 및 텍스트에 자연스럽게 반영):\n" + "\n".join(lines)
+
+    content_context = ""
+    reference_contents = state.get("reference_contents", [])
+    if reference_contents:
+        lines = [
+            f"- [{c['content_type']}] {c['text'][:80]}"
+            for c in reference_contents if c.get("text")
+        ]
+        if lines:
+            content_context = "\n참고 콘텐츠 스타일 (톤앤매너 참고용):\n" + "\n".join(lines)
+
+    return product_context + content_context
+
+
+def _select_ad(candidates: List[dict], strategy: Strategy) -> dict:
+    return next(
+        (ad for ad in candidates if ad["ad_id"] == strategy.selected_ad_id),
+        candidates[0] if candidates else {},
+    )
+
+
+def _fallback_state_analysis(user: dict, prompt: str) -> StateAnalysis:
+    return StateAnalysis(
+        intent=prompt,
+        mood="중립적",
+        needs="맞춤형 콘텐츠",
+        recommendation_direction=f"{user.get('interests', ['lifestyle'])[0]} 관련 콘텐츠",
+    )
+
+
+def _fallback_strategy(candidates: List[dict]) -> Strategy:
+    first = candidates[0] if candidates else {}
+    return Strategy(
+        selected_ad_id=first.get("ad_id", "ad_001"),
+        selected_product=first.get("product", "추천 상품"),
+        selected_brand=first.get("brand", "브랜드"),
+        combination_method="subtle",
+        rationale="사용자 관심사와 가장 부합",
+        key_message="자연스러운 라이프스타일과 함께",
+        visual_direction="lifestyle photography, natural lighting",
+    )
+
+
+def _fallback_image_prompt(selected_ad: dict, strategy: Strategy) -> str:
+    return (
+        f"{selected_ad.get('brand', '')} {selected_ad.get('product', '')}, "
+        f"lifestyle photography, natural lighting, Instagram style, "
+        f"{strategy.visual_direction}"
+    )
+
+
+def _apply_creative(state: FeedAgentState, creative: Union[Creative, FusedPlan]) -> None:
+    state["generated_content"] = creative.text_content
+    state["image_prompt"] = creative.image_prompt
+    state["negative_prompt"] = creative.negative_prompt
+
+
+def _fallback_text_content(selected_ad: dict, strategy: Strategy) -> str:
+    """LLM 없이 만드는 최소 게시물 (지연 예산 부족 시)"""
+    brand_product = f"{selected_ad.get('brand', '')} {selected_ad.get('product', '')}".strip()
+    key_message = strategy.key_message
+    return f"{key_message} {brand_product}".strip() if brand_product else key_message
+
+
+def _apply_fallback_creative(
+    state: FeedAgentState, stream: "_EarlyMediaStream", selected_ad: dict, strategy: Strategy
+) -> None:
+    """지연 예산 부족/초과 시 크리에이티브 기본값. 스트리밍 중 완성된 필드가 있으면 우선 사용."""
+    fields = stream.fields
+    state["generated_content"] = fields.get("text_content") or _fallback_text_content(selected_ad, strategy)
+    state["image_prompt"] = fields.get("image_prompt") or _fallback_image_prompt(selected_ad, strategy)
+    state["negative_prompt"] = fields.get("negative_prompt") or "bad quality, blurry, watermark"
+
+
+class _EarlyMediaStream:
+    """LLM 응답을 스트리밍으로 받으며 image_prompt / negative_prompt가 완성되면 미디어 생성 시작.
+
+    상태를 인스턴스에 두므로 run()이 deadline으로 취소되어도 받은 텍스트/필드/시작된 태스크가 남는다.
+    """
+
+    def __init__(self, provider: ModelProvider, start_media: Optional[MediaStarter], log_prefix: str):
+        self.provider = provider
+        self.start_media = start_media
+        self.log_prefix = log_prefix
+        self.chunks: List[str] = []
+        self.media_task: Optional[asyncio.Task] = None
+        self._parser = JsonObjectStream()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def fields(self) -> dict:
+        """스트리밍 중 완성된 최상위 필드"""
+        return self._parser.fields
+
+    @property
+    def json_text(self) -> str:
+        """최상위 JSON 객체 원문 (객체가 닫히지 않았으면 받은 전체 텍스트)"""
+        return self._parser.object_text or self.text
+
+    async def run(self, state: FeedAgentState, llm_prompt: str, system: str, schema: Optional[dict] = None) -> None:
+        """최상위 JSON 객체가 닫히면 디코딩을 중단 (LLM_EARLY_STOP=true)"""
+        await self.provider.agenerate_until(
+            llm_prompt, system, lambda chunk: self._on_chunk(state, chunk), schema,
+        )
+
+    def _on_chunk(self, state: FeedAgentState, chunk: str) -> bool:
+        self.chunks.append(chunk)
+        self._parser.feed(chunk)
+        if self.start_media is not None and self.media_task is None:
+            early_prompt = self._parser.fields.get("image_prompt")
+            early_negative = self._parser.fields.get("negative_prompt")
+            if isinstance(early_prompt, str) and early_prompt and isinstance(early_negative, str):
+                self.media_task = self.start_media(state, early_prompt, early_negative)
+                if self.media_task is not None:
+                    logger.info(f"[{self.log_prefix}] image_prompt ready → media generation started")
+        return EARLY_STOP and self._parser.done
+
+    def attach(self, state: FeedAgentState) -> None:
+        """선행 시작된 미디어 태스크를 state에 넘김.
+
+        이미 시작된 미디어와 state의 프롬프트를 일치시킴 (스트리밍 중 받은 값 기준).
+        """
+        if self.media_task is not None:
+            state["image_prompt"] = self.fields["image_prompt"]
+            state["negative_prompt"] = self.fields["negative_prompt"]
+        state["media_task"] = self.media_task
+
+
 # ══════════════════════════════════════════════
 # 노드 6: 미디어 생성 (이미지 / 영상)
 # ══════════════════════════════════════════════
 
+async def _generate_media(
+    media_provider: MediaProvider,
+    video_provider: Optional[MediaProvider],
+    media_type: str,
+    image_prompt: str,
+    negative_prompt: str,
+    deadline: Optional[float] = None,
+) -> dict:
+    """이미지/영상 생성 후 state에 반영할 필드 반환 (실패 시 error, 예산 저하 시 degradations 포함)"""
+    degradations: List[str] = []
+
+    # 남은 예산에 맞춰 영상 → 이미지 → 빠른 이미지 → 텍스트만 순으로 낮춤
+    if media_type == "video" and budget.is_short(deadline, budget.MIN_VIDEO_SECONDS):
+        media_type = "image"
+        degradations.append("media:video_to_image")
+    if budget.is_short(deadline, budget.MIN_IMAGE_SECONDS):
+        return _text_only_media(degradations + ["media:text_only"])
+    image_kwargs = {}
+    if media_type == "image" and budget.is_short(deadline, budget.FAST_IMAGE_SECONDS):
+        image_kwargs["quality"] = "fast"
+        degradations.append("media:fast_image")
+
+    updates: dict = {"degradations": degradations}
+    if "media:video_to_image" in degradations:
+        updates["media_type"] = "image"
+
+    try:
+        if media_type == "video":
+            if video_provider is None:
+                raise RuntimeError(
+                    "영상 생성 프로바이더가 없습니다. "
+                    "MEDIA_PROVIDER=vertex 또는 MEDIA_PROVIDER=vertex_veo로 설정하고 "
+                    "VERTEX_VEO_GCS_BUCKET을 지정하세요."
+                )
+            logger.info(f"[6/6 media_generator] type=video, provider={video_provider.name}")
+            result = await budget.within(
+                deadline, _in_stage("video", video_provider.agenerate_video(image_prompt, negative_prompt))
+            )
+            provider_name = video_provider.name
+        else:
+            logger.info(f"[6/6 media_generator] type=image, provider={media_provider.name}")
+            result = await budget.within(
+                deadline,
+                _in_stage("media", media_provider.agenerate_image(image_prompt, negative_prompt, **image_kwargs)),
+            )
+            provider_name = media_provider.name
+
+        metadata = result.to_dict()
+        metadata.pop("data", None)  # 메타에서 data 제거 (중복)
+        updates.update({
+            "media_data": result.data,
+            "media_metadata": metadata,
+            "media_provider_name": provider_name,
+        })
+        return updates
+
+    except asyncio.TimeoutError:
+        logger.warning("[media_generator] latency budget exceeded → text-only")
+        return _text_only_media(degradations + ["media:text_only"])
+    except Exception as e:
+        logger.error(f"[media_generator] error: {e}", exc_info=True)
+        updates.update({
+            "error": f"media_generator 실패: {e}",
+            "media_data": "",
+            "media_metadata": {"error": str(e)},
+        })
+        return updates
+
+
+async def _in_stage(name: str, awaitable):
+    """스테이지 slot 안에서 실행 (slot 대기 시간도 지연 예산에 포함되도록 within 안쪽에서 사용)"""
+    async with get_stage(name).slot():
+        return await awaitable
+
+
+def _text_only_media(degradations: List[str]) -> dict:
+    return {
+        "degradations": degradations,
+        "media_data": "",
+        "media_metadata": {"skipped": True, "reason": "latency budget"},
+        "media_provider_name": "none",
+    }
+
+
+def _make_media_starter(
+    media_provider: Optional[MediaProvider],
+    video_provider: Optional[MediaProvider],
+) -> MediaStarter:
+    """creative_generator가 프롬프트 완성 시점에 호출하는 미디어 태스크 생성기"""
+
+    def start(state: dict, image_prompt: str, negative_prompt: str) -> Optional[asyncio.Task]:
+        media_type = state.get("media_type", MEDIA_TYPE)
+        if media_provider is None or media_type == "text":
+            return None
+        task = asyncio.create_task(
+            _generate_media(
+                media_provider, video_provider, media_type,
+                image_prompt, negative_prompt, state.get("deadline"),
+            )
+        )
+        # 실행 단위 목록에 등록 → 그래프가 media_generator까지 가지 못하면 _cancel_media_tasks가 취소
+        started = state.get("media_tasks")
+        if started is not None:
+            started.append(task)
+        return task
+
+    return start
+
+
+def _cancel_media_tasks(state: FeedAgentState) -> None:
+    """실행이 끝났는데 아무도 await하지 않은 선행 미디어 태스크 취소.
+
+    media_generator에 도달하지 못한 경우(error 이벤트 후 스트림 종료, 클라이언트 연결 끊김, 예외/취소)
+    Imagen/Veo 호출이 media 스테이지 슬롯을 계속 잡고 있지 않도록 한다.
+    """
+    for task in state.get("media_tasks") or []:
+        if not task.done():
+            task.cancel()
+            logger.info("[6/6 media_generator] not reached → early media task cancelled")
+
+
 def _make_media_generator_node(
     media_provider: Optional[MediaProvider],
     video_provider: Optional[MediaProvider],
 ):
-    def node(state: FeedAgentState) -> FeedAgentState:
+    async def node(state: FeedAgentState) -> FeedAgentState:
         media_type = state.get("media_type", MEDIA_TYPE)
+        media_task = state.get("media_task")
+        state["media_task"] = None
 
         # MEDIA_PROVIDER=none 또는 text 모드 → 스킵
         if media_provider is None or media_type == "text":
@@ -294,36 +694,64 @@ def _make_media_generator_node(
             state["media_provider_name"] = "none"
             return state
 
-        image_prompt = state.get("image_prompt") or state.get("generated_content", "")
-        negative_prompt = state.get("negative_prompt", "bad quality, blurry")
+        if media_task is not None:
+            # creative_generator 스트리밍 중 이미 시작됨 (deadline은 태스크 내부에서 적용)
+            updates = await media_task
+        else:
+            image_prompt = state.get("image_prompt") or state.get("generated_content", "")
+            negative_prompt = state.get("negative_prompt", "bad quality, blurry")
+            updates = await _generate_media(
+                media_provider, video_provider, media_type,
+                image_prompt, negative_prompt, state.get("deadline"),
+            )
 
-        try:
-            if media_type == "video":
-                if video_provider is None:
-                    raise RuntimeError(
-                        "영상 생성 프로바이더가 없습니다. "
-                        "MEDIA_PROVIDER=vertex 또는 MEDIA_PROVIDER=vertex_veo로 설정하고 "
-                        "VERTEX_VEO_GCS_BUCKET을 지정하세요."
-                    )
-                logger.info(f"[6/6 media_generator] type=video, provider={video_provider.name}")
-                result = video_provider.generate_video(image_prompt, negative_prompt)
-                state["media_provider_name"] = video_provider.name
-            else:
-                logger.info(f"[6/6 media_generator] type=image, provider={media_provider.name}")
-                result = media_provider.generate_image(image_prompt, negative_prompt)
-                state["media_provider_name"] = media_provider.name
+        error = updates.pop("error", None)
+        if error:
+            state["error"] = error
+        for tag in updates.pop("degradations", []):
+            budget.degrade(state, tag)
+        state.update(updates)
+        return state
+    return node
 
-            state["media_data"] = result.data
-            state["media_metadata"] = result.to_dict()
-            state["media_metadata"].pop("data", None)  # 메타에서 data 제거 (중복)
 
-        except Exception as e:
-            logger.error(f"[media_generator] error: {e}", exc_info=True)
-            state["error"] = f"media_generator 실패: {e}"
-            state["media_data"] = ""
-            state["media_metadata"] = {"error": str(e)}
+# ══════════════════════════════════════════════
+# 체크포인트 래퍼
+# ══════════════════════════════════════════════
+
+def _make_checkpointed_node(
+    store: CheckpointStore, index: int, name: str, fn: Callable[[dict], Awaitable[dict]]
+) -> Callable[[dict], Awaitable[dict]]:
+    """완료된 스테이지는 건너뛰고, 새로 깨끗하게 끝난 스테이지는 체크포인트에 기록하는 래퍼.
+
+    완료 기록은 앞 스테이지들이 모두 완료된 경우에만 이어 붙임 (완료 목록은 항상 스테이지 순서의 prefix).
+    앞 스테이지를 다시 실행하면 뒤 스테이지의 입력이 바뀌므로 뒤 결과를 재사용하면 안 된다.
+    """
+
+    async def node(state: FeedAgentState) -> FeedAgentState:
+        completed = state.get("completed_nodes") or []
+        if name in completed:
+            logger.info(f"[checkpoint] {name} restored (generation={state.get('generation_id')})")
+            return state
+
+        degradations_before = len(state.get("degradations") or [])
+        result = await fn(state)
+
+        clean = (
+            not result.get("error")
+            and len(result.get("degradations") or []) == degradations_before
+            and len(completed) == index
+        )
+        generation_id = result.get("generation_id")
+        if clean:
+            result["completed_nodes"] = [*completed, name]
+            if generation_id and result.get("checkpoint_stages"):
+                try:
+                    await store.asave(generation_id, make_payload(result, result["completed_nodes"]))
+                except Exception as e:
+                    logger.warning(f"[checkpoint] save failed ({generation_id}/{name}): {e}")
+        return result
 
-        return state
     return node
 
 
@@ -334,17 +762,37 @@ def _make_media_generator_node(
 class FeedAgent:
     """LangGraph 기반 6단계 피드 생성 에이전트"""
 
-    def __init__(self):
-        self.provider = get_provider()
+    def __init__(self, pipeline: str = PIPELINE):
+        if pipeline not in ("standard", "fused"):
+            raise ValueError(
+                f"Unknown AGENT_PIPELINE='{pipeline}'. "
+                "Valid options: 'standard', 'fused'"
+            )
+        self.pipeline = pipeline
+        # LLM 호출은 llm 스테이지 동시 실행 제한 안에서 (응답 캐시 히트는 제한 밖)
+        self.provider = StagedProvider(get_provider())
         self.media_provider = get_media_provider()
         self.video_provider = self._resolve_video_provider()
+        self.checkpoints = get_checkpoint_store()
         self.graph = self._build_graph()
+        self._inflight = SingleFlight("feed_generation")
         logger.info(
-            f"FeedAgent ready | LLM={self.provider.name} | "
+            f"FeedAgent ready | pipeline={self.pipeline} | LLM={self.provider.name} | "
             f"Image={self.media_provider.name if self.media_provider else 'none'} | "
             f"Video={self.video_provider.name if self.video_provider else 'none'}"
         )
 
+    @property
+    def system_prompts(self) -> List[str]:
+        """현재 파이프라인의 LLM 노드가 쓰는 system 프롬프트 (호출 순서)"""
+        if self.pipeline == "fused":
+            return [_FUSED_PLANNER_SYSTEM]
+        return [_STATE_INTERPRETER_SYSTEM, _STRATEGY_PLANNER_SYSTEM, _CREATIVE_GENERATOR_SYSTEM]
+
+    async def awarm_up(self) -> None:
+        """LLM 프로바이더 예열 (로컬 LLM: 모델 로드 + system 프롬프트 KV 캐시)"""
+        await self.provider.awarm_up(self.system_prompts)
+
     def _resolve_video_provider(self) -> Optional[MediaProvider]:
         """영상 지원 프로바이더 결정.
 
@@ -362,56 +810,259 @@ class FeedAgent:
                 logger.warning(f"VertexVeoProvider 초기화 실패: {e}")
         return None
 
+    def _node_specs(self) -> List[NodeSpec]:
+        """노드 실행 순서 + 각 노드가 읽고 쓰는 state 키 (병렬 스테이지 계획에 사용)"""
+        start_media = _make_media_starter(self.media_provider, self.video_provider) if EARLY_MEDIA else None
+
+        load_context = NodeSpec(
+            "load_context", _load_context_node,
+            reads=["user_id"],
+            writes=["user_context", "user_vector"],
+        )
+        retrieve_candidates = NodeSpec(
+            "retrieve_candidates", _retrieve_candidates_node,
+            reads=["user_context", "user_vector", "prompt"],
+            writes=["ad_candidates", "product_candidates", "reference_contents"],
+        )
+        media_generator = NodeSpec(
+            "media_generator", _make_media_generator_node(self.media_provider, self.video_provider),
+            reads=["media_type", "image_prompt", "negative_prompt", "generated_content", "media_task"],
+            writes=["media_data", "media_metadata", "media_provider_name", "media_task", "media_type"],
+        )
+
+        if self.pipeline == "fused":
+            return [
+                load_context,
+                retrieve_candidates,
+                NodeSpec(
+                    "fused_planner", _make_fused_planner_node(
+                        with_response_cache(self.provider, "fused_planner"), start_media,
+                    ),
+                    reads=[
+                        "user_context", "prompt", "ad_candidates",
+                        "product_candidates", "reference_contents", "media_type",
+                    ],
+                    writes=[
+                        "state_analysis", "strategy",
+                        "generated_content", "image_prompt", "negative_prompt", "media_task",
+                    ],
+                ),
+                media_generator,
+            ]
+
+        return [
+            load_context,
+            NodeSpec(
+                "state_interpreter", _make_state_interpreter_node(
+                    with_response_cache(self.provider, "state_interpreter"),
+                ),
+                reads=["user_context", "prompt"],
+                writes=["state_analysis"],
+            ),
+            retrieve_candidates,
+            NodeSpec(
+                "strategy_planner", _make_strategy_planner_node(
+                    with_response_cache(self.provider, "strategy_planner"),
+                ),
+                reads=["state_analysis", "ad_candidates"],
+                writes=["strategy"],
+            ),
+            NodeSpec(
+                "creative_generator", _make_creative_generator_node(
+                    with_response_cache(self.provider, "creative_generator"), start_media,
+                ),
+                reads=[
+                    "state_analysis", "strategy", "ad_candidates",
+                    "product_candidates", "reference_contents", "media_type",
+                ],
+                writes=["generated_content", "image_prompt", "negative_prompt", "media_task"],
+            ),
+            media_generator,
+        ]
+
     def _build_graph(self) -> Any:
+        """노드 선언으로부터 스테이지를 계획해 그래프 구성 (AGENT_PIPELINE 프로파일별).
+
+        독립 노드(state_interpreter ∥ retrieve_candidates)는 한 스테이지의 복합 노드로 동시 실행.
+        체크포인트 저장소가 있으면 각 스테이지를 _make_checkpointed_node로 감싼다.
+        """
         workflow = StateGraph(FeedAgentState)
+        stages = plan_stages(self._node_specs())
+
+        names = []
+        self.stage_members = {}   # 그래프 노드 이름 → 포함된 노드 이름들 (astream 이벤트 분해용)
+        for index, stage in enumerate(stages):
+            name = stage_name(stage)
+            fn = stage[0].fn if len(stage) == 1 else make_parallel_node(stage)
+            if self.checkpoints is not None:
+                fn = _make_checkpointed_node(self.checkpoints, index, name, fn)
+            workflow.add_node(name, GraphNode(name, fn))
+            names.append(name)
+            self.stage_members[name] = [spec.name for spec in stage]
+
+        workflow.set_entry_point(names[0])
+        for prev, nxt in zip(names, names[1:]):
+            workflow.add_edge(prev, nxt)
+        workflow.add_edge(names[-1], END)
+        self.stage_names = names
+
+        logger.info(f"FeedAgent stages: {' → '.join(names)}")
+        return workflow.compile()
 
-        workflow.add_node("load_context", _load_context_node)
-        workflow.add_node("state_interpreter", _make_state_interpreter_node(self.provider))
-        workflow.add_node("retrieve_candidates", _retrieve_candidates_node)
-        workflow.add_node("strategy_planner", _make_strategy_planner_node(self.provider))
-        workflow.add_node("creative_generator", _make_creative_generator_node(self.provider))
-        workflow.add_node("media_generator", _make_media_generator_node(self.media_provider, self.video_provider))
-
-        workflow.set_entry_point("load_context")
-        workflow.add_edge("load_context", "state_interpreter")
-        workflow.add_edge("state_interpreter", "retrieve_candidates")
-        workflow.add_edge("retrieve_candidates", "strategy_planner")
-        workflow.add_edge("strategy_planner", "creative_generator")
-        workflow.add_edge("creative_generator", "media_generator")
-        workflow.add_edge("media_generator", END)
+    def run(
+        self, user_id: str, prompt: str, media_type: str = MEDIA_TYPE,
+        latency_budget: Optional[float] = None, generation_id: Optional[str] = None, resume: bool = True,
+    ) -> FeedAgentState:
+        """에이전트 실행 (동기 래퍼). 이벤트 루프가 없는 스레드/스크립트용.
 
-        return workflow.compile()
+        FastAPI 등 async 코드에서는 await agent.arun(...)을 사용할 것.
+        """
+        return asyncio.run(self.arun(user_id, prompt, media_type, latency_budget, generation_id, resume))
+
+    async def arun(
+        self, user_id: str, prompt: str, media_type: str = MEDIA_TYPE,
+        latency_budget: Optional[float] = None, generation_id: Optional[str] = None, resume: bool = True,
+    ) -> FeedAgentState:
+        """에이전트 실행 (async). LLM/미디어/임베딩 대기 중 스레드를 점유하지 않음.
 
-    def run(self, user_id: str, prompt: str, media_type: str = MEDIA_TYPE) -> FeedAgentState:
-        """에이전트 실행 (동기)
+        latency_budget: 요청 지연 예산(초). None이면 AGENT_LATENCY_BUDGET_SECONDS, 0이면 무제한.
+        generation_id:  체크포인트 키. 같은 값으로 재시도하면 완료된 스테이지부터 이어서 실행.
+        resume:         False면 generation_id가 새로 발급된 값 (체크포인트 조회 / 스테이지별 저장 생략).
 
-        FastAPI에서: await asyncio.to_thread(agent.run, user_id, prompt, media_type)
+        AGENT_COALESCE=true면 같은 (user_id, prompt, media_type)이 실행 중일 때 새로 실행하지 않고
+        그 결과를 함께 기다린다 (예산/generation_id는 먼저 시작한 실행 기준).
+        """
+        if not COALESCE:
+            return await self._arun(user_id, prompt, media_type, latency_budget, generation_id, resume)
+        result = await self._inflight.run(
+            (user_id, prompt, media_type),
+            lambda: self._arun(user_id, prompt, media_type, latency_budget, generation_id, resume),
+        )
+        return dict(result)   # 호출자별 사본 (최상위 키 수정이 서로 번지지 않도록)
+
+    async def _arun(
+        self, user_id: str, prompt: str, media_type: str,
+        latency_budget: Optional[float], generation_id: Optional[str], resume: bool,
+    ) -> FeedAgentState:
+        initial_state = await self._prepare_state(
+            user_id, prompt, media_type, latency_budget, generation_id, resume
+        )
+        try:
+            result = await self.graph.ainvoke(initial_state, config=self._run_config(user_id))
+        finally:
+            _cancel_media_tasks(initial_state)
+        await self._finish_checkpoint(result)
+        return result
+
+    async def astream(
+        self, user_id: str, prompt: str, media_type: str = MEDIA_TYPE,
+        latency_budget: Optional[float] = None, generation_id: Optional[str] = None, resume: bool = True,
+    ) -> AsyncIterator[Tuple[str, FeedAgentState]]:
+        """노드가 끝날 때마다 (노드 이름, 그 시점의 state)를 yield.
+
+        병렬 스테이지는 스테이지가 끝난 시점에 포함된 노드마다 한 번씩 yield (선언 순서).
+        체크포인트에서 복원된 스테이지도 같은 순서로 yield.
+        마지막 노드의 state가 arun()의 반환값과 같다.
+        호출자가 중간에 닫아도(error 이벤트 후 종료 등) 선행 시작된 미디어 태스크를 취소하고
+        그 시점까지의 체크포인트를 마무리한다. 호출자는 aclosing으로 감싸 즉시 정리되게 할 것.
         """
-        initial_state: FeedAgentState = {
+        initial_state = await self._prepare_state(
+            user_id, prompt, media_type, latency_budget, generation_id, resume
+        )
+        state = initial_state
+        try:
+            async for chunk in self.graph.astream(initial_state, config=self._run_config(user_id)):
+                for name, state in chunk.items():
+                    for node_name in self.stage_members.get(name, []):
+                        yield node_name, state
+        finally:
+            _cancel_media_tasks(initial_state)
+            await self._finish_checkpoint(state)
+
+    def _run_config(self, user_id: str) -> dict:
+        config = {"run_name": f"feed_{user_id}"}
+        handler = _get_langfuse_handler(user_id)
+        if handler:
+            config["callbacks"] = [handler]
+        return config
+
+    async def _prepare_state(
+        self, user_id: str, prompt: str, media_type: str,
+        latency_budget: Optional[float], generation_id: Optional[str], resume: bool,
+    ) -> FeedAgentState:
+        """초기 state 구성. 같은 요청의 체크포인트가 있으면 완료된 스테이지 결과를 복원."""
+        state = self._initial_state(user_id, prompt, media_type, latency_budget, generation_id)
+        state["checkpoint_stages"] = resume
+        if not generation_id or not resume or self.checkpoints is None:
+            return state
+
+        try:
+            payload = await self.checkpoints.aload(generation_id)
+        except Exception as e:
+            logger.warning(f"[checkpoint] load failed ({generation_id}): {e}")
+            return state
+        if payload is None:
+            return state
+        if not matches(payload, user_id, prompt, media_type):
+            logger.warning(f"[checkpoint] {generation_id} belongs to a different request → ignored")
+            return state
+
+        state.update(payload["state"])
+        state["completed_nodes"] = payload["completed_nodes"]
+        logger.info(f"[checkpoint] resuming {generation_id} after {payload['completed_nodes']}")
+        return state
+
+    async def _finish_checkpoint(self, state: FeedAgentState) -> None:
+        """실행 종료 시 체크포인트 정리.
+
+        모든 스테이지가 깨끗하게 끝남 → 스테이지별로 저장해 왔다면 삭제 (재시도할 것이 없음)
+        중간에 실패/저하 → 새 요청(resume=False)은 저장한 적이 없으므로 재시도용으로 여기서 한 번 저장
+        """
+        generation_id = state.get("generation_id")
+        if not generation_id or self.checkpoints is None:
+            return
+        completed = state.get("completed_nodes") or []
+        try:
+            if len(completed) >= len(self.stage_names):
+                if state.get("checkpoint_stages"):
+                    await self.checkpoints.adelete(generation_id)
+            elif completed and not state.get("checkpoint_stages"):
+                await self.checkpoints.asave(generation_id, make_payload(state, completed))
+        except Exception as e:
+            logger.warning(f"[checkpoint] finish failed ({generation_id}): {e}")
+
+    def _initial_state(
+        self, user_id: str, prompt: str, media_type: str,
+        latency_budget: Optional[float] = None, generation_id: Optional[str] = None,
+    ) -> FeedAgentState:
+        return {
             "user_id": user_id,
             "prompt": prompt,
+            "generation_id": generation_id,
+            "completed_nodes": [],
+            "checkpoint_stages": True,
+            "deadline": budget.make_deadline(latency_budget),
+            "degradations": [],
             "user_context": {},
             "user_vector": None,
-            "state_analysis": "",
+            "state_analysis": {},
             "ad_candidates": [],
             "product_candidates": [],
             "reference_contents": [],
-            "strategy": "",
+            "strategy": {},
             "generated_content": "",
             "image_prompt": "",
             "negative_prompt": "",
+            "media_task": None,
+            "media_tasks": [],
             "media_type": media_type,
+            "requested_media_type": media_type,
             "media_data": "",
             "media_metadata": {},
             "provider_name": self.provider.name,
             "media_provider_name": self.media_provider.name if self.media_provider else "none",
             "error": None,
         }
-        config = {"run_name": f"feed_{user_id}"}
-        handler = _get_langfuse_handler(user_id)
-        if handler:
-            config["callbacks"] = [handler]
-        return self.graph.invoke(initial_state, config=config)
 
 
 # 싱글턴
@@ -444,19 +1095,3 @@ def _get_langfuse_handler(user_id: str = ""):
     except Exception as e:
         logger.warning(f"Langfuse 초기화 실패 (트레이싱 비활성화): {e}")
         return None
-
-
-def _strip_md_json(text: str) -> str:
-    """LLM 응답에서 JSON 객체만 추출 (```json ... ``` 래퍼 제거)."""
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return text[start:end + 1]
-    return text.strip()
-
-
-def _parse_json(s: str, default: dict = None) -> dict:
-    try:
-        return json.loads(s)
-    except Exception:
-        return default or {}
@@ -0,0 +1,79 @@
+"""
+요청 단위 지연 예산 (deadline) + 단계별 품질 저하 (degradation)
+
+요청마다 deadline(epoch 초)을 FeedAgentState에 싣고, 각 노드가 남은 예산을 보고 스스로 품질을 낮춘다.
+적용한 저하는 state["degradations"]에 "노드:방식" 태그로 남아 응답 metadata에 그대로 노출된다.
+
+    LLM 노드        남은 예산 < AGENT_MIN_LLM_SECONDS → LLM 생략, 기존 JSON 기본값   (<node>:fallback)
+                    호출이 deadline을 넘기면 취소 후 같은 기본값                    (<node>:fallback)
+    media_generator 영상인데 남은 예산 < AGENT_MIN_VIDEO_SECONDS → 이미지         (media:video_to_image)
+                    남은 예산 < AGENT_FAST_IMAGE_SECONDS → 빠른 이미지 (스텝 축소) (media:fast_image)
+                    남은 예산 < AGENT_MIN_IMAGE_SECONDS 또는 생성이 deadline 초과 → 텍스트만 (media:text_only)
+
+deadline이 없으면(예산 0) 모든 판정이 통과되어 기존 동작과 같다.
+
+환경변수:
+    AGENT_LATENCY_BUDGET_SECONDS=0   기본 예산 (0이면 무제한). 요청의 latency_budget_ms가 우선
+    AGENT_MIN_LLM_SECONDS=2
+    AGENT_MIN_VIDEO_SECONDS=120
+    AGENT_FAST_IMAGE_SECONDS=12
+    AGENT_MIN_IMAGE_SECONDS=4
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_BUDGET_SECONDS = float(os.getenv("AGENT_LATENCY_BUDGET_SECONDS", "0"))
+MIN_LLM_SECONDS = float(os.getenv("AGENT_MIN_LLM_SECONDS", "2"))
+MIN_VIDEO_SECONDS = float(os.getenv("AGENT_MIN_VIDEO_SECONDS", "120"))
+FAST_IMAGE_SECONDS = float(os.getenv("AGENT_FAST_IMAGE_SECONDS", "12"))
+MIN_IMAGE_SECONDS = float(os.getenv("AGENT_MIN_IMAGE_SECONDS", "4"))
+
+
+def make_deadline(budget_seconds: Optional[float] = None) -> Optional[float]:
+    """예산(초) → deadline(epoch 초). None이면 기본 예산, 0 이하면 무제한(None)."""
+    if budget_seconds is None:
+        budget_seconds = DEFAULT_BUDGET_SECONDS
+    if budget_seconds <= 0:
+        return None
+    return time.time() + budget_seconds
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """남은 예산(초). deadline이 없으면 None (무제한)."""
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def is_short(deadline: Optional[float], needed: float) -> bool:
+    """남은 예산이 needed초보다 적은지 (deadline 없으면 항상 False)"""
+    left = remaining(deadline)
+    return left is not None and left < needed
+
+
+def degrade(state: dict, tag: str) -> None:
+    """적용한 저하를 state에 기록.
+
+    병렬 스테이지에서 각 노드가 받은 state 사본끼리 리스트를 공유하지 않도록 새 리스트로 교체.
+    """
+    state["degradations"] = [*(state.get("degradations") or []), tag]
+    logger.info(f"[budget] degraded: {tag} (remaining={_fmt(remaining(state.get('deadline')))})")
+
+
+async def within(deadline: Optional[float], awaitable: Awaitable[T]) -> T:
+    """deadline까지만 기다림. 초과 시 작업을 취소하고 asyncio.TimeoutError."""
+    left = remaining(deadline)
+    if left is None:
+        return await awaitable
+    return await asyncio.wait_for(awaitable, timeout=max(left, 0.0))
+
+
+def _fmt(left: Optional[float]) -> str:
+    return "unbounded" if left is None else f"{left:.1f}s"
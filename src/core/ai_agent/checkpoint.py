@@ -0,0 +1,308 @@
+"""
+생성 ID 단위 그래프 체크포인트 (재시도 시 마지막 완료 노드 다음부터 실행)
+
+media_generator가 실패하거나 예산 초과로 텍스트만 반환된 뒤 클라이언트가 같은 generation_id로
+재시도하면, 이미 끝난 load_context / LLM 노드 / 검색을 다시 돌리지 않고 저장된 텍스트·프롬프트를
+재사용해 남은 노드만 실행한다.
+
+저장 시점 (FeedAgent.arun의 resume):
+    resume=True (클라이언트가 준 generation_id, Idempotency-Key, 작업)
+        그래프 노드(스테이지)가 새 error / degradation 없이 끝날 때마다 state 스냅샷 + 완료 노드 목록 저장.
+        모든 노드가 깨끗하게 끝나면 체크포인트 삭제 (미완료 생성만 남음).
+    resume=False (서버가 새로 발급한 generation_id)
+        조회 / 스테이지별 저장 없음. 깨끗하게 끝나지 않았을 때만 실행 끝에 한 번 저장
+        → 정상 요청은 저장소 I/O 없음, 실패 응답의 generation_id로 재시도하면 이어서 실행.
+    실패·저하된 노드는 완료로 기록하지 않으므로 재시도 때 다시 실행된다.
+
+저장하지 않는 키: media_task / media_tasks (실행 중 태스크), deadline (재시도마다 새 예산), error,
+    degradations (재시도 응답에 이전 실행의 저하 태그가 섞이지 않도록 — 저하된 노드는 완료로 기록하지 않음),
+    media_type / media_data / media_metadata / media_provider_name (media_generator 출력.
+    video_to_image 저하로 바뀐 media_type 대신 요청한 media_type을 요청 식별 필드로 저장)
+
+LangGraph 0.0.20의 Pregel checkpointer는 새 입력이 들어오면 entry 노드부터 다시 실행하고,
+state["error"]로 실패를 기록하는 노드도 완료로 저장하므로 노드 래퍼 수준에서 구현.
+
+백엔드 (AGENT_CHECKPOINT):
+    sqlite    로컬 파일 (기본, AGENT_CHECKPOINT_PATH, 단일 인스턴스용 — 인스턴스 간 재시도는 postgres)
+    postgres  agent_checkpoints 테이블 (scripts/init_db.sql, 여러 인스턴스가 공유)
+    none      비활성화
+
+환경변수:
+    AGENT_CHECKPOINT=sqlite
+    AGENT_CHECKPOINT_PATH=/tmp/ai_agent_checkpoints.sqlite3
+    AGENT_CHECKPOINT_TTL=86400      이보다 오래된 체크포인트는 무시 / 정리
+"""
+import datetime
+import decimal
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+from src.core.stages import get_stage
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_BACKEND = os.getenv("AGENT_CHECKPOINT", "sqlite").lower()  # sqlite | postgres | none
+CHECKPOINT_TTL = float(os.getenv("AGENT_CHECKPOINT_TTL", "86400"))
+
+# 체크포인트에 저장하지 않는 state 키
+_EXCLUDED_KEYS = frozenset({
+    "media_task", "media_tasks", "deadline", "error", "completed_nodes", "generation_id", "checkpoint_stages",
+    "requested_media_type", "degradations",
+    "media_type", "media_data", "media_metadata", "media_provider_name",
+})
+
+# save 몇 번마다 만료 행 정리
+_PURGE_EVERY = 200
+
+
+class CheckpointStore(ABC):
+    """generation_id → 체크포인트 payload(dict) 저장소"""
+
+    def __init__(self):
+        self._saves = 0
+
+    @abstractmethod
+    def load(self, generation_id: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def save(self, generation_id: str, payload: dict) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, generation_id: str) -> None:
+        pass
+
+    @abstractmethod
+    def purge(self, older_than: float) -> None:
+        """updated_at(epoch 초)이 older_than 이전인 체크포인트 삭제"""
+        pass
+
+    # 저장소 I/O는 "checkpoint" 스테이지 전용 스레드 풀에서 (기본 executor 미사용, 대기열 지표는 /health)
+    async def aload(self, generation_id: str) -> Optional[dict]:
+        return await get_stage("checkpoint").run(self.load, generation_id)
+
+    async def asave(self, generation_id: str, payload: dict) -> None:
+        await get_stage("checkpoint").run(self.save, generation_id, payload)
+
+    async def adelete(self, generation_id: str) -> None:
+        await get_stage("checkpoint").run(self.delete, generation_id)
+
+    def _maybe_purge(self) -> None:
+        self._saves += 1
+        if self._saves % _PURGE_EVERY == 0:
+            try:
+                self.purge(time.time() - CHECKPOINT_TTL)
+            except Exception as e:
+                logger.warning(f"[checkpoint] purge failed: {e}")
+
+
+class SqliteCheckpointStore(CheckpointStore):
+    """로컬 SQLite 파일 저장소 (단일 호스트, 프로세스 간 공유 가능)"""
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__()
+        self.path = path or os.getenv("AGENT_CHECKPOINT_PATH", "/tmp/ai_agent_checkpoints.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS agent_checkpoints ("
+            " generation_id TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        logger.info(f"[checkpoint] sqlite store: {self.path}")
+
+    def load(self, generation_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, updated_at FROM agent_checkpoints WHERE generation_id = ?",
+                (generation_id,),
+            ).fetchone()
+        if row is None or row[1] < time.time() - CHECKPOINT_TTL:
+            return None
+        return json.loads(row[0], object_hook=_json_object_hook)
+
+    def save(self, generation_id: str, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO agent_checkpoints (generation_id, payload, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT(generation_id) DO UPDATE SET"
+                " payload = excluded.payload, updated_at = excluded.updated_at",
+                (generation_id, data, time.time()),
+            )
+            self._conn.commit()
+        self._maybe_purge()
+
+    def delete(self, generation_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM agent_checkpoints WHERE generation_id = ?", (generation_id,))
+            self._conn.commit()
+
+    def purge(self, older_than: float) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM agent_checkpoints WHERE updated_at < ?", (older_than,))
+            self._conn.commit()
+
+
+class PostgresCheckpointStore(CheckpointStore):
+    """PostgreSQL agent_checkpoints 테이블 저장소 (여러 API 인스턴스가 공유)"""
+
+    def load(self, generation_id: str) -> Optional[dict]:
+        from src.core.db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT payload FROM agent_checkpoints"
+                    " WHERE generation_id = %s AND updated_at >= now() - make_interval(secs => %s)",
+                    (generation_id, CHECKPOINT_TTL),
+                )
+                row = cur.fetchone()
+        if row is None:
+            return None
+        return json.loads(row["payload"], object_hook=_json_object_hook)
+
+    def save(self, generation_id: str, payload: dict) -> None:
+        from src.core.db import get_connection
+
+        data = json.dumps(payload, ensure_ascii=False, default=_json_default)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO agent_checkpoints (generation_id, payload, updated_at)"
+                    " VALUES (%s, %s, now())"
+                    " ON CONFLICT (generation_id) DO UPDATE SET"
+                    " payload = EXCLUDED.payload, updated_at = EXCLUDED.updated_at",
+                    (generation_id, data),
+                )
+        self._maybe_purge()
+
+    def delete(self, generation_id: str) -> None:
+        from src.core.db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM agent_checkpoints WHERE generation_id = %s", (generation_id,))
+
+    def purge(self, older_than: float) -> None:
+        from src.core.db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM agent_checkpoints WHERE updated_at < to_timestamp(%s)",
+                    (older_than,),
+                )
+
+    # DB 대기는 전용 DB 스레드 풀에서 (db.run_db)
+    async def aload(self, generation_id: str) -> Optional[dict]:
+        from src.core.db import run_db
+        return await run_db(self.load, generation_id)
+
+    async def asave(self, generation_id: str, payload: dict) -> None:
+        from src.core.db import run_db
+        await run_db(self.save, generation_id, payload)
+
+    async def adelete(self, generation_id: str) -> None:
+        from src.core.db import run_db
+        await run_db(self.delete, generation_id)
+
+
+# ──────────────────────────────────────────
+# state ↔ payload
+# ──────────────────────────────────────────
+
+def make_payload(state: dict, completed_nodes: list) -> dict:
+    """체크포인트 payload: 요청 식별 필드 + 완료 노드 + 재사용할 state
+
+    media_type은 요청 값 (media_generator가 저하로 바꾼 state["media_type"]이 아님)
+    """
+    return {
+        "user_id": state.get("user_id"),
+        "prompt": state.get("prompt"),
+        "media_type": state.get("requested_media_type") or state.get("media_type"),
+        "completed_nodes": list(completed_nodes),
+        "state": {k: v for k, v in state.items() if k not in _EXCLUDED_KEYS},
+    }
+
+
+def matches(payload: dict, user_id: str, prompt: str, media_type: str) -> bool:
+    """같은 요청의 체크포인트인지 (generation_id 재사용 시 다른 요청이면 무시)"""
+    return (
+        payload.get("user_id") == user_id
+        and payload.get("prompt") == prompt
+        and payload.get("media_type") == media_type
+    )
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"not JSON serializable: {type(value).__name__}")
+
+
+def _json_object_hook(obj: dict):
+    if "__ndarray__" in obj:
+        return np.asarray(obj["__ndarray__"], dtype=obj.get("dtype", "float32"))
+    return obj
+
+
+# ──────────────────────────────────────────
+# 싱글턴
+# ──────────────────────────────────────────
+
+_store: Optional[CheckpointStore] = None
+_store_initialized = False
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """설정된 체크포인트 저장소. AGENT_CHECKPOINT=none 또는 초기화 실패 시 None."""
+    global _store, _store_initialized
+
+    if _store_initialized:
+        return _store
+    with _store_lock:
+        if _store_initialized:
+            return _store
+        try:
+            if CHECKPOINT_BACKEND == "sqlite":
+                _store = SqliteCheckpointStore()
+            elif CHECKPOINT_BACKEND == "postgres":
+                _store = PostgresCheckpointStore()
+                logger.info("[checkpoint] postgres store: agent_checkpoints")
+            elif CHECKPOINT_BACKEND != "none":
+                raise ValueError(
+                    f"Unknown AGENT_CHECKPOINT='{CHECKPOINT_BACKEND}'. "
+                    "Valid options: 'sqlite', 'postgres', 'none'"
+                )
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.warning(f"[checkpoint] store unavailable, checkpointing disabled: {e}")
+            _store = None
+        _store_initialized = True
+    return _store
+
+
+def reset_checkpoint_store() -> None:
+    """테스트용 저장소 초기화"""
+    global _store, _store_initialized
+    _store = None
+    _store_initialized = False
@@ -4,20 +4,69 @@ USE_MOCK_VECTOR_DB=false 일 때 mock_data.py 대신 사용
 
 광고 후보 검색:
   - campaigns.embedding 이 있으면 pgvector 코사인 유사도 검색
-  - 임베딩 없으면 전체 조회 후 키워드 스코어링으로 fallback
+  - AD_RETRIEVAL_MODE=two_stage(기본): HNSW 인덱스로 shortlist 추출 후 입찰가 가중 재정렬
+  - 임베딩 없으면 전문 검색(search_tsv) → keyword_index 역색인 키워드 스코어링 순으로 fallback
+
+async 경로:
+  - aget_user() / aretrieve_all_candidates(): 캐시/인덱스/임베딩 대기는 이벤트 루프에서,
+    SQL은 db.run_db()의 DB 전용 스레드 풀에서 실행
 
 user_vector 최적화:
   - get_user()가 long_term_vector를 함께 반환
   - retrieve_* 함수들이 user_vector를 직접 받으면 임베딩 생성 API 호출을 생략
+
+사용자 컨텍스트 캐시:
+  - get_user()는 profile + float32 벡터 바이트를 user_context 캐시(LRU → Redis)에 저장
+  - 반복 요청 사용자는 DB를 읽지 않음, 갱신 시 invalidate_user_cache()로 무효화
+
+쿼리 임베딩 캐시:
+  - _generate_embedding()은 (정규화 텍스트, 모델명) 키로 LRU → Redis 순으로 조회
+  - 콜드 유저 요청도 임베딩 API는 최대 1회
+  - 캐시 미스는 embeddings.EmbeddingService가 동시 요청을 배치로 묶어 호출
+
+In-process 벡터 인덱스:
+  - VECTOR_INDEX_ENABLED=true면 vector_index.VectorIndex가 준비된 테이블은 메모리에서 검색
+  - 인덱스 cold 상태에서는 아래 SQL 경로 사용
+
+통합 검색:
+  - retrieve_all_candidates()가 광고/상품/콘텐츠를 단일 쿼리(1 round trip)로 조회
+  - 쿼리 벡터는 한 번만 전송
+
+하이브리드 검색 (FEATURE_HYBRID_SEARCH=true):
+  - search_tsv(tsvector, GIN) 전문 검색 순위와 벡터 검색 순위를 reciprocal rank fusion으로 결합
+  - 임베딩이 없으면(플래그와 무관) 전문 검색만으로 같은 쿼리를 실행해 전체 스캔 fallback을 대체
 """
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import re
 from typing import List, Optional
 
-from src.core.db import get_connection
+import numpy as np
+
+from src.core.cache import TieredCache
+from src.core.db import get_connection, run_db
+
+from .embeddings import get_embedding_service
+from .keyword_index import get_keyword_index
+from .vector_index import get_vector_index
 
 logger = logging.getLogger(__name__)
 
+# 광고 검색 모드: two_stage (HNSW shortlist → 입찰가 재정렬) | exact (전수 블렌딩 정렬)
+AD_RETRIEVAL_MODE = os.getenv("AD_RETRIEVAL_MODE", "two_stage").lower()
+AD_ANN_SHORTLIST = int(os.getenv("AD_ANN_SHORTLIST", "100"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "100"))
+
+# 하이브리드 검색: 전문 검색(tsvector/GIN) + 벡터 검색을 RRF로 결합
+HYBRID_SEARCH = os.getenv("FEATURE_HYBRID_SEARCH", "false").lower() == "true"
+RRF_K = int(os.getenv("RRF_K", "60"))
+HYBRID_CANDIDATE_POOL = int(os.getenv("HYBRID_CANDIDATE_POOL", "50"))
+_MAX_QUERY_TERMS = 32
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
 DEFAULT_USER = {
     "user_id": "unknown",
     "name": "신규 사용자",
@@ -38,7 +87,18 @@ def get_user(user_id: str) -> dict:
 
     반환값에 'long_term_vector' 키가 포함되어 있으면 DB에 임베딩이 있는 것.
     agent.py의 _load_context_node에서 user_vector로 분리해 state에 저장.
+
+    조회 결과는 사용자 컨텍스트 캐시(LRU → Redis)에 저장되어 재요청 시 DB를 읽지 않는다.
+    프로필/벡터를 갱신하는 쪽은 invalidate_user_cache()를 호출할 것.
     """
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return _decode_user(cached)
+    return _load_user(user_id)
+
+
+def _load_user(user_id: str) -> dict:
+    """캐시를 거치지 않고 DB에서 조회 후 캐시에 저장 (get_user / aget_user의 미스 경로)"""
     try:
         with get_connection() as conn:
             with conn.cursor() as cur:
@@ -52,55 +112,159 @@ def get_user(user_id: str) -> dict:
             logger.warning(f"[db_data] user_id={user_id} not found, using default")
             return {**DEFAULT_USER, "user_id": user_id}
 
-        profile = row["profile"] or {}
-        user = {"user_id": row["user_id"], **profile}
-
         # long_term_vector가 있으면 포함 (retrieve_* 함수에서 임베딩 재생성 생략용)
         vector = row["long_term_vector"]
-        if vector is not None:
-            user["long_term_vector"] = _to_list(vector)
-
-        return user
+        blob = _encode_user(
+            row["user_id"], row["profile"] or {}, _to_vector(vector) if vector is not None else None
+        )
 
     except Exception as e:
         logger.error(f"[db_data] get_user error: {e}")
         return {**DEFAULT_USER, "user_id": user_id}
 
+    _user_cache.set(user_id, blob)
+    return _decode_user(blob)
+
+
+async def aget_user(user_id: str) -> dict:
+    """get_user의 async 버전. LRU 히트는 이벤트 루프에서 바로 반환, Redis 조회는 cache 스테이지,
+    미스만 DB 스레드 풀 사용."""
+    cached = await _user_cache.aget(user_id)
+    if cached is not None:
+        return _decode_user(cached)
+    return await run_db(_load_user, user_id)
+
+
+def invalidate_user_cache(user_id: Optional[str] = None) -> None:
+    """사용자 컨텍스트 캐시 무효화 (user_id 미지정 시 전체).
+
+    프로필/임베딩 갱신 후 호출 (배치 스크립트는 try_invalidate_user_cache 사용).
+    이 프로세스의 LRU와 공유 Redis에서 제거되며, 다른 프로세스의 LRU는
+    USER_CACHE_TTL 안에 만료되어 Redis/DB에서 다시 읽는다.
+    """
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.delete(user_id)
+
+
+def try_invalidate_user_cache(user_id: Optional[str] = None) -> bool:
+    """invalidate_user_cache를 실패해도 예외 없이 실행 (배치 스크립트의 DB 갱신 후 호출용).
+
+    Redis 장애 등으로 실패하면 경고만 남긴다 (USER_CACHE_TTL 후 반영). 성공 여부 반환.
+    """
+    try:
+        invalidate_user_cache(user_id)
+    except Exception as e:
+        logger.warning(f"[db_data] user cache invalidation failed (expires within USER_CACHE_TTL): {e}")
+        return False
+    logger.info("[db_data] user cache invalidated")
+    return True
+
+
+# ──────────────────────────────────────────
+# 사용자 컨텍스트 캐시
+# ──────────────────────────────────────────
+
+def _encode_user(user_id: str, profile: dict, vector: Optional[np.ndarray]) -> bytes:
+    """{user_id, profile} JSON + '\n' + float32 벡터 바이트 (벡터 없으면 헤더만)"""
+    header = json.dumps({"user_id": user_id, "profile": profile}, ensure_ascii=False).encode("utf-8")
+    body = vector.astype(np.float32, copy=False).tobytes() if vector is not None else b""
+    return header + b"\n" + body
+
+
+def _decode_user(blob: bytes) -> dict:
+    """캐시 blob → get_user 반환 형태. 요청마다 새 dict, 벡터는 blob을 공유하는 읽기 전용 뷰."""
+    header, _, body = blob.partition(b"\n")
+    data = json.loads(header)
+    user = {"user_id": data["user_id"], **data["profile"]}
+    if body:
+        user["long_term_vector"] = np.frombuffer(body, dtype=np.float32)
+    return user
+
+
+# 값은 bytes 한 덩어리라 LRU/Redis 모두 같은 표현을 그대로 저장
+_user_cache = TieredCache(
+    "user_context",
+    maxsize=int(os.getenv("USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("USER_CACHE_TTL", "60")),
+    redis_ttl=float(os.getenv("USER_CACHE_REDIS_TTL", "3600")),
+    serialize=lambda blob: blob,
+    deserialize=lambda blob: blob,
+)
+
 
 # ──────────────────────────────────────────
 # 광고 후보 검색
 # ──────────────────────────────────────────
 
+def _ad_search_sql(vector_expr: str, top_k_param: str) -> str:
+    """광고 벡터 검색 SELECT 문 생성.
+
+    relevance_score = 코사인 유사도 * 0.7 + bid / 10 * 0.3
+
+    - exact:     전체 캠페인에 블렌딩 점수를 계산해 정렬 (HNSW 인덱스 미사용, 전수 스캔)
+    - two_stage: 1단계에서 순수 거리(embedding <=> query) 정렬로 HNSW 인덱스를 타
+                 AD_ANN_SHORTLIST개 후보를 뽑고, 2단계에서 후보만 입찰가 가중 재정렬
+    """
+    blended = (
+        "ROUND(CAST((1 - distance) * 0.7"
+        " + COALESCE((campaign_data->>'bid')::float, 0) / 10.0 * 0.3 AS NUMERIC), 3)"
+    )
+    if AD_RETRIEVAL_MODE == "exact":
+        inner = f"""
+            SELECT campaign_id, brand_id, campaign_data, targeting_rules,
+                   embedding <=> {vector_expr} AS distance
+            FROM campaigns
+            WHERE embedding IS NOT NULL"""
+    else:
+        inner = f"""
+            SELECT campaign_id, brand_id, campaign_data, targeting_rules,
+                   embedding <=> {vector_expr} AS distance
+            FROM campaigns
+            WHERE embedding IS NOT NULL
+            ORDER BY distance
+            LIMIT {AD_ANN_SHORTLIST:d}"""
+    return f"""
+        SELECT campaign_id, brand_id, campaign_data, targeting_rules,
+               {blended} AS relevance_score
+        FROM ({inner}
+        ) shortlist
+        ORDER BY relevance_score DESC
+        LIMIT {top_k_param}"""
+
+
+def _ef_search_sql() -> str:
+    """HNSW 탐색 폭 설정 (트랜잭션 범위). ef_search보다 많은 행은 인덱스가 반환하지 않으므로
+    shortlist 크기 이상으로 맞춘다."""
+    return f"SET LOCAL hnsw.ef_search = {max(HNSW_EF_SEARCH, AD_ANN_SHORTLIST):d};"
+
+
 def retrieve_ad_candidates(
     interests: list,
     prompt: str,
     top_k: int = 3,
-    user_vector: Optional[list] = None,
+    user_vector: Optional[np.ndarray] = None,
 ) -> List[dict]:
     """pgvector 유사도 검색으로 광고 후보 조회.
 
     user_vector가 제공되면 임베딩 API 호출을 생략하고 재사용.
     임베딩이 없으면 키워드 스코어링으로 fallback.
+    AD_RETRIEVAL_MODE에 따라 exact / two_stage(HNSW shortlist → 입찰가 재정렬) 검색.
     """
-    query_vector = user_vector or _generate_embedding(f"{prompt} {' '.join(interests)}")
+    query_vector = _resolve_query_vector(interests, prompt, user_vector)
+
+    index = get_vector_index()
+    if query_vector is not None and index is not None and index.ready("campaigns"):
+        return _index_search_ads(index, query_vector, top_k)
 
     try:
         with get_connection() as conn:
             with conn.cursor() as cur:
-                if query_vector:
+                if query_vector is not None:
                     cur.execute(
-                        """
-                        SELECT campaign_id, brand_id, campaign_data, targeting_rules,
-                               ROUND(CAST(
-                                   (1 - (embedding <=> %s::vector)) * 0.7
-                                   + COALESCE((campaign_data->>'bid')::float, 0) / 10.0 * 0.3
-                               AS NUMERIC), 3) AS relevance_score
-                        FROM campaigns
-                        WHERE embedding IS NOT NULL
-                        ORDER BY relevance_score DESC
-                        LIMIT %s
-                        """,
-                        (query_vector, top_k),
+                        _ef_search_sql() + _ad_search_sql("%(query_vector)s::vector", "%(top_k)s"),
+                        {"query_vector": query_vector, "top_k": top_k},
                     )
                     rows = cur.fetchall()
 
@@ -108,19 +272,12 @@ def retrieve_ad_candidates(
                         logger.info(f"[db_data] ad vector search: {len(rows)} candidates")
                         return [_row_to_ad(row) for row in rows]
 
-                # fallback: 전체 조회 후 키워드 스코어링
-                logger.warning("[db_data] ad embedding not ready, falling back to keyword scoring")
-                cur.execute(
-                    "SELECT campaign_id, brand_id, campaign_data, targeting_rules FROM campaigns"
-                )
-                rows = cur.fetchall()
+                return _fallback_ads(cur, interests, prompt, top_k)
 
     except Exception as e:
         logger.error(f"[db_data] retrieve_ad_candidates error: {e}")
         return []
 
-    return _keyword_score_ads(rows, interests, prompt, top_k)
-
 
 # ──────────────────────────────────────────
 # 관련 상품 검색
@@ -130,18 +287,22 @@ def retrieve_products(
     interests: list,
     prompt: str,
     top_k: int = 3,
-    user_vector: Optional[list] = None,
+    user_vector: Optional[np.ndarray] = None,
 ) -> List[dict]:
     """products 테이블에서 관련 상품 검색.
 
     user_vector가 제공되면 임베딩 API 호출을 생략하고 재사용.
     """
-    query_vector = user_vector or _generate_embedding(f"{prompt} {' '.join(interests)}")
+    query_vector = _resolve_query_vector(interests, prompt, user_vector)
+
+    index = get_vector_index()
+    if query_vector is not None and index is not None and index.ready("products"):
+        return _index_search_products(index, query_vector, top_k)
 
     try:
         with get_connection() as conn:
             with conn.cursor() as cur:
-                if query_vector:
+                if query_vector is not None:
                     cur.execute(
                         """
                         SELECT product_id, brand_id, product_data,
@@ -159,17 +320,12 @@ def retrieve_products(
                         logger.info(f"[db_data] product vector search: {len(rows)} results")
                         return [_row_to_product(row) for row in rows]
 
-                # fallback: 카테고리/키워드 기반
-                logger.warning("[db_data] product embedding not ready, falling back to keyword scoring")
-                cur.execute("SELECT product_id, brand_id, product_data FROM products")
-                rows = cur.fetchall()
+                return _fallback_products(cur, interests, prompt, top_k)
 
     except Exception as e:
         logger.error(f"[db_data] retrieve_products error: {e}")
         return []
 
-    return _keyword_score_products(rows, interests, prompt, top_k)
-
 
 # ──────────────────────────────────────────
 # 참고 콘텐츠 검색
@@ -179,18 +335,22 @@ def retrieve_reference_contents(
     interests: list,
     prompt: str,
     top_k: int = 2,
-    user_vector: Optional[list] = None,
+    user_vector: Optional[np.ndarray] = None,
 ) -> List[dict]:
     """contents 테이블에서 창작 참고용 콘텐츠 검색.
 
     user_vector가 제공되면 임베딩 API 호출을 생략하고 재사용.
     """
-    query_vector = user_vector or _generate_embedding(f"{prompt} {' '.join(interests)}")
+    query_vector = _resolve_query_vector(interests, prompt, user_vector)
+
+    index = get_vector_index()
+    if query_vector is not None and index is not None and index.ready("contents"):
+        return _index_search_contents(index, query_vector, top_k)
 
     try:
         with get_connection() as conn:
             with conn.cursor() as cur:
-                if query_vector:
+                if query_vector is not None:
                     cur.execute(
                         """
                         SELECT content_id, content_type, metadata,
@@ -208,41 +368,347 @@ def retrieve_reference_contents(
                         logger.info(f"[db_data] content vector search: {len(rows)} results")
                         return [_row_to_content(row) for row in rows]
 
-                # fallback: 카테고리 기반 랜덤 샘플
-                cur.execute(
-                    "SELECT content_id, content_type, metadata FROM contents LIMIT %s",
-                    (top_k,),
-                )
-                rows = cur.fetchall()
+                return _fallback_contents(cur, interests, prompt, top_k)
 
     except Exception as e:
         logger.error(f"[db_data] retrieve_reference_contents error: {e}")
         return []
 
-    return [_row_to_content(row) for row in rows]
+
+# ──────────────────────────────────────────
+# 통합 후보 검색 (광고 + 상품 + 콘텐츠, 1 round trip)
+# ──────────────────────────────────────────
+
+def _fused_vector_sql() -> str:
+    return _ef_search_sql() + """
+WITH q AS MATERIALIZED (SELECT %(query_vector)s::vector AS v),
+ads AS (""" + _ad_search_sql("(SELECT v FROM q)", "%(ad_top_k)s") + """
+),
+prods AS (
+    SELECT product_id, brand_id, product_data,
+           ROUND(CAST(1 - (embedding <=> (SELECT v FROM q)) AS NUMERIC), 3) AS similarity
+    FROM products
+    WHERE embedding IS NOT NULL
+    ORDER BY embedding <=> (SELECT v FROM q)
+    LIMIT %(product_top_k)s
+),
+conts AS (
+    SELECT content_id, content_type, metadata,
+           ROUND(CAST(1 - (embedding <=> (SELECT v FROM q)) AS NUMERIC), 3) AS similarity
+    FROM contents
+    WHERE embedding IS NOT NULL
+    ORDER BY embedding <=> (SELECT v FROM q)
+    LIMIT %(content_top_k)s
+)
+SELECT 'ad' AS kind, to_jsonb(ads) AS row FROM ads
+UNION ALL
+SELECT 'product', to_jsonb(prods) FROM prods
+UNION ALL
+SELECT 'content', to_jsonb(conts) FROM conts
+"""
+
+
+def retrieve_all_candidates(
+    interests: list,
+    prompt: str,
+    ad_top_k: int = 3,
+    product_top_k: int = 3,
+    content_top_k: int = 2,
+    user_vector: Optional[np.ndarray] = None,
+) -> dict:
+    """광고/상품/참고 콘텐츠 후보를 단일 쿼리로 조회.
+
+    쿼리 벡터는 CTE로 한 번만 전송하고 세 테이블 검색 결과를 UNION ALL로 합쳐
+    1 round trip에 가져온다. 반환 항목의 형태는 retrieve_* 함수들과 동일.
+    임베딩 결과가 없는 종류만 개별 fallback을 같은 연결에서 수행.
+
+    Returns:
+        {"ads": [...], "products": [...], "contents": [...]}
+    """
+    query_vector = _resolve_query_vector(interests, prompt, user_vector)
+
+    top_ks = {"ad_top_k": ad_top_k, "product_top_k": product_top_k, "content_top_k": content_top_k}
+    result = _search_index_all(query_vector, top_ks)
+    if result is not None:
+        return result
+    return _search_db_all(interests, prompt, query_vector, top_ks)
+
+
+async def aretrieve_all_candidates(
+    interests: list,
+    prompt: str,
+    ad_top_k: int = 3,
+    product_top_k: int = 3,
+    content_top_k: int = 2,
+    user_vector: Optional[np.ndarray] = None,
+) -> dict:
+    """retrieve_all_candidates의 async 버전.
+
+    임베딩 대기와 in-process 인덱스 검색은 이벤트 루프에서, SQL 검색만 DB 스레드 풀에서 실행.
+    """
+    query_vector = await _aresolve_query_vector(interests, prompt, user_vector)
+
+    top_ks = {"ad_top_k": ad_top_k, "product_top_k": product_top_k, "content_top_k": content_top_k}
+    result = _search_index_all(query_vector, top_ks)
+    if result is not None:
+        return result
+    return await run_db(_search_db_all, interests, prompt, query_vector, top_ks)
+
+
+def _search_index_all(query_vector: Optional[np.ndarray], top_ks: dict) -> Optional[dict]:
+    """세 테이블 모두 in-process 인덱스가 준비되었으면 메모리에서 검색, 아니면 None"""
+    index = get_vector_index()
+    if (
+        query_vector is None or index is None
+        or not all(index.ready(t) for t in ("campaigns", "products", "contents"))
+    ):
+        return None
+    return {
+        "ads": _index_search_ads(index, query_vector, top_ks["ad_top_k"]),
+        "products": _index_search_products(index, query_vector, top_ks["product_top_k"]),
+        "contents": _index_search_contents(index, query_vector, top_ks["content_top_k"]),
+    }
+
+
+def _search_db_all(interests: list, prompt: str, query_vector: Optional[np.ndarray], top_ks: dict) -> dict:
+    """통합 SQL 검색 (1 round trip) + 종류별 fallback"""
+    ad_top_k = top_ks["ad_top_k"]
+    product_top_k = top_ks["product_top_k"]
+    content_top_k = top_ks["content_top_k"]
+    result = {"ads": [], "products": [], "contents": []}
+    use_hybrid = HYBRID_SEARCH or query_vector is None
+
+    try:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                if use_hybrid:
+                    rows = _run_hybrid(cur, ("ad", "product", "content"), interests, prompt, query_vector, top_ks)
+                else:
+                    cur.execute(_fused_vector_sql(), {"query_vector": query_vector, **top_ks})
+                    rows = cur.fetchall()
+
+                for row in rows:
+                    if row["kind"] == "ad":
+                        result["ads"].append(_row_to_ad(row["row"]))
+                    elif row["kind"] == "product":
+                        result["products"].append(_row_to_product(row["row"]))
+                    else:
+                        result["contents"].append(_row_to_content(row["row"]))
+
+                logger.info(
+                    f"[db_data] fused {'hybrid' if use_hybrid else 'vector'} search: "
+                    f"ads={len(result['ads'])}, products={len(result['products'])}, "
+                    f"contents={len(result['contents'])}"
+                )
+
+                # 전문 검색을 이미 시도했으면 fallback에서는 생략
+                lexical = not use_hybrid
+                if not result["ads"]:
+                    result["ads"] = _fallback_ads(cur, interests, prompt, ad_top_k, lexical)
+                if not result["products"]:
+                    result["products"] = _fallback_products(cur, interests, prompt, product_top_k, lexical)
+                if not result["contents"]:
+                    result["contents"] = _fallback_contents(cur, interests, prompt, content_top_k, lexical)
+
+    except Exception as e:
+        logger.error(f"[db_data] retrieve_all_candidates error: {e}")
+
+    return result
+
+
+# ──────────────────────────────────────────
+# 하이브리드 검색 (전문 검색 + 벡터, reciprocal rank fusion)
+# ──────────────────────────────────────────
+
+# kind → (테이블, id 컬럼, 반환 컬럼, 점수 컬럼명)
+_HYBRID_SPECS = {
+    "ad": ("campaigns", "campaign_id", "t.campaign_id, t.brand_id, t.campaign_data, t.targeting_rules", "relevance_score"),
+    "product": ("products", "product_id", "t.product_id, t.brand_id, t.product_data", "similarity"),
+    "content": ("contents", "content_id", "t.content_id, t.content_type, t.metadata", "similarity"),
+}
+
+
+def _hybrid_ctes(kind: str) -> str:
+    """kind 하나의 RRF CTE 묶음. 결과는 {kind}_top.
+
+    RRF 점수 = Σ 1 / (RRF_K + rank), 사용한 순위 목록 수로 나눠 [0, 1]로 정규화.
+    광고는 정규화 RRF를 코사인 유사도 자리에 넣어 기존과 같은 입찰가 가중(0.7 / 0.3) 적용.
+    """
+    table, id_col, columns, score_col = _HYBRID_SPECS[kind]
+    rrf = "f.rrf * (%(rrf_k)s + 1) / %(rrf_lists)s"
+    if kind == "ad":
+        score = (
+            f"ROUND(CAST(({rrf}) * 0.7"
+            " + COALESCE((t.campaign_data->>'bid')::float, 0) / 10.0 * 0.3 AS NUMERIC), 3)"
+        )
+    else:
+        score = f"ROUND(CAST({rrf} AS NUMERIC), 3)"
+
+    return f"""
+{kind}_vec AS (
+    SELECT {id_col}, row_number() OVER (ORDER BY distance) AS rnk
+    FROM (
+        SELECT {id_col}, embedding <=> (SELECT v FROM q) AS distance
+        FROM {table}
+        WHERE %(has_vector)s AND embedding IS NOT NULL
+        ORDER BY distance
+        LIMIT %(rrf_pool)s
+    ) s
+),
+{kind}_lex AS (
+    SELECT {id_col}, row_number() OVER (ORDER BY lex_rank DESC) AS rnk
+    FROM (
+        SELECT {id_col}, ts_rank_cd(search_tsv, (SELECT tq FROM q)) AS lex_rank
+        FROM {table}
+        WHERE search_tsv @@ (SELECT tq FROM q)
+        ORDER BY lex_rank DESC
+        LIMIT %(rrf_pool)s
+    ) s
+),
+{kind}_rrf AS (
+    SELECT {id_col}, SUM(1.0 / (%(rrf_k)s + rnk)) AS rrf
+    FROM (SELECT * FROM {kind}_vec UNION ALL SELECT * FROM {kind}_lex) u
+    GROUP BY {id_col}
+),
+{kind}_top AS (
+    SELECT {columns}, {score} AS {score_col}
+    FROM {kind}_rrf f JOIN {table} t USING ({id_col})
+    ORDER BY {score_col} DESC
+    LIMIT %({kind}_top_k)s
+)"""
+
+
+def _hybrid_sql(kinds) -> str:
+    return (
+        _ef_search_sql()
+        + "\nWITH q AS MATERIALIZED (SELECT %(query_vector)s::vector AS v,"
+        + " to_tsquery('simple', %(tsquery)s) AS tq),"
+        + ",".join(_hybrid_ctes(kind) for kind in kinds)
+        + "\n"
+        + "\nUNION ALL\n".join(
+            f"SELECT '{kind}' AS kind, to_jsonb({kind}_top) AS row FROM {kind}_top" for kind in kinds
+        )
+    )
+
+
+def _run_hybrid(cur, kinds, interests: list, prompt: str, query_vector, top_ks: dict) -> list:
+    """하이브리드(벡터 없으면 전문 검색 전용) 쿼리 실행. 실패 시 빈 목록.
+
+    search_tsv 컬럼이 없는 DB 등에서 실패해도 같은 트랜잭션의 fallback이
+    이어질 수 있도록 savepoint로 감싼다.
+    """
+    params = {
+        "query_vector": query_vector,
+        "has_vector": query_vector is not None,
+        "tsquery": _to_tsquery(prompt, " ".join(interests)),
+        "rrf_k": RRF_K,
+        "rrf_pool": HYBRID_CANDIDATE_POOL,
+        "rrf_lists": 2 if query_vector is not None else 1,
+        **top_ks,
+    }
+    cur.execute("SAVEPOINT hybrid_search")
+    try:
+        cur.execute(_hybrid_sql(kinds), params)
+        rows = cur.fetchall()
+        cur.execute("RELEASE SAVEPOINT hybrid_search")
+        return rows
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT hybrid_search")
+        logger.warning(f"[db_data] hybrid search failed: {e}")
+        return []
+
+
+def _to_tsquery(*texts: str) -> str:
+    """프롬프트/관심사 토큰을 OR + 접두 일치 tsquery 문자열로 변환"""
+    terms: List[str] = []
+    for text in texts:
+        for token in _TOKEN_RE.findall(text.lower()):
+            if token not in terms:
+                terms.append(token)
+    return " | ".join(f"{t}:*" for t in terms[:_MAX_QUERY_TERMS])
 
 
 # ──────────────────────────────────────────
 # 임베딩 생성
 # ──────────────────────────────────────────
 
-def _generate_embedding(text: str) -> list:
-    """Vertex AI text-embedding-004 로 쿼리 임베딩 생성."""
+def _resolve_query_vector(
+    interests: list,
+    prompt: str,
+    user_vector: Optional[np.ndarray],
+) -> Optional[np.ndarray]:
+    """user_vector가 있으면 재사용, 없으면 프롬프트+관심사로 쿼리 임베딩 생성."""
+    if user_vector is not None and len(user_vector):
+        return user_vector
+    return _generate_embedding(f"{prompt} {' '.join(interests)}")
+
+
+def _generate_embedding(text: str) -> Optional[np.ndarray]:
+    """쿼리 임베딩 생성 (기본: Vertex AI text-embedding-004). 실패 시 None.
+
+    (정규화 텍스트, 모델명) 키로 LRU → Redis 캐시를 먼저 조회하고,
+    미스면 임베딩 서비스에 요청 (동시 요청은 서비스에서 배치로 묶임).
+    """
     try:
-        import vertexai
-        from vertexai.language_models import TextEmbeddingInput, TextEmbeddingModel
+        service = get_embedding_service()
+        key = _embedding_cache_key(text, service.model_name)
+        cached = _embedding_cache.get(key)
+        if cached is not None:
+            return cached
+
+        vector = _to_vector(service.embed(text, "RETRIEVAL_QUERY"))
+    except Exception as e:
+        logger.warning(f"[db_data] embedding generation failed: {e}")
+        return None
+
+    _embedding_cache.set(key, vector)
+    return vector
 
-        project_id = os.getenv("GCP_PROJECT_ID", "")
-        region = os.getenv("GCP_REGION", "us-central1")
-        model_name = os.getenv("VERTEX_AI_EMBEDDING_MODEL", "text-embedding-004")
 
-        vertexai.init(project=project_id, location=region)
-        model = TextEmbeddingModel.from_pretrained(model_name)
-        result = model.get_embeddings([TextEmbeddingInput(text, "RETRIEVAL_QUERY")])
-        return result[0].values
+async def _aresolve_query_vector(
+    interests: list,
+    prompt: str,
+    user_vector: Optional[np.ndarray],
+) -> Optional[np.ndarray]:
+    if user_vector is not None and len(user_vector):
+        return user_vector
+    return await _agenerate_embedding(f"{prompt} {' '.join(interests)}")
+
+
+async def _agenerate_embedding(text: str) -> Optional[np.ndarray]:
+    """_generate_embedding의 async 버전. 배치 결과를 Future로 기다려 스레드를 점유하지 않음."""
+    try:
+        service = get_embedding_service()
+        key = _embedding_cache_key(text, service.model_name)
+        cached = await _embedding_cache.aget(key)
+        if cached is not None:
+            return cached
+
+        future = service.submit(text, "RETRIEVAL_QUERY")
+        vector = _to_vector(await asyncio.wait_for(asyncio.wrap_future(future), service.timeout))
     except Exception as e:
         logger.warning(f"[db_data] embedding generation failed: {e}")
-        return []
+        return None
+
+    await _embedding_cache.aset(key, vector)
+    return vector
+
+
+def _embedding_cache_key(text: str, model_name: str) -> str:
+    """공백/대소문자 정규화 텍스트 + 모델명 해시"""
+    normalized = " ".join(text.split()).casefold()
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+_embedding_cache = TieredCache(
+    "query_embedding",
+    maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("EMBEDDING_CACHE_TTL", "3600")),
+    redis_ttl=float(os.getenv("EMBEDDING_CACHE_REDIS_TTL", "86400")),
+    serialize=lambda v: v.astype(np.float32).tobytes(),
+    deserialize=lambda b: np.frombuffer(b, dtype=np.float32),
+)
 
 
 # ──────────────────────────────────────────
@@ -295,72 +761,91 @@ def _row_to_content(row) -> dict:
 
 
 # ──────────────────────────────────────────
-# 키워드 스코어링 fallback
+# In-process 벡터 인덱스 검색 (VECTOR_INDEX_ENABLED=true, 인덱스 준비 완료 시)
 # ──────────────────────────────────────────
 
-def _keyword_score_ads(rows, interests: list, prompt: str, top_k: int) -> List[dict]:
-    prompt_lower = prompt.lower()
-    scored = []
-
-    for row in rows:
-        data = row["campaign_data"] or {}
-        rules = row["targeting_rules"] or {}
-        tags = rules.get("tags", [])
-        score = 0.0
+def _index_search_ads(index, query_vector: np.ndarray, top_k: int) -> List[dict]:
+    """SQL 경로와 같은 점수식: shortlist(코사인) → 입찰가 가중 재정렬"""
+    shortlist = AD_ANN_SHORTLIST if AD_RETRIEVAL_MODE != "exact" else 1 << 31
+    ads = []
+    for row, similarity in index.search("campaigns", query_vector, shortlist):
+        bid = float((row.get("campaign_data") or {}).get("bid", 0) or 0)
+        score = round(similarity * 0.7 + bid / 10.0 * 0.3, 3)
+        ads.append(_row_to_ad({**row, "relevance_score": score}))
+    ads.sort(key=lambda x: x["relevance_score"], reverse=True)
+    logger.info(f"[db_data] ad index search: {min(len(ads), top_k)} candidates")
+    return ads[:top_k]
 
-        for interest in interests:
-            if interest in tags:
-                score += 0.4
-        for tag in tags:
-            if tag in prompt_lower:
-                score += 0.3
-        if data.get("category", "") in prompt_lower:
-            score += 0.2
-        score += float(data.get("bid", 0)) / 10.0
 
-        ad = _row_to_ad(row)
-        ad["relevance_score"] = round(score, 3)
-        scored.append(ad)
+def _index_search_products(index, query_vector: np.ndarray, top_k: int) -> List[dict]:
+    return [
+        _row_to_product({**row, "similarity": round(similarity, 3)})
+        for row, similarity in index.search("products", query_vector, top_k)
+    ]
 
-    scored.sort(key=lambda x: x["relevance_score"], reverse=True)
-    return scored[:top_k]
 
+def _index_search_contents(index, query_vector: np.ndarray, top_k: int) -> List[dict]:
+    return [
+        _row_to_content({**row, "similarity": round(similarity, 3)})
+        for row, similarity in index.search("contents", query_vector, top_k)
+    ]
 
-def _keyword_score_products(rows, interests: list, prompt: str, top_k: int) -> List[dict]:
-    prompt_lower = prompt.lower()
-    scored = []
 
-    for row in rows:
-        data = row["product_data"] or {}
-        score = 0.0
-        category = data.get("category", "")
-
-        if category in interests:
-            score += 0.4
-        if category in prompt_lower:
-            score += 0.3
-        if data.get("brand", "").lower() in prompt_lower:
-            score += 0.2
-
-        product = _row_to_product(row)
-        product["similarity"] = round(score, 3)
-        scored.append(product)
+# ──────────────────────────────────────────
+# 임베딩 미준비 시 fallback (호출자의 커서 재사용)
+# ──────────────────────────────────────────
 
-    scored.sort(key=lambda x: x["similarity"], reverse=True)
-    return scored[:top_k]
+def _fallback_ads(cur, interests: list, prompt: str, top_k: int, lexical: bool = True) -> List[dict]:
+    """전문 검색 → 캐시된 태그/카테고리 역색인 키워드 스코어링 순으로 시도"""
+    logger.warning("[db_data] ad embedding not ready, falling back to lexical/keyword search")
+    if lexical:
+        rows = _run_hybrid(cur, ("ad",), interests, prompt, None, {"ad_top_k": top_k})
+        if rows:
+            return [_row_to_ad(row["row"]) for row in rows]
+
+    index = get_keyword_index(cur, "campaigns")
+    return [
+        _row_to_ad({**row, "relevance_score": score})
+        for row, score in index.top_k(interests, prompt, top_k)
+    ]
+
+
+def _fallback_products(cur, interests: list, prompt: str, top_k: int, lexical: bool = True) -> List[dict]:
+    """전문 검색 → 캐시된 카테고리/브랜드 역색인 키워드 스코어링 순으로 시도"""
+    logger.warning("[db_data] product embedding not ready, falling back to lexical/keyword search")
+    if lexical:
+        rows = _run_hybrid(cur, ("product",), interests, prompt, None, {"product_top_k": top_k})
+        if rows:
+            return [_row_to_product(row["row"]) for row in rows]
+
+    index = get_keyword_index(cur, "products")
+    return [
+        _row_to_product({**row, "similarity": score})
+        for row, score in index.top_k(interests, prompt, top_k)
+    ]
+
+
+def _fallback_contents(cur, interests: list, prompt: str, top_k: int, lexical: bool = True) -> List[dict]:
+    """전문 검색 → 샘플 순으로 시도"""
+    if lexical:
+        rows = _run_hybrid(cur, ("content",), interests, prompt, None, {"content_top_k": top_k})
+        if rows:
+            return [_row_to_content(row["row"]) for row in rows]
+
+    cur.execute(
+        "SELECT content_id, content_type, metadata FROM contents LIMIT %s",
+        (top_k,),
+    )
+    return [_row_to_content(row) for row in cur.fetchall()]
 
 
 # ──────────────────────────────────────────
 # 유틸
 # ──────────────────────────────────────────
 
-def _to_list(vector) -> list:
-    """pgvector 반환값을 Python list로 변환."""
-    if isinstance(vector, list):
-        return vector
-    if hasattr(vector, "tolist"):
-        return vector.tolist()
+def _to_vector(vector) -> np.ndarray:
+    """pgvector 반환값/임베딩 결과를 float32 연속 배열로 변환."""
     if isinstance(vector, str):
-        import ast
-        return ast.literal_eval(vector)
-    return list(vector)
+        # pgvector 타입 미등록 연결에서 텍스트('[0.1,0.2,...]')로 받은 경우
+        return np.fromstring(vector.strip("[]"), dtype=np.float32, sep=",")
+    return np.ascontiguousarray(vector, dtype=np.float32)
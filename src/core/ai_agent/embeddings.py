@@ -0,0 +1,253 @@
+"""
+쿼리 임베딩 서비스 (마이크로 배칭)
+
+동시에 들어온 embed() 호출을 짧은 시간 창(EMBEDDING_BATCH_WINDOW_MS) 동안 모아
+백엔드에 한 번의 배치 호출로 보내고 결과를 각 호출자에게 돌려준다.
+모델 핸들은 백엔드 인스턴스에 한 번만 로드해 재사용.
+
+환경변수:
+    EMBEDDING_BACKEND=vertex | local     local은 결정적 해시 임베더 (오프라인 테스트용)
+    VERTEX_AI_EMBEDDING_MODEL=text-embedding-004
+    EMBEDDING_DIM=768                    local 백엔드 차원 (DB vector(768)과 일치)
+    EMBEDDING_BATCH_WINDOW_MS=10         첫 요청 후 배치를 모으는 최대 대기 시간
+    EMBEDDING_MAX_BATCH_SIZE=20          배치당 최대 입력 수 (scripts/seed_demo_data.py와 동일)
+    EMBEDDING_TIMEOUT_SECONDS=10         호출자 대기 최대 시간
+"""
+import hashlib
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ──────────────────────────────────────────
+# 백엔드
+# ──────────────────────────────────────────
+
+class EmbeddingBackend(ABC):
+    """임베딩 백엔드 공통 인터페이스"""
+
+    @abstractmethod
+    def embed_batch(self, texts: List[str], task_type: str = "RETRIEVAL_QUERY") -> List[np.ndarray]:
+        """텍스트 목록 → float32 벡터 목록 (입력 순서 유지)"""
+        pass
+
+    @property
+    @abstractmethod
+    def model_name(self) -> str:
+        """캐시 키에 쓰이는 모델 식별자"""
+        pass
+
+
+class VertexEmbeddingBackend(EmbeddingBackend):
+    """Vertex AI text-embedding-004 백엔드 (모델 핸들 지연 로드 후 재사용)"""
+
+    def __init__(self):
+        self.project_id = os.getenv("GCP_PROJECT_ID", "")
+        self.region = os.getenv("GCP_REGION", "us-central1")
+        self._model_name = os.getenv("VERTEX_AI_EMBEDDING_MODEL", "text-embedding-004")
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import vertexai
+                    from vertexai.language_models import TextEmbeddingModel
+
+                    vertexai.init(project=self.project_id, location=self.region)
+                    self._model = TextEmbeddingModel.from_pretrained(self._model_name)
+                    logger.info(f"[embeddings] Vertex model loaded: {self._model_name}")
+        return self._model
+
+    def embed_batch(self, texts: List[str], task_type: str = "RETRIEVAL_QUERY") -> List[np.ndarray]:
+        from vertexai.language_models import TextEmbeddingInput
+
+        model = self._get_model()
+        result = model.get_embeddings([TextEmbeddingInput(t, task_type) for t in texts])
+        return [np.asarray(e.values, dtype=np.float32) for e in result]
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+
+class LocalHashEmbeddingBackend(EmbeddingBackend):
+    """결정적 로컬 임베더 (feature hashing)
+
+    토큰마다 sha256 해시로 차원/부호를 정해 누적 후 L2 정규화.
+    같은 텍스트는 항상 같은 벡터, 토큰이 겹칠수록 코사인 유사도가 높다.
+    네트워크/GCP 인증 없이 오프라인 테스트에서 Vertex를 대체.
+    """
+
+    _TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or int(os.getenv("EMBEDDING_DIM", "768"))
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in self._TOKEN_RE.findall(text.casefold()):
+            digest = hashlib.sha256(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_batch(self, texts: List[str], task_type: str = "RETRIEVAL_QUERY") -> List[np.ndarray]:
+        return [self._embed_one(t) for t in texts]
+
+    @property
+    def model_name(self) -> str:
+        return f"local-hash-{self.dim}"
+
+
+# ──────────────────────────────────────────
+# 마이크로 배칭 서비스
+# ──────────────────────────────────────────
+
+class EmbeddingService:
+    """동시 embed() 호출을 배치로 묶어 백엔드에 전달"""
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        batch_window_ms: float = 10.0,
+        max_batch_size: int = 20,
+        timeout: float = 10.0,
+    ):
+        self.backend = backend
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+
+        self._queue: "queue.Queue[tuple]" = queue.Queue()   # (text, task_type, Future)
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "backend_inputs": 0, "errors": 0}
+
+    @property
+    def model_name(self) -> str:
+        return self.backend.model_name
+
+    def embed(self, text: str, task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        """단일 텍스트 임베딩 (배치에 합류해 결과를 기다림)"""
+        return self.submit(text, task_type).result(timeout=self.timeout)
+
+    def submit(self, text: str, task_type: str = "RETRIEVAL_QUERY") -> Future:
+        """배치에 합류만 하고 Future 반환 (async 호출자는 asyncio.wrap_future로 대기)"""
+        future: Future = Future()
+        self._queue.put((text, task_type, future))
+        with self._stats_lock:
+            self._stats["requests"] += 1
+        return future
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                # 워커 스레드가 죽으면 이후 모든 embed()가 timeout까지 멈추므로 어떤 예외도 루프 밖으로 내보내지 않음
+                logger.error(f"[embedding] batch dispatch failed: {e}")
+
+    def _dispatch(self, batch: List[tuple]) -> None:
+        # task_type별로 나누고, 같은 텍스트는 한 번만 백엔드에 보냄.
+        # 호출자가 이미 포기한(취소된) 요청은 제외하고, 나머지는 running으로 표시해 이후 취소를 막음
+        groups: dict = {}
+        for text, task_type, future in batch:
+            if future.set_running_or_notify_cancel():
+                groups.setdefault(task_type, {}).setdefault(text, []).append(future)
+
+        for task_type, by_text in groups.items():
+            texts = list(by_text)
+            try:
+                vectors = self.backend.embed_batch(texts, task_type)
+            except Exception as e:
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+                for futures in by_text.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["backend_inputs"] += len(texts)
+            for text, vector in zip(texts, vectors):
+                for future in by_text[text]:
+                    future.set_result(vector)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = (
+            round(stats["backend_inputs"] / stats["batches"], 2) if stats["batches"] else 0.0
+        )
+        stats["backend"] = self.model_name
+        return stats
+
+
+# 싱글턴
+_service_instance: Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """싱글턴 임베딩 서비스 반환"""
+    global _service_instance
+
+    if _service_instance is None:
+        with _service_lock:
+            if _service_instance is None:
+                backend_name = os.getenv("EMBEDDING_BACKEND", "vertex").lower()
+                if backend_name == "local":
+                    backend: EmbeddingBackend = LocalHashEmbeddingBackend()
+                elif backend_name == "vertex":
+                    backend = VertexEmbeddingBackend()
+                else:
+                    raise ValueError(
+                        f"Unknown EMBEDDING_BACKEND='{backend_name}'. "
+                        "Valid options: 'vertex', 'local'"
+                    )
+                _service_instance = EmbeddingService(
+                    backend,
+                    batch_window_ms=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10")),
+                    max_batch_size=int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "20")),
+                    timeout=float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", "10")),
+                )
+                logger.info(f"Embedding service: {backend.model_name}")
+
+    return _service_instance
+
+
+def set_embedding_service(service: Optional[EmbeddingService]) -> None:
+    """백엔드 교체용 (테스트에서 LocalHashEmbeddingBackend 주입 등)"""
+    global _service_instance
+    _service_instance = service
+
+
+def reset_embedding_service() -> None:
+    """테스트용 초기화"""
+    set_embedding_service(None)
@@ -0,0 +1,609 @@
+"""
+비동기 생성 작업 (POST /v1/ai/jobs)
+
+영상 생성(Veo)은 수 분이 걸려 HTTP 요청을 끝까지 붙잡고 있으면 API 워커 용량을 영상 트래픽이 잠식한다.
+작업 API는 요청을 작업으로 저장하고 job_id를 바로 반환한 뒤, 같은 프로세스의 백그라운드 태스크로
+생성을 실행한다. 클라이언트는 GET /v1/ai/jobs/{job_id} 폴링 또는 webhook_url 콜백으로 결과를 받는다.
+
+상태:
+    queued → running → succeeded | failed
+
+재시작 내구성:
+    - 작업 행은 상태가 바뀔 때와 실행 중 JOB_HEARTBEAT_SECONDS마다 updated_at을 갱신 (heartbeat)
+    - Veo operation을 시작하면 OperationTracker로 operation 이름을 작업 행에 저장
+    - 복구 루프가 JOB_STALE_SECONDS 동안 heartbeat가 없는 queued/running 작업을 원자적으로 가져와 재실행
+        · 그래프는 작업의 generation_id 체크포인트로 완료된 단계를 건너뜀 (checkpoint.py)
+        · media_generator는 저장된 operation을 새로 시작하지 않고 이어서 폴링 (vertex_veo.py)
+    - JOB_MAX_ATTEMPTS번 넘게 재개된 작업은 failed 처리 (매번 프로세스를 죽이는 작업 무한 반복 방지)
+
+백엔드 (JOB_STORE):
+    sqlite    로컬 파일 (기본, JOB_STORE_PATH)
+    postgres  agent_jobs 테이블 (scripts/init_db.sql, 여러 인스턴스가 공유·복구)
+
+환경변수:
+    JOB_STORE=sqlite
+    JOB_STORE_PATH=/tmp/ai_agent_jobs.sqlite3
+    JOB_HEARTBEAT_SECONDS=30
+    JOB_STALE_SECONDS=90
+    JOB_RECOVERY_INTERVAL_SECONDS=30
+    JOB_MAX_ATTEMPTS=3
+    JOB_MAX_ACTIVE=64               이 프로세스에서 동시에 대기/실행하는 작업 상한 (초과 제출은 JobQueueFull → 429)
+    JOB_RETENTION_SECONDS=604800    끝난 작업 보관 기간
+    JOB_WEBHOOK_TIMEOUT_SECONDS=10
+    JOB_WEBHOOK_RETRIES=3
+    JOB_WEBHOOK_SECRET=              설정 시 X-Webhook-Signature: sha256=<HMAC-SHA256(본문)> 헤더 추가
+    JOB_WEBHOOK_ALLOWED_HOSTS=       쉼표 구분 허용 호스트 (하위 도메인 포함). 설정 시 이 호스트로만 전송
+
+webhook 대상 제한 (SSRF 방지, check_webhook_url):
+    허용 목록이 없으면 호스트가 해석되는 모든 주소가 공인 주소여야 한다 (사설 / loopback / link-local /
+    메타데이터 169.254.169.254 등 거부). 제출 시점과 전송 직전에 모두 검사하고, 리다이렉트는 따라가지 않는다.
+"""
+import asyncio
+import datetime
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, List, Optional, Set
+
+from src.core.http_client import ahttp_request
+
+from .media_providers.base import OperationTracker, track_operations
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE_BACKEND = os.getenv("JOB_STORE", "sqlite").lower()  # sqlite | postgres
+HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "90"))
+RECOVERY_INTERVAL_SECONDS = float(os.getenv("JOB_RECOVERY_INTERVAL_SECONDS", "30"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+MAX_ACTIVE = int(os.getenv("JOB_MAX_ACTIVE", "64"))
+RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "604800"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("JOB_WEBHOOK_TIMEOUT_SECONDS", "10"))
+WEBHOOK_RETRIES = int(os.getenv("JOB_WEBHOOK_RETRIES", "3"))
+WEBHOOK_SECRET = os.getenv("JOB_WEBHOOK_SECRET", "")
+WEBHOOK_ALLOWED_HOSTS = frozenset(
+    host.strip().lower().rstrip(".")
+    for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# 복구 대상 (아직 끝나지 않은 상태)
+_UNFINISHED = (QUEUED, RUNNING)
+# JSON으로 저장하는 컬럼
+_JSON_FIELDS = ("request", "operation", "result")
+_COLUMNS = (
+    "job_id", "user_id", "status", "request", "webhook_url",
+    "operation", "result", "error", "attempts", "created_at", "updated_at",
+)
+
+
+class JobStore(ABC):
+    """job_id → 작업 행(dict) 저장소. request / operation / result는 dict로 주고받음."""
+
+    @abstractmethod
+    def create(self, job: dict) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def update(self, job_id: str, fields: dict) -> None:
+        """fields 반영 + updated_at 갱신 (fields가 비어 있으면 heartbeat)"""
+        pass
+
+    @abstractmethod
+    def claim_stale(self, older_than: float, limit: int) -> List[dict]:
+        """updated_at이 older_than(epoch 초) 이전인 미완료 작업을 가져감.
+
+        가져간 작업은 updated_at 갱신 + attempts 1 증가가 원자적으로 적용되어
+        다른 프로세스의 복구 루프가 같은 작업을 중복으로 가져가지 않는다.
+        """
+        pass
+
+    @abstractmethod
+    def purge(self, older_than: float) -> None:
+        """updated_at이 older_than 이전인 끝난 작업 삭제"""
+        pass
+
+    async def acreate(self, job: dict) -> None:
+        await asyncio.to_thread(self.create, job)
+
+    async def aget(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get, job_id)
+
+    async def aupdate(self, job_id: str, fields: dict) -> None:
+        await asyncio.to_thread(self.update, job_id, fields)
+
+    async def aclaim_stale(self, older_than: float, limit: int) -> List[dict]:
+        return await asyncio.to_thread(self.claim_stale, older_than, limit)
+
+    async def apurge(self, older_than: float) -> None:
+        await asyncio.to_thread(self.purge, older_than)
+
+
+class SqliteJobStore(JobStore):
+    """로컬 SQLite 파일 저장소 (단일 호스트, 프로세스 간 공유 가능)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("JOB_STORE_PATH", "/tmp/ai_agent_jobs.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS agent_jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " user_id TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " request TEXT NOT NULL,"
+            " webhook_url TEXT,"
+            " operation TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_agent_jobs_status_updated ON agent_jobs(status, updated_at)"
+        )
+        logger.info(f"[jobs] sqlite store: {self.path}")
+
+    def create(self, job: dict) -> None:
+        row = _encode(job)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO agent_jobs ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [row[c] for c in _COLUMNS],
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM agent_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _decode(dict(row)) if row else None
+
+    def update(self, job_id: str, fields: dict) -> None:
+        row = _encode(fields)
+        row["updated_at"] = time.time()
+        assignments = ", ".join(f"{c} = ?" for c in row)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE agent_jobs SET {assignments} WHERE job_id = ?", [*row.values(), job_id]
+            )
+
+    def claim_stale(self, older_than: float, limit: int) -> List[dict]:
+        with self._lock:
+            # IMMEDIATE: 같은 파일을 쓰는 다른 프로세스와 조회~갱신 사이 경합 방지
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM agent_jobs WHERE status IN (?, ?) AND updated_at < ?"
+                    " ORDER BY updated_at LIMIT ?",
+                    (*_UNFINISHED, older_than, limit),
+                ).fetchall()
+                now = time.time()
+                for row in rows:
+                    self._conn.execute(
+                        "UPDATE agent_jobs SET updated_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                        (now, row["job_id"]),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        jobs = []
+        for row in rows:
+            job = _decode(dict(row))
+            job["attempts"] += 1
+            jobs.append(job)
+        return jobs
+
+    def purge(self, older_than: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM agent_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, older_than),
+            )
+
+
+class PostgresJobStore(JobStore):
+    """PostgreSQL agent_jobs 테이블 저장소 (여러 API 인스턴스가 공유, 죽은 인스턴스의 작업을 다른 인스턴스가 복구)"""
+
+    _SELECT = (
+        "SELECT job_id, user_id, status, request, webhook_url, operation, result, error, attempts,"
+        " EXTRACT(EPOCH FROM created_at) AS created_at, EXTRACT(EPOCH FROM updated_at) AS updated_at"
+        " FROM agent_jobs"
+    )
+
+    def create(self, job: dict) -> None:
+        from src.core.db import get_connection
+
+        row = _encode(job)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "INSERT INTO agent_jobs"
+                    " (job_id, user_id, status, request, webhook_url, attempts, created_at, updated_at)"
+                    " VALUES (%s, %s, %s, %s, %s, %s, to_timestamp(%s), to_timestamp(%s))",
+                    (row["job_id"], row["user_id"], row["status"], row["request"], row["webhook_url"],
+                     row["attempts"], row["created_at"], row["updated_at"]),
+                )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        from src.core.db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"{self._SELECT} WHERE job_id = %s", (job_id,))
+                row = cur.fetchone()
+        return _decode(dict(row)) if row else None
+
+    def update(self, job_id: str, fields: dict) -> None:
+        from src.core.db import get_connection
+
+        row = _encode(fields)
+        assignments = "".join(f"{c} = %s, " for c in row)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"UPDATE agent_jobs SET {assignments}updated_at = now() WHERE job_id = %s",
+                    (*row.values(), job_id),
+                )
+
+    def claim_stale(self, older_than: float, limit: int) -> List[dict]:
+        from src.core.db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                # SKIP LOCKED: 여러 인스턴스의 복구 루프가 동시에 돌아도 작업을 나눠 가짐
+                cur.execute(
+                    "UPDATE agent_jobs SET updated_at = now(), attempts = attempts + 1"
+                    " WHERE job_id IN ("
+                    "   SELECT job_id FROM agent_jobs"
+                    "   WHERE status = ANY(%s) AND updated_at < to_timestamp(%s)"
+                    "   ORDER BY updated_at LIMIT %s FOR UPDATE SKIP LOCKED)"
+                    " RETURNING job_id, user_id, status, request, webhook_url, operation, result, error,"
+                    " attempts, EXTRACT(EPOCH FROM created_at) AS created_at,"
+                    " EXTRACT(EPOCH FROM updated_at) AS updated_at",
+                    (list(_UNFINISHED), older_than, limit),
+                )
+                rows = cur.fetchall()
+        return [_decode(dict(row)) for row in rows]
+
+    def purge(self, older_than: float) -> None:
+        from src.core.db import get_connection
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM agent_jobs WHERE status = ANY(%s) AND updated_at < to_timestamp(%s)",
+                    ([SUCCEEDED, FAILED], older_than),
+                )
+
+    # DB 대기는 전용 DB 스레드 풀에서 (db.run_db)
+    async def acreate(self, job: dict) -> None:
+        from src.core.db import run_db
+        await run_db(self.create, job)
+
+    async def aget(self, job_id: str) -> Optional[dict]:
+        from src.core.db import run_db
+        return await run_db(self.get, job_id)
+
+    async def aupdate(self, job_id: str, fields: dict) -> None:
+        from src.core.db import run_db
+        await run_db(self.update, job_id, fields)
+
+    async def aclaim_stale(self, older_than: float, limit: int) -> List[dict]:
+        from src.core.db import run_db
+        return await run_db(self.claim_stale, older_than, limit)
+
+    async def apurge(self, older_than: float) -> None:
+        from src.core.db import run_db
+        await run_db(self.purge, older_than)
+
+
+def _encode(fields: dict) -> dict:
+    row = dict(fields)
+    for key in _JSON_FIELDS:
+        if key in row and row[key] is not None:
+            row[key] = json.dumps(row[key], ensure_ascii=False)
+    return row
+
+
+def _decode(row: dict) -> dict:
+    for key in _JSON_FIELDS:
+        if row.get(key) is not None:
+            row[key] = json.loads(row[key])
+    for key in ("created_at", "updated_at"):
+        row[key] = float(row[key])
+    return row
+
+
+# ──────────────────────────────────────────
+# 실행기
+# ──────────────────────────────────────────
+
+JobExecutor = Callable[[dict], Awaitable[dict]]
+
+
+class JobQueueFull(Exception):
+    """대기/실행 중인 작업이 JOB_MAX_ACTIVE에 도달해 새 작업을 받을 수 없음"""
+
+
+class JobManager:
+    """작업 제출 / 백그라운드 실행 / heartbeat / 죽은 작업 복구 / webhook 알림
+
+    executor(job) → 결과 dict. 실패는 예외로 알리며, 예외의 detail(HTTPException) 또는 메시지가
+    작업의 error가 된다.
+    """
+
+    def __init__(self, store: JobStore, executor: JobExecutor, max_active: int = MAX_ACTIVE):
+        self.store = store
+        self.executor = executor
+        self.max_active = max(1, max_active)
+        self._tasks: Set[asyncio.Task] = set()
+        self._running: Set[str] = set()
+        self._recovery_task: Optional[asyncio.Task] = None
+        self.submitted = 0
+        self.resumed = 0
+        self.succeeded = 0
+        self.failed = 0
+
+    async def submit(self, user_id: str, request: dict, webhook_url: Optional[str] = None) -> dict:
+        """작업 저장 후 실행 시작. 저장된 작업 행 반환.
+
+        대기/실행 중인 작업이 max_active개면 저장하지 않고 JobQueueFull (미디어 slot 앞에 무한히 쌓이지 않도록).
+        """
+        if len(self._tasks) >= self.max_active:
+            raise JobQueueFull(f"active jobs limit reached ({self.max_active})")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        # 재개 시 완료된 그래프 단계를 건너뛰도록 작업마다 고정 generation_id
+        request = {**request, "generation_id": request.get("generation_id") or f"job_{job_id}"}
+        job = {
+            "job_id": job_id,
+            "user_id": user_id,
+            "status": QUEUED,
+            "request": request,
+            "webhook_url": webhook_url,
+            "operation": None,
+            "result": None,
+            "error": None,
+            "attempts": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        await self.store.acreate(job)
+        self.submitted += 1
+        logger.info(f"[jobs] submitted {job_id} (user_id={user_id})")
+        self._spawn(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.store.aget(job_id)
+
+    def start_recovery(self) -> None:
+        """죽은 작업 복구 루프 시작 (앱 startup에서 호출)"""
+        if self._recovery_task is None:
+            self._recovery_task = asyncio.ensure_future(self._recovery_loop())
+
+    async def stop(self) -> None:
+        """복구 루프와 실행 중 작업 중단. 중단된 작업은 heartbeat가 끊겨 다음 프로세스가 재개."""
+        tasks = list(self._tasks)
+        if self._recovery_task is not None:
+            tasks.append(self._recovery_task)
+            self._recovery_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "active": len(self._tasks),
+            "max_active": self.max_active,
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "resumed": self.resumed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+        }
+
+    def _spawn(self, job: dict) -> None:
+        task = asyncio.ensure_future(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: dict) -> None:
+        job_id = job["job_id"]
+        self._running.add(job_id)
+        heartbeat = asyncio.ensure_future(self._heartbeat(job_id))
+
+        async def record_operation(info: dict) -> None:
+            job["operation"] = info
+            await self.store.aupdate(job_id, {"operation": info})
+            logger.info(f"[jobs] {job_id} operation recorded: {info.get('operation_name')}")
+
+        tracker = OperationTracker(on_start=record_operation, resume=job.get("operation"))
+        try:
+            await self.store.aupdate(job_id, {"status": RUNNING})
+            with track_operations(tracker):
+                result = await self.executor(job)
+            job.update(status=SUCCEEDED, result=result, error=None)
+            self.succeeded += 1
+            logger.info(f"[jobs] {job_id} succeeded")
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e)
+            job.update(status=FAILED, error=str(error))
+            self.failed += 1
+            logger.error(f"[jobs] {job_id} failed: {error}")
+        finally:
+            heartbeat.cancel()
+            self._running.discard(job_id)
+
+        job["updated_at"] = time.time()
+        await self.store.aupdate(job_id, {"status": job["status"], "result": job.get("result"), "error": job["error"]})
+        if job.get("webhook_url"):
+            await self._notify(job)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                await self.store.aupdate(job_id, {})
+            except Exception as e:
+                logger.warning(f"[jobs] heartbeat failed for {job_id}: {e}")
+
+    async def _recovery_loop(self) -> None:
+        while True:
+            try:
+                # 여유가 있는 만큼만 가져옴 (가져간 작업은 heartbeat가 끊기면 다음 복구에서 다시 대상)
+                free = min(10, self.max_active - len(self._tasks))
+                stale = await self.store.aclaim_stale(time.time() - STALE_SECONDS, limit=free) if free > 0 else []
+                for job in stale:
+                    if job["job_id"] in self._running:
+                        continue
+                    if job["attempts"] > MAX_ATTEMPTS:
+                        job.update(status=FAILED, error=f"작업이 {MAX_ATTEMPTS}회 재개 후에도 끝나지 않았습니다")
+                        await self.store.aupdate(job["job_id"], {"status": FAILED, "error": job["error"]})
+                        self.failed += 1
+                        if job.get("webhook_url"):
+                            await self._notify(job)
+                        continue
+                    self.resumed += 1
+                    logger.info(
+                        f"[jobs] resuming {job['job_id']} (attempt={job['attempts']}, "
+                        f"operation={(job.get('operation') or {}).get('operation_name')})"
+                    )
+                    self._spawn(job)
+                await self.store.apurge(time.time() - RETENTION_SECONDS)
+            except Exception as e:
+                logger.warning(f"[jobs] recovery failed: {e}")
+            await asyncio.sleep(RECOVERY_INTERVAL_SECONDS)
+
+    async def _notify(self, job: dict) -> None:
+        """webhook_url로 작업 결과 POST (지수 백오프 재시도, 실패해도 작업 상태는 유지)"""
+        body = json.dumps(
+            {
+                "event": "ai_generation_completed" if job["status"] == SUCCEEDED else "ai_generation_failed",
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                "data": public_view(job),
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if WEBHOOK_SECRET:
+            signature = hmac.new(WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+        # 제출 이후 DNS가 바뀌었을 수 있으므로 전송 직전에 다시 검사
+        try:
+            await check_webhook_url(job["webhook_url"])
+        except WebhookRejected as e:
+            logger.warning(f"[jobs] webhook skipped for {job['job_id']}: {e}")
+            return
+
+        for attempt in range(WEBHOOK_RETRIES):
+            try:
+                resp = await ahttp_request(
+                    "POST", job["webhook_url"], content=body, headers=headers, timeout=WEBHOOK_TIMEOUT_SECONDS,
+                    follow_redirects=False,
+                )
+                resp.raise_for_status()
+                logger.info(f"[jobs] webhook delivered for {job['job_id']}")
+                return
+            except Exception as e:
+                logger.warning(f"[jobs] webhook attempt {attempt + 1} failed for {job['job_id']}: {e}")
+                if attempt + 1 < WEBHOOK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+
+
+class WebhookRejected(ValueError):
+    """허용되지 않는 webhook_url (http(s)가 아님 / 허용 목록 밖 / 내부 주소로 해석됨)"""
+
+
+async def check_webhook_url(url: str) -> None:
+    """webhook_url이 외부 공인 주소인지 검사. 아니면 WebhookRejected."""
+    parsed = urllib.parse.urlsplit(url)
+    host = (parsed.hostname or "").lower().rstrip(".")
+    if parsed.scheme not in ("http", "https") or not host:
+        raise WebhookRejected("webhook_url은 http(s) URL이어야 합니다")
+
+    if WEBHOOK_ALLOWED_HOSTS:
+        if not any(host == allowed or host.endswith("." + allowed) for allowed in WEBHOOK_ALLOWED_HOSTS):
+            raise WebhookRejected(f"허용되지 않은 webhook 호스트입니다: {host}")
+        return
+
+    try:
+        port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (OSError, ValueError) as e:
+        raise WebhookRejected(f"webhook 호스트를 확인할 수 없습니다: {host} ({e})")
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%", 1)[0])
+        if not address.is_global or address.is_multicast:
+            raise WebhookRejected(f"내부 주소로 향하는 webhook_url은 허용되지 않습니다: {host}")
+
+
+def public_view(job: dict) -> dict:
+    """API 응답 / webhook 본문용 작업 표현 (operation 등 내부 필드 제외)"""
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "user_id": job["user_id"],
+        "generation_id": (job.get("request") or {}).get("generation_id"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
+
+# ──────────────────────────────────────────
+# 싱글턴
+# ──────────────────────────────────────────
+
+_store: Optional[JobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """설정된 작업 저장소 (JOB_STORE)"""
+    global _store
+
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            if JOB_STORE_BACKEND == "sqlite":
+                _store = SqliteJobStore()
+            elif JOB_STORE_BACKEND == "postgres":
+                _store = PostgresJobStore()
+                logger.info("[jobs] postgres store: agent_jobs")
+            else:
+                raise ValueError(
+                    f"Unknown JOB_STORE='{JOB_STORE_BACKEND}'. Valid options: 'sqlite', 'postgres'"
+                )
+    return _store
+
+
+def reset_job_store() -> None:
+    """테스트용 저장소 초기화"""
+    global _store
+    _store = None
@@ -0,0 +1,140 @@
+"""
+스트리밍 LLM 출력용 증분 JSON 파서
+
+토큰 단위로 도착하는 응답에서 최상위 JSON 객체의 필드가 완성되는 즉시 꺼낸다.
+응답 전체를 기다리지 않고 앞쪽 필드(image_prompt 등)로 다음 작업을 시작하기 위한 용도.
+
+    parser = JsonObjectStream()
+    async for chunk in provider.agenerate_stream(prompt):
+        new_fields = parser.feed(chunk)   # 이번 chunk로 완성된 필드만
+        ...
+        if parser.done:                   # 최상위 객체가 닫힘 → 디코딩 중단 가능
+            break
+    parser.fields                         # 지금까지 완성된 전체 필드
+    parser.object_text                    # 최상위 객체 원문 ('{' ~ '}', 앞뒤 잡담 제외)
+
+    extract_object(text)                  # 완성된 응답에서 객체 원문만 (같은 파서로 한 번에)
+
+- 첫 '{' 이전 텍스트(```json 펜스 등)는 무시
+- 문자열 값은 닫는 따옴표에서, 숫자/불리언/중첩 객체·배열은 뒤따르는 ',' 또는 '}'에서 완성
+- 파싱할 수 없는 필드는 건너뜀 (최종 결과는 호출 측에서 전체 텍스트로 다시 검증)
+"""
+import json
+from typing import Optional
+
+
+class JsonObjectStream:
+    """최상위 JSON 객체의 필드를 증분 파싱"""
+
+    def __init__(self):
+        self.fields: dict = {}
+        self.done = False          # 최상위 객체의 닫는 '}'까지 읽음
+        self._text = ""
+        self._start = -1           # 최상위 객체의 '{' 위치
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._key: Optional[str] = None
+        self._value_start = -1     # 현재 필드 값의 시작 위치 (':' 다음), 없으면 -1
+
+    def feed(self, chunk: str) -> dict:
+        """chunk를 이어 붙여 파싱하고, 이번에 새로 완성된 필드를 반환."""
+        if self.done or not chunk:
+            return {}
+
+        self._text += chunk
+        text = self._text
+        completed: dict = {}
+
+        for i in range(self._pos, len(text)):
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_string(text, i, completed)
+                continue
+
+            if self._depth == 0:
+                # 객체 시작 전 텍스트는 무시
+                if c == "{":
+                    self._depth = 1
+                    self._start = i
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                if self._depth == 1:
+                    self._close_value(text, i, completed)
+                    self.done = True
+                    self._pos = i + 1
+                    return completed
+                self._depth -= 1
+            elif self._depth == 1:
+                if c == ",":
+                    self._close_value(text, i, completed)
+                elif c == ":" and self._key is not None:
+                    self._value_start = i + 1
+
+        self._pos = len(text)
+        return completed
+
+    @property
+    def object_text(self) -> Optional[str]:
+        """닫힌 최상위 객체의 원문. 아직 닫히지 않았으면 None."""
+        if not self.done:
+            return None
+        return self._text[self._start:self._pos]
+
+    def _close_string(self, text: str, end: int, completed: dict) -> None:
+        """최상위에서 닫힌 문자열: 키이거나 문자열 값"""
+        raw = text[self._string_start:end + 1]
+        if self._value_start < 0:
+            try:
+                self._key = json.loads(raw)
+            except ValueError:
+                self._key = None
+            return
+        self._emit(text[self._value_start:end + 1], completed)
+
+    def _close_value(self, text: str, end: int, completed: dict) -> None:
+        """',' 또는 '}'에서 끝나는 비문자열 값 (문자열 값은 이미 방출됨)"""
+        if self._key is not None and self._value_start >= 0:
+            self._emit(text[self._value_start:end], completed)
+        self._key = None
+        self._value_start = -1
+
+    def _emit(self, raw: str, completed: dict) -> None:
+        key = self._key
+        self._key = None
+        self._value_start = -1
+        raw = raw.strip()
+        if key is None or not raw:
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        self.fields[key] = value
+        completed[key] = value
+
+
+def extract_object(text: str) -> str:
+    """완성된 응답 텍스트에서 최상위 JSON 객체 원문 (```json 펜스 / 앞뒤 잡담 제외).
+
+    객체가 닫히지 않았으면 텍스트 전체를 반환 → 호출 측에서 검증 실패로 처리.
+    """
+    parser = JsonObjectStream()
+    parser.feed(text)
+    return parser.object_text or text
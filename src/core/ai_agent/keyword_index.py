@@ -0,0 +1,168 @@
+"""
+키워드 fallback용 역색인 + 벡터화 스코어링
+
+임베딩이 없거나 Vertex 장애 시 광고/상품 검색이 키워드 스코어링으로 내려오는데,
+매 요청 전체 테이블을 읽어 Python 루프로 점수를 매기던 것을 대체한다.
+
+- 카탈로그를 한 번 읽어 targeting_rules.tags / category / brand 역색인을 만들고 캐시
+- 점수는 포스팅 리스트에 가중치를 더하는 NumPy 연산, top-k는 argpartition 부분 정렬
+- count / max(updated_at) 버전이 바뀌면 재구축 (KEYWORD_INDEX_CHECK_SECONDS 간격으로 확인)
+  updated_at 컬럼이 없는 DB(scripts/init_db.sql 마이그레이션 전)는 count만으로 버전 판단
+
+점수식은 기존 _keyword_score_ads / _keyword_score_products와 동일:
+    광고: 관심사∈tags +0.4, tag⊂prompt +0.3, category⊂prompt +0.2, bid/10
+    상품: category∈관심사 +0.4, category⊂prompt +0.3, brand⊂prompt +0.2
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_CATALOG_SQL = {
+    "campaigns": "SELECT campaign_id, brand_id, campaign_data, targeting_rules FROM campaigns",
+    "products": "SELECT product_id, brand_id, product_data FROM products",
+}
+
+CHECK_SECONDS = float(os.getenv("KEYWORD_INDEX_CHECK_SECONDS", "10"))
+
+
+class InvertedField:
+    """다중값 필드 역색인 (term → 행 번호 배열)"""
+
+    def __init__(self, values_per_row: List[List[str]]):
+        postings: Dict[str, List[int]] = {}
+        for i, values in enumerate(values_per_row):
+            for value in values:
+                postings.setdefault(value, []).append(i)
+        self.n = len(values_per_row)
+        # 행 내 중복 포함 (tag⊂prompt 처럼 태그마다 가산하는 경우)
+        self.postings = {t: np.asarray(rows, dtype=np.int64) for t, rows in postings.items()}
+        # 행당 1회 (관심사∈tags 처럼 멤버십만 보는 경우)
+        self.membership = {t: np.unique(rows) for t, rows in self.postings.items()}
+
+    def match_terms(self, terms: Iterable[str], weight: float, out: np.ndarray) -> None:
+        """각 term을 가진 행에 weight 가산 (term 중복 시 중복 가산)"""
+        for term in terms:
+            rows = self.membership.get(term)
+            if rows is not None:
+                out[rows] += weight
+
+    def match_contained(self, text: str, weight: float, out: np.ndarray) -> None:
+        """text에 부분 문자열로 포함된 term마다 해당 행에 weight 가산"""
+        for term, rows in self.postings.items():
+            if term in text:
+                np.add.at(out, rows, weight)
+
+
+class CatalogKeywordIndex:
+    """한 테이블의 키워드 역색인 스냅샷"""
+
+    def __init__(self, table: str, rows: List[dict], version: tuple):
+        self.table = table
+        self.rows = rows
+        self.version = version
+        self.checked_at = time.monotonic()
+
+        if table == "campaigns":
+            datas = [r["campaign_data"] or {} for r in rows]
+            self.tags = InvertedField([(r["targeting_rules"] or {}).get("tags", []) for r in rows])
+            self.category = InvertedField([[d.get("category", "")] for d in datas])
+            self.bias = np.asarray([float(d.get("bid", 0)) / 10.0 for d in datas], dtype=np.float64)
+        else:
+            datas = [r["product_data"] or {} for r in rows]
+            self.category = InvertedField([[d.get("category", "")] for d in datas])
+            self.brand = InvertedField([[d.get("brand", "").lower()] for d in datas])
+            self.bias = np.zeros(len(rows), dtype=np.float64)
+
+    def score(self, interests: list, prompt: str) -> np.ndarray:
+        prompt_lower = prompt.lower()
+        scores = self.bias.copy()
+        if self.table == "campaigns":
+            self.tags.match_terms(interests, 0.4, scores)
+            self.tags.match_contained(prompt_lower, 0.3, scores)
+            self.category.match_contained(prompt_lower, 0.2, scores)
+        else:
+            self.category.match_terms(set(interests), 0.4, scores)
+            self.category.match_contained(prompt_lower, 0.3, scores)
+            self.brand.match_contained(prompt_lower, 0.2, scores)
+        return scores
+
+    def top_k(self, interests: list, prompt: str, k: int) -> List[Tuple[dict, float]]:
+        """점수 상위 k개 (row, 반올림 점수). 동점은 원래 행 순서 유지."""
+        n = len(self.rows)
+        if n == 0 or k <= 0:
+            return []
+        scores = np.round(self.score(interests, prompt), 3)
+        k = min(k, n)
+        if k < n:
+            # k번째 점수 이상인 행만 후보로 남긴 뒤 안정 정렬
+            threshold = np.partition(scores, n - k)[n - k]
+            candidates = np.flatnonzero(scores >= threshold)
+        else:
+            candidates = np.arange(n)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")][:k]
+        return [(self.rows[i], float(scores[i])) for i in order]
+
+
+_indexes: Dict[str, CatalogKeywordIndex] = {}
+_lock = threading.Lock()
+# 테이블 → updated_at 컬럼 존재 여부 (프로세스당 한 번 확인)
+_has_updated_at: Dict[str, bool] = {}
+
+
+def _version_sql(cur, table: str) -> str:
+    """버전 확인 쿼리. 없는 컬럼을 조회하면 트랜잭션이 중단되므로 먼저 컬럼 존재를 확인."""
+    if table not in _has_updated_at:
+        cur.execute(
+            "SELECT 1 FROM information_schema.columns"
+            " WHERE table_name = %s AND column_name = 'updated_at'"
+            " AND table_schema = ANY(current_schemas(false))",
+            (table,),
+        )
+        _has_updated_at[table] = cur.fetchone() is not None
+        if not _has_updated_at[table]:
+            logger.warning(
+                f"[keyword_index] {table}.updated_at missing → count-based version "
+                f"(apply scripts/init_db.sql migration)"
+            )
+    if _has_updated_at[table]:
+        return f"SELECT count(*) AS n, max(updated_at) AS version FROM {table}"
+    return f"SELECT count(*) AS n, NULL AS version FROM {table}"
+
+
+def get_keyword_index(cur, table: str) -> CatalogKeywordIndex:
+    """캐시된 역색인 반환. CHECK_SECONDS마다 버전을 확인해 바뀌었으면 재구축."""
+    index: Optional[CatalogKeywordIndex] = _indexes.get(table)
+    if index is not None and time.monotonic() - index.checked_at < CHECK_SECONDS:
+        return index
+
+    cur.execute(_version_sql(cur, table))
+    head = cur.fetchone()
+    version = (head["n"], head["version"])
+
+    if index is not None and index.version == version:
+        index.checked_at = time.monotonic()
+        return index
+
+    cur.execute(_CATALOG_SQL[table])
+    index = CatalogKeywordIndex(table, [dict(r) for r in cur.fetchall()], version)
+    with _lock:
+        _indexes[table] = index
+    logger.info(f"[keyword_index] {table} rebuilt: {len(index.rows)} rows")
+    return index
+
+
+def invalidate_keyword_index(table: Optional[str] = None) -> None:
+    """캐시 무효화 (table 미지정 시 전체)"""
+    with _lock:
+        if table is None:
+            _indexes.clear()
+            _has_updated_at.clear()
+        else:
+            _indexes.pop(table, None)
+            _has_updated_at.pop(table, None)
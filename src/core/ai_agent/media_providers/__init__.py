@@ -40,7 +40,7 @@ import logging
 import os
 from typing import Optional
 
-from .base import MediaProvider, MediaResult
+from .base import MediaProvider, MediaResult, OperationTracker, current_operation_tracker, track_operations
 
 logger = logging.getLogger(__name__)
 
@@ -100,6 +100,9 @@ def reset_media_provider() -> None:
 __all__ = [
     "MediaProvider",
     "MediaResult",
+    "OperationTracker",
+    "current_operation_tracker",
+    "track_operations",
     "get_media_provider",
     "reset_media_provider",
 ]
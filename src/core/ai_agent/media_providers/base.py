@@ -1,8 +1,12 @@
 """
 미디어 생성 프로바이더 추상 기반 클래스
 """
+import contextvars
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, Optional
+
+from src.core.stages import get_stage
 
 
 class MediaResult:
@@ -44,6 +48,10 @@ class MediaProvider(ABC):
         height: int = 1024,
         **kwargs,
     ) -> MediaResult:
+        """이미지 생성
+
+        kwargs의 quality="fast"는 지연 예산 부족 힌트 (스텝 수를 줄일 수 있는 프로바이더만 반영).
+        """
         pass
 
     def generate_video(
@@ -55,6 +63,34 @@ class MediaProvider(ABC):
     ) -> MediaResult:
         raise NotImplementedError(f"{self.name} does not support video generation")
 
+    async def agenerate_image(
+        self,
+        prompt: str,
+        negative_prompt: str = "",
+        width: int = 1024,
+        height: int = 1024,
+        **kwargs,
+    ) -> MediaResult:
+        """비동기 이미지 생성. 기본 구현은 generate_image()를 "media" 스테이지 전용 스레드 풀에서 실행."""
+        return await get_stage("media").run_in_pool(
+            self.generate_image, prompt, negative_prompt, width, height, **kwargs
+        )
+
+    async def agenerate_video(
+        self,
+        prompt: str,
+        negative_prompt: str = "",
+        duration_seconds: int = 4,
+        **kwargs,
+    ) -> MediaResult:
+        """비동기 영상 생성. 기본 구현은 generate_video()를 "video" 스테이지 전용 스레드 풀에서 실행.
+
+        장시간 폴링이 필요한 프로바이더(Veo 등)는 override해 대기 중 스레드를 점유하지 않는다.
+        """
+        return await get_stage("video").run_in_pool(
+            self.generate_video, prompt, negative_prompt, duration_seconds, **kwargs
+        )
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -65,6 +101,58 @@ class MediaProvider(ABC):
         return False
 
 
+# ──────────────────────────────────────────
+# 장시간 작업(Long-Running Operation) 추적
+# ──────────────────────────────────────────
+
+class OperationTracker:
+    """Veo처럼 원격 operation으로 실행되는 생성 작업의 기록/재개 훅
+
+    작업 API가 생성 실행 전에 track_operations()로 설정하면, 프로바이더는
+        - operation을 시작한 직후 record(info)로 operation 이름 등을 넘기고 (작업 저장소에 영속화)
+        - resume이 있으면 새로 시작하지 않고 그 operation을 이어서 폴링한다 (프로세스 재시작 후 재개)
+    info는 JSON 직렬화 가능한 dict이며 "provider" 키로 어느 프로바이더의 것인지 구분.
+    """
+
+    def __init__(
+        self,
+        on_start: Optional[Callable[[dict], Awaitable[None]]] = None,
+        resume: Optional[dict] = None,
+    ):
+        self._on_start = on_start
+        self._resume = resume
+
+    def take_resume(self, provider: str) -> Optional[dict]:
+        """이 프로바이더가 이어서 폴링할 operation (한 번만 반환)"""
+        if self._resume is None or self._resume.get("provider") != provider:
+            return None
+        resume, self._resume = self._resume, None
+        return resume
+
+    async def record(self, info: dict) -> None:
+        if self._on_start is not None:
+            await self._on_start(info)
+
+
+_operation_tracker: contextvars.ContextVar[Optional[OperationTracker]] = contextvars.ContextVar(
+    "operation_tracker", default=None
+)
+
+
+@contextmanager
+def track_operations(tracker: OperationTracker) -> Iterator[OperationTracker]:
+    """이 블록(과 여기서 만든 태스크) 안의 미디어 생성에 tracker 적용"""
+    token = _operation_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _operation_tracker.reset(token)
+
+
+def current_operation_tracker() -> Optional[OperationTracker]:
+    return _operation_tracker.get()
+
+
 def upload_to_gcs_public(data: bytes, bucket_name: str, blob_name: str, content_type: str) -> str:
     """GCS에 파일을 업로드하고 public URL을 반환합니다.
 
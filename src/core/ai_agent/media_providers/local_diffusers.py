@@ -211,6 +211,9 @@ class LocalDiffusersProvider(MediaProvider):
         pipe, cfg = self._load_image_pipeline()
 
         num_steps = kwargs.get("num_inference_steps", cfg["num_inference_steps"])
+        if kwargs.get("quality") == "fast" and "num_inference_steps" not in kwargs:
+            # 지연 예산 부족 시: 스텝 절반 (LCM 4 → 2)
+            num_steps = max(1, num_steps // 2)
         guidance = kwargs.get("guidance_scale", cfg["guidance_scale"])
 
         logger.info(
@@ -27,7 +27,8 @@ API 토큰:
 import base64
 import logging
 import os
-import urllib.request
+
+from src.core.http_client import http_request
 
 from .base import MediaProvider, MediaResult
 
@@ -100,9 +101,10 @@ class ReplicateProvider(MediaProvider):
         # output은 URL 리스트 또는 단일 URL
         image_url = output[0] if isinstance(output, list) else output
 
-        # URL에서 이미지 다운로드 → base64
-        with urllib.request.urlopen(image_url) as resp:
-            image_bytes = resp.read()
+        # URL에서 이미지 다운로드 → base64 (공유 keep-alive 클라이언트)
+        resp = http_request("GET", str(image_url))
+        resp.raise_for_status()
+        image_bytes = resp.content
         b64 = base64.b64encode(image_bytes).decode("utf-8")
 
         return MediaResult(
@@ -151,9 +153,10 @@ class ReplicateProvider(MediaProvider):
 
         video_url = output[0] if isinstance(output, list) else output
 
-        # 다운로드 → base64
-        with urllib.request.urlopen(video_url) as resp:
-            video_bytes = resp.read()
+        # 다운로드 → base64 (공유 keep-alive 클라이언트)
+        resp = http_request("GET", str(video_url))
+        resp.raise_for_status()
+        video_bytes = resp.content
         b64 = base64.b64encode(video_bytes).decode("utf-8")
 
         return MediaResult(
@@ -30,6 +30,7 @@ GCS 버킷 준비:
     gcloud auth application-default login
     서비스 계정에 roles/storage.objectAdmin 권한 필요
 """
+import asyncio
 import base64
 import logging
 import os
@@ -37,7 +38,9 @@ import time
 import uuid
 from pathlib import Path
 
-from .base import MediaProvider, MediaResult, upload_to_gcs_public
+from src.core.stages import get_stage
+
+from .base import MediaProvider, MediaResult, current_operation_tracker, upload_to_gcs_public
 
 logger = logging.getLogger(__name__)
 
@@ -81,6 +84,96 @@ class VertexVeoProvider(MediaProvider):
         duration_seconds: int = 8,
         **kwargs,
     ) -> MediaResult:
+        client, config, gcs_prefix = self._prepare(prompt, negative_prompt, duration_seconds, **kwargs)
+        start = time.time()
+
+        # Long-Running Operation 실행
+        operation = client.models.generate_videos(
+            model=self.model_name,
+            prompt=prompt,
+            config=config,
+        )
+
+        # 완료 대기 (폴링)
+        logger.info(f"[vertex_veo] waiting for operation (timeout={self.timeout}s)...")
+        deadline = start + self.timeout
+        while not operation.done:
+            if time.time() > deadline:
+                raise TimeoutError(f"Veo 생성 타임아웃 ({self.timeout}s)")
+            time.sleep(10)
+            operation = client.operations.get(operation)
+
+        return self._finalize(
+            operation, prompt, gcs_prefix, start, config.duration_seconds, config.aspect_ratio
+        )
+
+    async def agenerate_video(
+        self,
+        prompt: str,
+        negative_prompt: str = "",
+        duration_seconds: int = 8,
+        **kwargs,
+    ) -> MediaResult:
+        """비동기 영상 생성. 폴링 대기는 asyncio.sleep이라 수 분 걸려도 스레드를 점유하지 않음.
+
+        OperationTracker가 설정돼 있으면 (작업 API) 시작한 operation 이름을 기록하고,
+        재시작 후 기록된 operation이 있으면 새로 생성하지 않고 그 operation을 이어서 폴링한다.
+        """
+        tracker = current_operation_tracker()
+        resume = tracker.take_resume("vertex_veo") if tracker else None
+        if resume is not None:
+            return await self.aresume_video(resume)
+
+        client, config, gcs_prefix = self._prepare(prompt, negative_prompt, duration_seconds, **kwargs)
+        start = time.time()
+
+        operation = await client.aio.models.generate_videos(
+            model=self.model_name,
+            prompt=prompt,
+            config=config,
+        )
+        info = {
+            "provider": "vertex_veo",
+            "operation_name": operation.name,
+            "model": self.model_name,
+            "gcs_prefix": gcs_prefix,
+            "prompt": prompt,
+            "duration_seconds": config.duration_seconds,
+            "aspect_ratio": config.aspect_ratio,
+            "started_at": start,
+        }
+        if tracker is not None:
+            await tracker.record(info)
+        return await self._apoll(client, operation, info)
+
+    async def aresume_video(self, info: dict) -> MediaResult:
+        """기록해 둔 operation(agenerate_video가 OperationTracker에 넘긴 info)을 이어서 폴링"""
+        from google.genai import types
+
+        logger.info(f"[vertex_veo] resuming operation {info['operation_name']}")
+        client = self._client()
+        operation = types.GenerateVideosOperation(name=info["operation_name"])
+        operation = await client.aio.operations.get(operation)
+        return await self._apoll(client, operation, info)
+
+    async def _apoll(self, client, operation, info: dict) -> MediaResult:
+        """operation 완료까지 폴링 후 결과 변환 (타임아웃은 최초 시작 시각 기준)"""
+        logger.info(f"[vertex_veo] waiting for operation (timeout={self.timeout}s, async)...")
+        deadline = info["started_at"] + self.timeout
+        while not operation.done:
+            if time.time() > deadline:
+                raise TimeoutError(f"Veo 생성 타임아웃 ({self.timeout}s)")
+            await asyncio.sleep(10)
+            operation = await client.aio.operations.get(operation)
+
+        # GCS 다운로드 / ffmpeg 변환 / 업로드는 블로킹 I/O → video 스테이지 스레드 풀에서 실행
+        return await get_stage("video").run_in_pool(
+            self._finalize, operation, info["prompt"], info["gcs_prefix"], info["started_at"],
+            info["duration_seconds"], info["aspect_ratio"],
+        )
+
+    def _prepare(self, prompt: str, negative_prompt: str, duration_seconds: int, **kwargs) -> tuple:
+        """(genai 클라이언트, GenerateVideosConfig, GCS 출력 prefix)"""
         if not self.gcs_bucket:
             raise ValueError(
                 "Veo 영상 생성에는 GCS 버킷이 필요합니다.\n"
@@ -88,7 +181,6 @@ class VertexVeoProvider(MediaProvider):
                 "버킷 생성: gsutil mb -l us-central1 gs://your-bucket-name"
             )
 
-        import google.genai as genai
         from google.genai import types
 
         # Veo 3: duration 4/6/8초, Veo 2: 4/8초만 지원
@@ -101,13 +193,8 @@ class VertexVeoProvider(MediaProvider):
             f"[vertex_veo] model={self.model_name}, "
             f"duration={duration_seconds}s, output={gcs_prefix}"
         )
-        start = time.time()
 
-        client = genai.Client(
-            vertexai=True,
-            project=self.project_id,
-            location=self.region,
-        )
+        client = self._client()
 
         config = types.GenerateVideosConfig(
             numberOfVideos=1,
@@ -116,23 +203,22 @@ class VertexVeoProvider(MediaProvider):
             aspectRatio=aspect_ratio,
             negativePrompt=negative_prompt or None,
         )
+        return client, config, gcs_prefix
 
-        # Long-Running Operation 실행
-        operation = client.models.generate_videos(
-            model=self.model_name,
-            prompt=prompt,
-            config=config,
-        )
+    def _client(self):
+        import google.genai as genai
 
-        # 완료 대기 (폴링)
-        logger.info(f"[vertex_veo] waiting for operation (timeout={self.timeout}s)...")
-        deadline = start + self.timeout
-        while not operation.done:
-            if time.time() > deadline:
-                raise TimeoutError(f"Veo 생성 타임아웃 ({self.timeout}s)")
-            time.sleep(10)
-            operation = client.operations.get(operation)
+        return genai.Client(
+            vertexai=True,
+            project=self.project_id,
+            location=self.region,
+        )
 
+    def _finalize(
+        self, operation, prompt: str, gcs_prefix: str, start: float,
+        duration_seconds: int, aspect_ratio: str,
+    ) -> MediaResult:
+        """완료된 operation의 결과 영상을 webm으로 변환해 public URL로 반환"""
         if operation.error:
             raise RuntimeError(f"Veo 생성 실패: {operation.error}")
 
@@ -193,6 +279,12 @@ class VertexUnifiedProvider(MediaProvider):
     def generate_video(self, prompt, negative_prompt="", duration_seconds=8, **kwargs):
         return self._veo.generate_video(prompt, negative_prompt, duration_seconds, **kwargs)
 
+    async def agenerate_image(self, prompt, negative_prompt="", width=1024, height=1024, **kwargs):
+        return await self._imagen.agenerate_image(prompt, negative_prompt, width, height, **kwargs)
+
+    async def agenerate_video(self, prompt, negative_prompt="", duration_seconds=8, **kwargs):
+        return await self._veo.agenerate_video(prompt, negative_prompt, duration_seconds, **kwargs)
+
     @property
     def supports_video(self) -> bool:
         return True
@@ -0,0 +1,124 @@
+"""
+그래프 노드 의존성 선언 + 병렬 스테이지 스케줄링
+
+각 노드가 읽는(reads) / 쓰는(writes) state 키를 선언하면, 선언 순서를 지키면서
+서로 의존하지 않는 인접 노드를 한 스테이지로 묶는다.
+
+    load_context → [state_interpreter ∥ retrieve_candidates] → strategy_planner → ...
+
+LangGraph 0.0.20은 여러 노드의 결과를 합치는 join 엣지가 없으므로, 노드가 2개 이상인
+스테이지는 하나의 복합 노드로 등록하고 내부에서 asyncio.gather로 동시 실행한 뒤 각 노드가
+선언한 writes 키만 병합한다.
+
+의존 판정 (앞 노드 A, 뒤 노드 B):
+    - B가 A의 writes를 읽음        (read-after-write)
+    - B가 A와 같은 키를 씀         (write-after-write)
+    - B가 A가 읽는 키를 씀         (write-after-read)
+"error" / "degradations" 키는 모든 노드가 쓸 수 있는 공통 키로 보고 의존 판정에서 제외
+(병합 시 error는 첫 오류 유지, degradations는 각 노드가 추가한 항목을 이어 붙임).
+
+환경변수:
+    AGENT_PARALLEL_NODES=true      false면 선언 순서대로 직렬 체인
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Iterable, List
+
+from langchain_core.runnables import RunnableLambda
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_NODES = os.getenv("AGENT_PARALLEL_NODES", "true").lower() == "true"
+
+# 모든 노드가 실패 / 품질 저하 시 기록하는 공통 키
+_SHARED_KEYS = frozenset({"error", "degradations"})
+
+
+class NodeSpec:
+    """그래프 노드 + 읽기/쓰기 state 키 선언"""
+
+    def __init__(self, name: str, fn: Callable[[dict], Awaitable[dict]], reads: Iterable[str], writes: Iterable[str]):
+        self.name = name
+        self.fn = fn
+        self.reads = frozenset(reads)
+        self.writes = frozenset(writes) - _SHARED_KEYS
+
+    def depends_on(self, other: "NodeSpec") -> bool:
+        return bool(
+            self.reads & other.writes
+            or self.writes & other.writes
+            or self.writes & other.reads
+        )
+
+    def __repr__(self) -> str:
+        return f"NodeSpec({self.name})"
+
+
+def plan_stages(specs: List[NodeSpec], parallel: bool = PARALLEL_NODES) -> List[List[NodeSpec]]:
+    """선언 순서를 유지하며 독립 노드를 같은 스테이지로 묶는다.
+
+    각 노드는 자신이 의존하는 앞 노드들 중 가장 늦은 스테이지의 다음 스테이지에 배치.
+    """
+    if not parallel:
+        return [[spec] for spec in specs]
+
+    stages: List[List[NodeSpec]] = []
+    placed: dict = {}   # 노드 이름 → 스테이지 번호
+    for i, spec in enumerate(specs):
+        level = 0
+        for prev in specs[:i]:
+            if spec.depends_on(prev):
+                level = max(level, placed[prev.name] + 1)
+        # 선언 순서 보장: 앞 노드보다 이른 스테이지로 당기지 않음
+        if stages:
+            level = max(level, len(stages) - 1)
+        if level == len(stages):
+            stages.append([])
+        stages[level].append(spec)
+        placed[spec.name] = level
+    return stages
+
+
+def stage_name(stage: List[NodeSpec]) -> str:
+    return stage[0].name if len(stage) == 1 else "+".join(spec.name for spec in stage)
+
+
+def make_parallel_node(stage: List[NodeSpec]) -> Callable[[dict], Awaitable[dict]]:
+    """스테이지의 노드들을 동시 실행하고 각자의 writes 키만 병합하는 복합 노드"""
+
+    async def node(state: dict) -> dict:
+        results = await asyncio.gather(*(spec.fn(dict(state)) for spec in stage))
+
+        merged = dict(state)
+        for spec, result in zip(stage, results):
+            for key in spec.writes:
+                if key in result:
+                    merged[key] = result[key]
+            if result.get("error") and not merged.get("error"):
+                merged["error"] = result["error"]
+            added = (result.get("degradations") or [])[len(state.get("degradations") or []):]
+            if added:
+                merged["degradations"] = [*(merged.get("degradations") or []), *added]
+        return merged
+
+    return node
+
+
+class GraphNode(RunnableLambda):
+    """소스 코드 검사를 하지 않는 노드 Runnable
+
+    RunnableLambda는 콜백 직렬화(dumpd) 때마다 __repr__ / deps에서 inspect.getsource + AST
+    파싱을 수행해 실행당 수십~수백 ms의 CPU를 쓴다. async 그래프에서는 이 시간이 이벤트
+    루프를 막아 동시 생성 수를 제한하므로, 노드 이름만 쓰는 가벼운 구현으로 대체.
+    """
+
+    def __init__(self, name: str, fn: Callable[[dict], Awaitable[dict]]):
+        super().__init__(fn, name=name)
+
+    @property
+    def deps(self) -> list:
+        return []
+
+    def __repr__(self) -> str:
+        return f"GraphNode({self.name})"
@@ -11,6 +11,8 @@ import logging
 from .base import ModelProvider
 from .vertex import VertexProvider
 from .local import LocalProvider
+from .cached import CachedProvider, with_response_cache, clear_response_caches
+from .staged import StagedProvider
 
 logger = logging.getLogger(__name__)
 
@@ -45,4 +47,7 @@ def reset_provider() -> None:
     _provider_instance = None
 
 
-__all__ = ["ModelProvider", "VertexProvider", "LocalProvider", "get_provider", "reset_provider"]
+__all__ = [
+    "ModelProvider", "VertexProvider", "LocalProvider", "CachedProvider", "StagedProvider",
+    "get_provider", "reset_provider", "with_response_cache", "clear_response_caches",
+]
@@ -1,26 +1,123 @@
 """
 AI 모델 프로바이더 추상 기반 클래스
+
+스트리밍 / 조기 종료:
+    agenerate_stream()   디코딩되는 대로 텍스트 조각을 yield
+    agenerate_until()    stop(chunk)가 True를 돌려주면 스트림을 닫아 디코딩을 중단
+                         (Ollama는 연결이 닫히면 생성 중단, Vertex는 스트림 응답을 닫음)
+    agenerate_json()     최상위 JSON 객체의 닫는 '}'가 나오면 바로 중단하고 그 객체 원문 반환
+                         → JSON 뒤에 이어지는 설명/잡담 토큰을 생성하지 않음
+
+구조화 출력:
+    모든 생성 메서드는 schema(JSON schema dict, schemas.response_schema)를 받을 수 있다.
+    주어지면 프로바이더가 디코딩을 그 스키마로 제한한다 (Vertex response_schema, Ollama format).
+
+환경변수:
+    LLM_EARLY_STOP=true   false면 agenerate_json()이 agenerate() 전체 응답을 그대로 반환
 """
+import copy
+import os
 from abc import ABC, abstractmethod
-from typing import Optional
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from src.core.stages import get_stage
+
+from ..json_stream import JsonObjectStream
+
+EARLY_STOP = os.getenv("LLM_EARLY_STOP", "true").lower() == "true"
 
 
 class ModelProvider(ABC):
     """LLM 프로바이더 공통 인터페이스"""
 
+    # 샘플링 temperature. None이면 서버 기본값(알 수 없음) → 응답 캐시 정책상 0이 아닌 것으로 취급
+    temperature: Optional[float] = None
+
     @abstractmethod
-    def generate(self, prompt: str, system: Optional[str] = None) -> str:
+    def generate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
         """텍스트 생성
 
         Args:
             prompt: 사용자 프롬프트
             system: 시스템 프롬프트 (선택)
+            schema: 응답 JSON 스키마 (선택, 주어지면 JSON만 생성)
 
         Returns:
             생성된 텍스트
         """
         pass
 
+    async def agenerate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        """비동기 텍스트 생성 (에이전트 그래프의 기본 경로)
+
+        기본 구현은 generate()를 "llm" 스테이지 전용 스레드 풀에서 실행 (기본 executor 미사용).
+        네이티브 async 클라이언트가 있는 프로바이더는 override해 이벤트 루프에서 대기한다.
+        """
+        return await get_stage("llm").run_in_pool(self.generate, prompt, system, schema)
+
+    async def agenerate_stream(
+        self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """비동기 스트리밍 텍스트 생성. 디코딩되는 대로 텍스트 조각을 yield.
+
+        기본 구현은 agenerate() 결과를 한 조각으로 yield (스트리밍 미지원 프로바이더).
+        조각을 모두 이어 붙이면 agenerate()와 같은 결과.
+        """
+        yield await self.agenerate(prompt, system, schema)
+
+    async def agenerate_until(
+        self, prompt: str, system: Optional[str] = None, stop: Optional[Callable[[str], bool]] = None,
+        schema: Optional[dict] = None,
+    ) -> str:
+        """스트리밍 생성 후 이어 붙인 텍스트 반환. stop(chunk)이 True면 그 조각까지만 받고 디코딩 중단.
+
+        정상 반환 = 완료된 응답 (stop 충족 또는 스트림 끝). 취소 / 타임아웃은 예외로 전파되므로
+        응답 캐시 등은 반환값만 저장하면 잘린 응답을 저장하지 않는다.
+        """
+        chunks = []
+        # aclosing: 중간에 빠져나오면 프로바이더 스트림(HTTP 응답 등)을 즉시 닫아 서버 쪽 생성도 멈춤
+        async with aclosing(self.agenerate_stream(prompt, system, schema)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if stop is not None and stop(chunk):
+                    break
+        return "".join(chunks)
+
+    async def agenerate_json(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        """JSON 객체 하나를 생성. 최상위 객체가 닫히는 즉시 디코딩을 멈추고 객체 원문을 반환.
+
+        객체가 끝까지 닫히지 않으면(형식 오류 등) 받은 전체 텍스트를 반환 → 호출 측에서 검증.
+        """
+        if not EARLY_STOP:
+            return await self.agenerate(prompt, system, schema)
+        parser = JsonObjectStream()
+
+        def stop(chunk: str) -> bool:
+            parser.feed(chunk)
+            return parser.done
+
+        text = await self.agenerate_until(prompt, system, stop, schema)
+        return parser.object_text or text
+
+    async def awarm_up(self, system_prompts: Sequence[str] = ()) -> None:
+        """기동 시 예열 (모델 로드, 고정 system 프롬프트 캐시 등). 기본은 아무것도 하지 않음."""
+        return None
+
+    @property
+    def model_id(self) -> str:
+        """모델 식별자 (응답 캐시 키 등). 기본은 name."""
+        return self.name
+
+    def with_temperature(self, temperature: float) -> "ModelProvider":
+        """temperature만 바꾼 사본 (노드별 temperature, 클라이언트/모델 객체는 공유).
+
+        다른 프로바이더를 감싸는 래퍼는 안쪽 프로바이더의 사본을 감싸도록 override.
+        """
+        clone = copy.copy(self)
+        clone.temperature = temperature
+        return clone
+
     @property
     @abstractmethod
     def name(self) -> str:
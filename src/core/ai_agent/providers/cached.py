@@ -0,0 +1,224 @@
+"""
+LLM 응답 캐시 프로바이더 래퍼
+
+state_interpreter / strategy_planner처럼 프롬프트가 사용자 프로필 + 요청 + 후보 목록으로 완전히
+결정되는 노드는 같은 입력이 반복되면 같은 LLM 호출을 다시 한다. 노드별로 opt-in한 경우에만
+ModelProvider를 CachedProvider로 감싸 응답을 재사용한다.
+
+키:   sha256(provider 이름, 모델, temperature, system, prompt, 응답 스키마)
+저장: 노드별 TieredCache("llm:<노드>") → LRU + TTL, REDIS_HOST 설정 시 Redis 2차 계층
+통계: cache_stats()에 노드별 hit_rate 포함 (/health의 caches)
+
+temperature 정책:
+    temperature>0 (또는 알 수 없음) 응답을 캐시하면 샘플링 다양성이 사라진다. 명시적으로 고르도록
+    LLM_CACHE_TEMPERATURE_POLICY로 결정한다.
+        bypass  temperature가 0인 호출만 캐시 (기본)
+        cache   temperature와 무관하게 캐시 (같은 입력엔 같은 "창작" 결과를 의도적으로 재사용)
+
+    캐시 대상 노드는 LLM_CACHE_NODE_TEMPERATURE(기본 0)로 실행한다. 분석/선택 노드는 같은 입력에
+    같은 결과가 맞고, 프로바이더 기본값(Vertex 0.7, Ollama는 서버 기본값)으로는 bypass 정책에서
+    캐시가 한 번도 히트하지 않기 때문. creative_generator 등 나머지 노드는 프로바이더 temperature 그대로.
+    빈 값이면 캐시 노드도 프로바이더 temperature를 따른다 (bypass면 temperature=0 프로바이더에서만 캐시).
+
+기본 동작: state_interpreter / strategy_planner는 temperature 0으로 호출되고 응답이 캐시된다.
+
+환경변수:
+    LLM_CACHE_NODES=state_interpreter,strategy_planner   캐시할 노드 (빈 값이면 비활성화)
+    LLM_CACHE_TEMPERATURE_POLICY=bypass
+    LLM_CACHE_NODE_TEMPERATURE=0
+    LLM_CACHE_SIZE=2000
+    LLM_CACHE_TTL=600
+    LLM_CACHE_REDIS_TTL=3600
+"""
+import hashlib
+import json
+import logging
+import os
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, Optional, Sequence
+
+from src.core.cache import TieredCache
+
+from .base import ModelProvider
+
+logger = logging.getLogger(__name__)
+
+CACHE_NODES = frozenset(
+    node.strip()
+    for node in os.getenv("LLM_CACHE_NODES", "state_interpreter,strategy_planner").split(",")
+    if node.strip()
+)
+TEMPERATURE_POLICY = os.getenv("LLM_CACHE_TEMPERATURE_POLICY", "bypass").lower()  # bypass | cache
+
+_node_temperature = os.getenv("LLM_CACHE_NODE_TEMPERATURE", "0").strip()
+NODE_TEMPERATURE: Optional[float] = float(_node_temperature) if _node_temperature else None
+
+if TEMPERATURE_POLICY not in ("bypass", "cache"):
+    raise ValueError(
+        f"Unknown LLM_CACHE_TEMPERATURE_POLICY='{TEMPERATURE_POLICY}'. "
+        "Valid options: 'bypass', 'cache'"
+    )
+
+# 노드 이름 → 응답 캐시 (노드별 hit_rate를 따로 보기 위해 분리)
+_caches: Dict[str, TieredCache] = {}
+
+
+def _get_cache(node: str) -> TieredCache:
+    cache = _caches.get(node)
+    if cache is None:
+        cache = TieredCache(
+            f"llm:{node}",
+            maxsize=int(os.getenv("LLM_CACHE_SIZE", "2000")),
+            ttl=float(os.getenv("LLM_CACHE_TTL", "600")),
+            redis_ttl=float(os.getenv("LLM_CACHE_REDIS_TTL", "3600")),
+            serialize=lambda text: text.encode("utf-8"),
+            deserialize=lambda raw: raw.decode("utf-8"),
+        )
+        _caches[node] = cache
+    return cache
+
+
+class CachedProvider(ModelProvider):
+    """응답 캐시를 거치는 ModelProvider 래퍼 (노드 하나에 대응)"""
+
+    def __init__(self, inner: ModelProvider, node: str, policy: str = TEMPERATURE_POLICY):
+        self.inner = inner
+        self.node = node
+        self.policy = policy
+        self.cache = _get_cache(node)
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return self.inner.temperature
+
+    def with_temperature(self, temperature: float) -> ModelProvider:
+        return CachedProvider(self.inner.with_temperature(temperature), self.node, self.policy)
+
+    @property
+    def cacheable(self) -> bool:
+        """temperature 정책상 이 프로바이더의 응답을 캐시할 수 있는지"""
+        return self.policy == "cache" or self.inner.temperature == 0
+
+    def _key(self, prompt: str, system: Optional[str], schema: Optional[dict]) -> str:
+        payload = json.dumps(
+            [self.inner.name, self.inner.model_id, self.inner.temperature, system or "", prompt, schema],
+            ensure_ascii=False, sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _lookup(self, prompt: str, system: Optional[str], schema: Optional[dict]) -> tuple:
+        """(캐시 키, 캐시된 응답). 캐시 불가면 키도 None."""
+        if not self.cacheable:
+            return None, None
+        key = self._key(prompt, system, schema)
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"[llm_cache:{self.node}] hit {key[:12]}")
+        return key, cached
+
+    async def _alookup(self, prompt: str, system: Optional[str], schema: Optional[dict]) -> tuple:
+        """_lookup의 async 버전 (Redis 조회는 cache 스테이지 스레드 풀에서)"""
+        if not self.cacheable:
+            return None, None
+        key = self._key(prompt, system, schema)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            logger.debug(f"[llm_cache:{self.node}] hit {key[:12]}")
+        return key, cached
+
+    def _store(self, key: Optional[str], text: str) -> None:
+        # 빈 응답은 일시적 실패일 수 있으므로 저장하지 않음
+        if key is not None and text and text.strip():
+            self.cache.set(key, text)
+
+    async def _astore(self, key: Optional[str], text: str) -> None:
+        if key is not None and text and text.strip():
+            await self.cache.aset(key, text)
+
+    def generate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        key, cached = self._lookup(prompt, system, schema)
+        if cached is not None:
+            return cached
+        text = self.inner.generate(prompt, system, schema)
+        self._store(key, text)
+        return text
+
+    async def agenerate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        key, cached = await self._alookup(prompt, system, schema)
+        if cached is not None:
+            return cached
+        text = await self.inner.agenerate(prompt, system, schema)
+        await self._astore(key, text)
+        return text
+
+    async def agenerate_stream(
+        self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """히트면 캐시된 응답을 한 조각으로, 미스면 스트림을 그대로 흘리며 끝까지 받은 경우에만 저장.
+
+        소비자가 중간에 닫으면(취소 / 타임아웃 / 연결 끊김) 잘린 응답이므로 저장하지 않는다.
+        조기 종료 결과는 agenerate_until()이 완료를 확인한 뒤 저장.
+        """
+        key, cached = await self._alookup(prompt, system, schema)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async with aclosing(self.inner.agenerate_stream(prompt, system, schema)) as stream:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        await self._astore(key, "".join(chunks))
+
+    async def agenerate_until(
+        self, prompt: str, system: Optional[str] = None, stop: Optional[Callable[[str], bool]] = None,
+        schema: Optional[dict] = None,
+    ) -> str:
+        """히트면 캐시된 응답을 stop에 한 조각으로 넘기고 반환.
+
+        미스면 안쪽 프로바이더가 stop 조건 충족 또는 스트림 정상 종료로 반환했을 때만 저장
+        (취소 / 타임아웃은 예외로 빠져나가므로 잘린 응답이 캐시되지 않음).
+        """
+        key, cached = await self._alookup(prompt, system, schema)
+        if cached is not None:
+            if stop is not None:
+                stop(cached)
+            return cached
+        text = await self.inner.agenerate_until(prompt, system, stop, schema)
+        await self._astore(key, text)
+        return text
+
+    async def awarm_up(self, system_prompts: Sequence[str] = ()) -> None:
+        await self.inner.awarm_up(system_prompts)
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
+
+
+def with_response_cache(provider: ModelProvider, node: str) -> ModelProvider:
+    """LLM_CACHE_NODES에 포함된 노드면 CachedProvider로 감싸 반환, 아니면 그대로.
+
+    캐시 노드는 LLM_CACHE_NODE_TEMPERATURE로 temperature를 바꾼 프로바이더 사본으로 호출.
+    """
+    if node not in CACHE_NODES:
+        return provider
+    if NODE_TEMPERATURE is not None:
+        provider = provider.with_temperature(NODE_TEMPERATURE)
+    cached = CachedProvider(provider, node)
+    if not cached.cacheable:
+        logger.info(
+            f"[llm_cache:{node}] temperature={provider.temperature} → bypass "
+            f"(LLM_CACHE_TEMPERATURE_POLICY=cache로 캐시 허용)"
+        )
+    return cached
+
+
+def clear_response_caches() -> None:
+    """모든 노드의 응답 캐시 비우기 (프롬프트/모델 교체 배포 후 등)"""
+    for cache in _caches.values():
+        cache.clear()
@@ -7,16 +7,33 @@
     OLLAMA_BASE_URL=http://localhost:11434  # 로컬 직접 실행 시
     OLLAMA_BASE_URL=http://ollama:11434     # Docker Compose 내부 통신 시
     LOCAL_MODEL=llama3                      # 또는 mistral, gemma2 등
+    LOCAL_MODEL_TEMPERATURE=                # 미설정 시 Ollama 모델 기본값
+    OLLAMA_KEEP_ALIVE=30m                   # 마지막 요청 후 모델을 메모리에 유지할 시간 (-1: 무기한)
+    LOCAL_MODEL_NUM_CTX=                    # 컨텍스트 길이 고정 (요청마다 달라지면 모델이 다시 로드됨)
+    OLLAMA_WARMUP=true                      # 기동 시 모델 로드 + 노드 system 프롬프트 KV 캐시 예열
+
+구조화 출력:
+    schema가 주어지면 format=<JSON schema>로 보내 디코딩을 스키마 문법으로 제한 (Ollama 0.5+).
+
+프롬프트 prefix 재사용:
+    Ollama(llama.cpp)는 직전 요청과 토큰이 같은 prompt prefix의 KV 캐시를 재사용한다.
+    요청마다 keep_alive를 보내 모델이 내려가지 않게 하고(언로드되면 KV 캐시도 사라짐), 모델 로드를
+    일으키는 옵션(num_ctx)을 모든 요청에서 같게 유지하며, 기동 시 노드별 고정 system 프롬프트를
+    한 번씩 평가해 둔다. 같은 노드가 연달아 호출되면 system 프롬프트 구간은 다시 계산하지 않는다.
+    (/api/generate의 context 파라미터는 이전 대화 토큰을 이어 붙이는 용도라 prefix 재사용에는 쓰지 않음.
+     병렬 슬롯이 여럿이면(OLLAMA_NUM_PARALLEL) 슬롯마다 캐시가 따로 유지된다.)
 
 Ollama 설치:
     macOS: brew install ollama && ollama serve
     모델 다운로드: ollama pull llama3
 """
+import json
 import os
 import logging
-from typing import Optional
+import time
+from typing import AsyncIterator, Optional, Sequence
 
-import httpx
+from src.core.http_client import ahttp_request, ahttp_stream, http_request
 
 from .base import ModelProvider
 
@@ -30,34 +47,126 @@ class LocalProvider(ModelProvider):
         self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         self.model = os.getenv("LOCAL_MODEL", "llama3")
         self.timeout = float(os.getenv("LOCAL_MODEL_TIMEOUT", "120"))
+        temperature = os.getenv("LOCAL_MODEL_TEMPERATURE")
+        self.temperature = float(temperature) if temperature else None
+        self.keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+        num_ctx = os.getenv("LOCAL_MODEL_NUM_CTX")
+        self.num_ctx = int(num_ctx) if num_ctx else None
+        self.warmup_enabled = os.getenv("OLLAMA_WARMUP", "true").lower() == "true"
+
+    def _options(self) -> dict:
+        options: dict = {}
+        if self.temperature is not None:
+            options["temperature"] = self.temperature
+        if self.num_ctx is not None:
+            options["num_ctx"] = self.num_ctx
+        return options
 
-    def generate(self, prompt: str, system: Optional[str] = None) -> str:
+    def _payload(
+        self, prompt: str, system: Optional[str], stream: bool = False, schema: Optional[dict] = None,
+    ) -> dict:
         payload: dict = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
         }
         if system:
             payload["system"] = system
+        if schema:
+            payload["format"] = schema
+        options = self._options()
+        if options:
+            payload["options"] = options
+        return payload
 
+    def generate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
         logger.debug(f"Ollama request: model={self.model}, url={self.base_url}")
 
-        response = httpx.post(
+        response = http_request(
+            "POST",
+            f"{self.base_url}/api/generate",
+            json=self._payload(prompt, system, schema=schema),
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["response"]
+
+    async def agenerate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        logger.debug(f"Ollama async request: model={self.model}, url={self.base_url}")
+
+        response = await ahttp_request(
+            "POST",
             f"{self.base_url}/api/generate",
-            json=payload,
+            json=self._payload(prompt, system, schema=schema),
             timeout=self.timeout,
         )
         response.raise_for_status()
         return response.json()["response"]
 
+    async def agenerate_stream(
+        self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """Ollama 스트리밍 응답 (NDJSON: 줄마다 {"response": "...", "done": false})"""
+        logger.debug(f"Ollama stream request: model={self.model}, url={self.base_url}")
+
+        async with ahttp_stream(
+            "POST",
+            f"{self.base_url}/api/generate",
+            json=self._payload(prompt, system, stream=True, schema=schema),
+            timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    break
+
+    async def awarm_up(self, system_prompts: Sequence[str] = ()) -> None:
+        """모델을 메모리에 올리고 system 프롬프트별 KV 캐시를 예열 (실패해도 서비스에는 영향 없음)"""
+        if not self.warmup_enabled:
+            return
+        url = f"{self.base_url}/api/generate"
+        start = time.time()
+        try:
+            # prompt 없는 요청 = 모델 로드만
+            load = {"model": self.model, "keep_alive": self.keep_alive}
+            if self.num_ctx is not None:
+                load["options"] = {"num_ctx": self.num_ctx}
+            response = await ahttp_request("POST", url, json=load, timeout=self.timeout)
+            response.raise_for_status()
+            logger.info(f"[local] model {self.model} loaded in {time.time() - start:.1f}s")
+
+            for system in system_prompts:
+                payload = self._payload(".", system)
+                payload["options"] = {**payload.get("options", {}), "num_predict": 1}
+                response = await ahttp_request("POST", url, json=payload, timeout=self.timeout)
+                response.raise_for_status()
+            logger.info(
+                f"[local] warm-up done in {time.time() - start:.1f}s "
+                f"({len(system_prompts)} system prompts, keep_alive={self.keep_alive})"
+            )
+        except Exception as e:
+            logger.warning(f"[local] warm-up skipped: {e}")
+
     def is_running(self) -> bool:
         """Ollama 서버 실행 여부 확인"""
         try:
-            r = httpx.get(f"{self.base_url}/api/tags", timeout=2.0)
+            r = http_request("GET", f"{self.base_url}/api/tags", timeout=2.0, retries=0)
             return r.status_code == 200
         except Exception:
             return False
 
+    @property
+    def model_id(self) -> str:
+        return self.model
+
     @property
     def name(self) -> str:
         return f"local({self.model})"
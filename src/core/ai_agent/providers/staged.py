@@ -0,0 +1,58 @@
+"""
+LLM 동시 실행 제한 프로바이더 래퍼
+
+모든 LLM 호출을 "llm" 스테이지(src/core/stages.py)의 slot 안에서 실행해 동시 호출 수를
+STAGE_LLM_WORKERS로 제한하고 대기열 길이 / 대기 시간을 /health의 stages로 노출한다.
+
+응답 캐시(CachedProvider)는 이 래퍼 바깥에 두어 캐시 히트는 slot을 잡지 않는다:
+    with_response_cache(StagedProvider(provider), node)
+"""
+from contextlib import aclosing
+from typing import AsyncIterator, Optional, Sequence
+
+from src.core.stages import get_stage
+
+from .base import ModelProvider
+
+
+class StagedProvider(ModelProvider):
+    """llm 스테이지 slot 안에서 호출하는 ModelProvider 래퍼"""
+
+    def __init__(self, inner: ModelProvider, stage: str = "llm"):
+        self.inner = inner
+        self.stage = get_stage(stage)
+
+    @property
+    def model_id(self) -> str:
+        return self.inner.model_id
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return self.inner.temperature
+
+    def with_temperature(self, temperature: float) -> ModelProvider:
+        return StagedProvider(self.inner.with_temperature(temperature), self.stage.name)
+
+    def generate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        return self.inner.generate(prompt, system, schema)
+
+    async def agenerate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        async with self.stage.slot():
+            return await self.inner.agenerate(prompt, system, schema)
+
+    async def agenerate_stream(
+        self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """스트림이 끝날 때까지 slot 유지 (디코딩 중인 호출도 동시 실행 수에 포함)"""
+        async with self.stage.slot():
+            # 조기 종료로 이 스트림이 닫히면 안쪽 스트림도 즉시 닫아 디코딩 중단
+            async with aclosing(self.inner.agenerate_stream(prompt, system, schema)) as stream:
+                async for chunk in stream:
+                    yield chunk
+
+    async def awarm_up(self, system_prompts: Sequence[str] = ()) -> None:
+        await self.inner.awarm_up(system_prompts)
+
+    @property
+    def name(self) -> str:
+        return self.inner.name
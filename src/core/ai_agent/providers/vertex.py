@@ -8,18 +8,43 @@ Vertex AI (Gemini) 프로바이더
     GCP_REGION=us-central1
     VERTEX_AI_MODEL=gemini-2.0-flash
 
+구조화 출력:
+    schema가 주어지면 response_mime_type="application/json" + response_schema로 디코딩을 제한.
+    객체마다 property_ordering(properties 순서 = 노드 출력 모델의 필드 순서)을 붙여 그 순서대로 생성
+    → fused_planner는 분석 → 전략 → image_prompt → text_content 순서를 유지하고, 미디어 선행 시작도
+    조건이 갖춰진 프롬프트로 시작됨. (property_ordering이 없으면 Gemini는 속성을 이름순으로 생성)
+    설치된 SDK가 이 키를 거부하면(스키마 변환 시 ValueError 등) 경고 한 번 남기고 이후엔 키 없이 보냄.
+
 인증:
     gcloud auth application-default login
     또는 GOOGLE_APPLICATION_CREDENTIALS 환경변수로 서비스 계정 키 경로 지정
 """
 import os
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from .base import ModelProvider
 
 logger = logging.getLogger(__name__)
 
+# SDK가 response_schema의 property_ordering을 거부한 적이 있으면 False (이후 생략)
+_property_ordering = True
+
+
+def _with_property_ordering(node):
+    """객체 스키마마다 property_ordering = properties 키 순서 (중첩 객체 / 배열 items 포함)"""
+    if isinstance(node, dict):
+        ordered = {key: _with_property_ordering(value) for key, value in node.items()}
+        if isinstance(node.get("properties"), dict):
+            ordered["properties"] = {
+                name: _with_property_ordering(value) for name, value in node["properties"].items()
+            }
+            ordered["property_ordering"] = list(node["properties"])
+        return ordered
+    if isinstance(node, list):
+        return [_with_property_ordering(item) for item in node]
+    return node
+
 
 class VertexProvider(ModelProvider):
     """Vertex AI Gemini 프로바이더"""
@@ -44,21 +69,86 @@ class VertexProvider(ModelProvider):
 
         return self._model
 
-    def generate(self, prompt: str, system: Optional[str] = None) -> str:
+    def _generation_config(self, schema: Optional[dict] = None):
+        global _property_ordering
+        from vertexai.generative_models import GenerationConfig
+        if not schema:
+            return GenerationConfig(
+                temperature=self.temperature,
+                max_output_tokens=self.max_tokens,
+            )
+        if _property_ordering:
+            try:
+                return GenerationConfig(
+                    temperature=self.temperature,
+                    max_output_tokens=self.max_tokens,
+                    response_mime_type="application/json",
+                    response_schema=_with_property_ordering(schema),
+                )
+            except (TypeError, ValueError, KeyError) as e:
+                # 구버전 SDK: Schema에 property_ordering 필드가 없음 → 이름순 생성으로 후퇴
+                _property_ordering = False
+                logger.warning(f"[vertex] SDK rejected property_ordering, sending schema without it: {e}")
+        return GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+            response_mime_type="application/json",
+            response_schema=schema,
+        )
+
+    def generate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
         model = self._get_model()
 
         full_prompt = f"{system}\n\n{prompt}" if system else prompt
 
-        from vertexai.generative_models import GenerationConfig
         response = model.generate_content(
             full_prompt,
-            generation_config=GenerationConfig(
-                temperature=self.temperature,
-                max_output_tokens=self.max_tokens,
-            ),
+            generation_config=self._generation_config(schema),
         )
         return response.text
 
+    async def agenerate(self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None) -> str:
+        model = self._get_model()
+
+        full_prompt = f"{system}\n\n{prompt}" if system else prompt
+
+        response = await model.generate_content_async(
+            full_prompt,
+            generation_config=self._generation_config(schema),
+        )
+        return response.text
+
+    @property
+    def model_id(self) -> str:
+        return self.model_name
+
+    async def agenerate_stream(
+        self, prompt: str, system: Optional[str] = None, schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        model = self._get_model()
+
+        full_prompt = f"{system}\n\n{prompt}" if system else prompt
+
+        responses = await model.generate_content_async(
+            full_prompt,
+            generation_config=self._generation_config(schema),
+            stream=True,
+        )
+        try:
+            async for chunk in responses:
+                # 안전 필터 등으로 후보가 없는 조각은 .text 접근 시 ValueError
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue
+                if text:
+                    yield text
+        finally:
+            # 조기 종료(agenerate_until) 시 남은 스트림을 닫아 서버 쪽 생성 중단
+            close = getattr(responses, "aclose", None)
+            if close is not None:
+                await close()
+
     @property
     def name(self) -> str:
         return "vertex"
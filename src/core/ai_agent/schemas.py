@@ -0,0 +1,198 @@
+"""
+LLM 노드 출력 스키마 (구조화 출력)
+
+노드마다 출력 형태를 pydantic 모델 하나로 선언하고, 같은 모델에서
+    - 프롬프트에 넣는 JSON 형식 안내 (prompt_skeleton)
+    - 프로바이더에 넘기는 응답 스키마 (response_schema)
+        Vertex: GenerationConfig(response_mime_type="application/json", response_schema=...)
+        Ollama: /api/generate의 format=<JSON schema>
+    - 응답 검증 (parse_output → 타입이 있는 객체, 실패 시 None)
+을 만든다. 스키마로 디코딩을 제한하면 ```json 래퍼, 누락 필드, 잘못된 enum 값 때문에 기본값으로
+떨어지는 경우가 없어진다.
+
+state에는 검증된 모델의 model_dump() dict를 저장 (체크포인트 / 응답 캐시 / API 응답이 그대로 직렬화).
+
+파싱 실패율: output_stats()에 노드별 parsed / failures / failure_rate (/health의 llm_outputs)
+
+환경변수:
+    LLM_STRUCTURED_OUTPUT=true   false면 프로바이더에 스키마를 넘기지 않음 (프롬프트 안내 + 검증만)
+"""
+import functools
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Literal, Optional, Type, TypeVar, get_args
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from .json_stream import extract_object
+
+logger = logging.getLogger(__name__)
+
+STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+M = TypeVar("M", bound=BaseModel)
+
+
+# ──────────────────────────────────────────
+# 노드별 출력 모델 (필드 순서 = 프롬프트 / 스트리밍 순서)
+# ──────────────────────────────────────────
+
+class StateAnalysis(BaseModel):
+    """state_interpreter 출력"""
+    intent: str = Field(description="사용자의 핵심 의도 (한 문장)")
+    mood: str = Field(description="현재 감정 상태 (예: 설레는, 편안한, 호기심 있는)")
+    needs: str = Field(description="현재 필요한 것 (한 문장)")
+    recommendation_direction: str = Field(description="어떤 방향의 콘텐츠가 어울리는지 (한 문장)")
+
+
+CombinationMethod = Literal["story_blend", "inline", "subtle"]
+
+
+class Strategy(BaseModel):
+    """strategy_planner 출력"""
+    selected_ad_id: str = Field(description="선택한 광고 ID")
+    selected_product: str = Field(description="상품명")
+    selected_brand: str = Field(description="브랜드명")
+    combination_method: CombinationMethod = Field(description="story_blend | inline | subtle 중 선택")
+    rationale: str = Field(description="이 광고를 선택한 이유 (한 문장)")
+    key_message: str = Field(description="핵심 메시지 (한 문장)")
+    visual_direction: str = Field(description="이미지/영상의 시각적 방향 (한 문장, 영어로)")
+
+    @field_validator("combination_method", mode="before")
+    @classmethod
+    def _known_combination_method(cls, value: Any) -> Any:
+        """목록 밖 값(스키마 없이 생성된 응답)은 전략 전체를 버리지 않고 subtle로"""
+        if isinstance(value, str):
+            value = value.strip().lower()
+        return value if value in get_args(CombinationMethod) else "subtle"
+
+
+# 프롬프트 필드를 text_content보다 먼저 받아야 미디어 생성을 텍스트 디코딩과 겹칠 수 있음
+class Creative(BaseModel):
+    """creative_generator 출력"""
+    image_prompt: str = Field(
+        description="Stable Diffusion / Imagen 최적화 영어 프롬프트 (상품/브랜드 분위기 묘사, 50~80단어, 사진 스타일 포함)"
+    )
+    negative_prompt: str = Field(
+        default="bad quality, blurry, watermark, text overlay",
+        description="bad quality, blurry, watermark, text overlay, low resolution, deformed",
+    )
+    text_content: str = Field(
+        description="SNS 텍스트 게시물 (100~200자, 해시태그 2~3개 포함, 광고가 자연스럽게 녹아들도록)"
+    )
+
+
+class FusedPlan(BaseModel):
+    """fused_planner 출력 (상태 분석 + 전략 + 크리에이티브)"""
+    state_analysis: StateAnalysis
+    strategy: Strategy
+    image_prompt: str = Creative.model_fields["image_prompt"]
+    negative_prompt: str = Creative.model_fields["negative_prompt"]
+    text_content: str = Creative.model_fields["text_content"]
+
+
+# ──────────────────────────────────────────
+# 프롬프트 안내 / 프로바이더 스키마
+# ──────────────────────────────────────────
+
+def prompt_skeleton(model: Type[BaseModel], depth: int = 0) -> str:
+    """프롬프트에 넣는 JSON 형식 안내 ({"필드": "설명", ...}, 중첩 모델은 펼침)"""
+    pad = "  " * (depth + 1)
+    lines = []
+    for name, field in model.model_fields.items():
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseModel):
+            value = prompt_skeleton(field.annotation, depth + 1)
+        else:
+            value = json.dumps(field.description or "", ensure_ascii=False)
+        lines.append(f'{pad}"{name}": {value}')
+    return "{\n" + ",\n".join(lines) + "\n" + "  " * depth + "}"
+
+
+def _inline(node: Any, defs: Dict[str, Any]) -> Any:
+    """$ref를 펼치고 title / default 제거 (Vertex Schema는 $defs를 지원하지 않음).
+
+    properties는 모델 필드 순서 그대로 (Ollama는 이 순서로 생성, Vertex는 프로바이더에서
+    property_ordering으로 옮김)
+    """
+    if isinstance(node, dict):
+        if "$ref" in node:
+            return _inline(defs[node["$ref"].rsplit("/", 1)[-1]], defs)
+        return {
+            key: _inline(value, defs)
+            for key, value in node.items()
+            if key not in ("title", "default", "$defs")
+        }
+    if isinstance(node, list):
+        return [_inline(item, defs) for item in node]
+    return node
+
+
+@functools.lru_cache(maxsize=None)
+def _json_schema(model: Type[BaseModel]) -> dict:
+    schema = model.model_json_schema()
+    return _inline(schema, schema.get("$defs", {}))
+
+
+def response_schema(model: Type[BaseModel]) -> Optional[dict]:
+    """프로바이더에 넘길 JSON 스키마 (LLM_STRUCTURED_OUTPUT=false면 None)"""
+    return _json_schema(model) if STRUCTURED_OUTPUT else None
+
+
+# ──────────────────────────────────────────
+# 검증 + 노드별 파싱 실패율
+# ──────────────────────────────────────────
+
+class _OutputStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, list] = {}   # 노드 → [parsed, failures]
+
+    def record(self, node: str, ok: bool) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(node, [0, 0])
+            counts[0 if ok else 1] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                node: {
+                    "parsed": parsed,
+                    "failures": failures,
+                    "failure_rate": round(failures / (parsed + failures), 4) if parsed + failures else 0.0,
+                }
+                for node, (parsed, failures) in self._counts.items()
+            }
+
+
+_stats = _OutputStats()
+
+
+def parse_output(node: str, model: Type[M], text: str) -> Optional[M]:
+    """LLM 응답을 노드 출력 모델로 검증. 실패하면 None (노드별 실패 수 기록).
+
+    스키마 없이 생성된 응답의 ```json 래퍼 / 앞뒤 설명은 프로바이더의 agenerate_json과 같은
+    파서(json_stream.extract_object)로 걸러낸다.
+    """
+    try:
+        result = model.model_validate_json(extract_object(text))
+    except ValidationError as e:
+        _stats.record(node, False)
+        logger.warning(f"[schemas] {node} output rejected ({e.error_count()} errors): {e.errors()[0]['msg']}")
+        return None
+    _stats.record(node, True)
+    return result
+
+
+def coerce(model: Type[M], value: Any) -> Optional[M]:
+    """state에 저장된 dict(또는 스트리밍 중 완성된 필드)를 모델로. 형식이 다르면 None."""
+    try:
+        return model.model_validate(value)
+    except ValidationError:
+        return None
+
+
+def output_stats() -> dict:
+    """노드별 LLM 출력 파싱 성공 / 실패 수 (/health)"""
+    return _stats.as_dict()
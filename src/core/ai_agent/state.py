@@ -1,27 +1,38 @@
 """
 LangGraph 에이전트 상태 스키마
 """
+import asyncio
 from typing import TypedDict, Optional, List
 
+import numpy as np
+
 
 class FeedAgentState(TypedDict):
     """피드 생성 에이전트 상태
 
     Pipeline (6단계):
-        load_context → state_interpreter → retrieve_candidates
+        load_context → [state_interpreter ∥ retrieve_candidates]
                      → strategy_planner → creative_generator
                      → media_generator
+
+    AGENT_PIPELINE=fused는 2·4·5단계를 fused_planner 하나로 대체 (같은 필드를 채움).
+
+    노드별 읽기/쓰기 키는 FeedAgent._node_specs()에 선언 (병렬 스테이지 계획 근거).
     """
     # ── 입력 ──────────────────────────────
     user_id: str
     prompt: str
+    deadline: Optional[float]    # 요청 지연 예산 마감 시각 (epoch 초, None이면 무제한) — budget.py
+    generation_id: Optional[str]        # 체크포인트 키 (같은 값으로 재시도 시 이어서 실행) — checkpoint.py
+    completed_nodes: List[str]          # 깨끗하게 끝난 그래프 노드(스테이지) 이름, 실행 순서의 prefix
+    checkpoint_stages: bool             # True면 스테이지마다 체크포인트 저장, False면 실패 시 마지막에 한 번
 
     # ── load_context ──────────────────────
     user_context: dict           # 사용자 프로필 + 관심사 + 최근 활동
-    user_vector: Optional[List[float]]  # DB long_term_vector (retrieve_candidates에서 재사용)
+    user_vector: Optional[np.ndarray]   # DB long_term_vector, float32 연속 배열 (retrieve_candidates에서 재사용)
 
     # ── state_interpreter ─────────────────
-    state_analysis: str          # 사용자 의도/감정/니즈 분석 (JSON string)
+    state_analysis: dict         # 사용자 의도/감정/니즈 분석 (schemas.StateAnalysis로 검증된 dict)
 
     # ── retrieve_candidates ───────────────
     ad_candidates: List[dict]    # 광고 후보 목록
@@ -29,19 +40,23 @@ class FeedAgentState(TypedDict):
     reference_contents: List[dict]      # 참고 콘텐츠 목록 (creative_generator 컨텍스트)
 
     # ── strategy_planner ──────────────────
-    strategy: str                # 결합 전략 (JSON string)
+    strategy: dict               # 결합 전략 (schemas.Strategy로 검증된 dict)
 
     # ── creative_generator ────────────────
     generated_content: str       # SNS 텍스트 게시물
     image_prompt: str            # 이미지/영상 생성용 프롬프트 (영어)
     negative_prompt: str         # 네거티브 프롬프트
+    media_task: Optional[asyncio.Task]  # 스트리밍 중 선행 시작한 미디어 생성 (media_generator가 await)
+    media_tasks: List[asyncio.Task]     # 이 실행에서 시작한 선행 미디어 태스크 (media_generator 미도달 시 취소)
 
     # ── media_generator ───────────────────
-    media_type: str              # "image" | "video" | "text"
+    media_type: str              # "image" | "video" | "text" (저하 시 media_generator가 변경)
+    requested_media_type: str    # 요청한 media_type (체크포인트 요청 식별용, 변경되지 않음)
     media_data: str              # base64 인코딩 데이터
     media_metadata: dict         # 생성 메타데이터 (모델명, 생성시간 등)
 
     # ── 공통 메타 ─────────────────────────
     provider_name: str           # LLM 프로바이더 이름
     media_provider_name: str     # 미디어 프로바이더 이름
+    degradations: List[str]      # 예산 부족으로 적용한 품질 저하 ("노드:방식", 응답 metadata에 노출)
     error: Optional[str]
@@ -0,0 +1,332 @@
+"""
+In-process 벡터 인덱스 (campaigns / products / contents 카탈로그 미러)
+
+카탈로그는 요청량에 비해 작고 자주 바뀌지 않으므로, 정규화된 float32 행렬을
+파일로 내려두고 np.memmap으로 열어 모든 uvicorn 워커가 OS 페이지 캐시의 한 벌을 공유한다.
+db_data의 retrieve_* 함수가 인덱스가 준비된 테이블은 DB 왕복 없이 메모리에서 검색하고,
+준비 전(cold)에는 기존 SQL 경로로 fallback.
+
+갱신 (버전 컬럼 기반 증분):
+    - 워커 중 파일 락(.writer.lock)을 잡은 한 프로세스만 DB를 읽어 새 세대(generation)를 기록
+    - count / max(updated_at)가 바뀐 테이블만, updated_at >= watermark 인 행만 조회해 병합
+    - 삭제로 행 수가 어긋나면 전체 재적재
+    - 나머지 워커는 manifest의 generation 변화를 감지해 새 파일을 memmap
+
+검색:
+    - hnswlib이 설치되어 있으면 세대별 HNSW 인덱스 파일을 함께 기록/로드 (ANN)
+    - 없으면 행렬 곱 + argpartition 정확 검색 (카탈로그 규모에서 충분히 빠름)
+
+환경변수:
+    VECTOR_INDEX_ENABLED=false
+    VECTOR_INDEX_DIR=/tmp/ai_agent_vector_index
+    VECTOR_INDEX_REFRESH_SECONDS=30
+    VECTOR_INDEX_ANN=auto | exact        auto: hnswlib 사용 가능 시 HNSW
+"""
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.db import get_connection
+
+logger = logging.getLogger(__name__)
+
+# 테이블별 (id 컬럼, 메타 컬럼)
+_TABLES = {
+    "campaigns": ("campaign_id", "campaign_id, brand_id, campaign_data, targeting_rules"),
+    "products": ("product_id", "product_id, brand_id, product_data"),
+    "contents": ("content_id", "content_id, content_type, metadata"),
+}
+
+# 유지할 과거 세대 수 (다른 워커가 아직 memmap 중일 수 있음)
+_KEEP_GENERATIONS = 2
+
+
+class _Snapshot:
+    """한 테이블의 특정 세대 (읽기 전용)"""
+
+    def __init__(self, generation: int, rows: List[dict], matrix: np.ndarray, ann=None):
+        self.generation = generation
+        self.rows = rows
+        self.matrix = matrix      # (n, dim) L2 정규화, memmap
+        self.ann = ann
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[dict, float]]:
+        """코사인 유사도 상위 k개 (row, similarity)"""
+        n = len(self.rows)
+        if n == 0 or k <= 0:
+            return []
+        k = min(k, n)
+
+        if self.ann is not None:
+            self.ann.set_ef(max(k, 50))
+            labels, distances = self.ann.knn_query(query, k=k)
+            return [(self.rows[i], float(1 - d)) for i, d in zip(labels[0], distances[0])]
+
+        scores = self.matrix @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.rows[i], float(scores[i])) for i in top]
+
+
+class VectorIndex:
+    """카탈로그 3개 테이블의 in-process 벡터 인덱스"""
+
+    def __init__(self, directory: str, refresh_seconds: float = 30.0, ann: str = "auto"):
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.refresh_seconds = refresh_seconds
+        self.use_hnsw = ann == "auto" and _hnswlib_available()
+
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._lock_file = None
+        # writer 전용 상태: table → {"items": {id: (row, vector)}, "count", "watermark"}
+        self._writer_state: Dict[str, dict] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ── 조회 ──────────────────────────────
+
+    def ready(self, table: str) -> bool:
+        snapshot = self._snapshots.get(table)
+        return snapshot is not None and len(snapshot.rows) > 0
+
+    def search(self, table: str, query: np.ndarray, k: int) -> List[Tuple[dict, float]]:
+        snapshot = self._snapshots.get(table)
+        if snapshot is None:
+            return []
+        return snapshot.search(_normalize(query), k)
+
+    def stats(self) -> dict:
+        return {
+            "writer": self._lock_file is not None,
+            "ann": "hnsw" if self.use_hnsw else "exact",
+            "tables": {
+                table: {"generation": snap.generation, "rows": len(snap.rows)}
+                for table, snap in self._snapshots.items()
+            },
+        }
+
+    # ── 갱신 루프 ─────────────────────────
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="vector-index-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"[vector_index] refresh failed: {e}")
+            self._stop.wait(self.refresh_seconds)
+
+    def refresh(self) -> None:
+        """writer면 DB 변경분을 새 세대로 기록하고, 모든 워커는 최신 세대를 로드"""
+        if self._try_become_writer():
+            for table in _TABLES:
+                self._sync_table(table)
+        for table in _TABLES:
+            self._load_latest(table)
+
+    def _try_become_writer(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        f = open(self.dir / ".writer.lock", "a+")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        logger.info(f"[vector_index] this worker (pid={os.getpid()}) is the index writer")
+        return True
+
+    # ── writer: DB → 세대 파일 ────────────
+
+    def _sync_table(self, table: str) -> None:
+        id_col, columns = _TABLES[table]
+        state = self._writer_state.get(table)
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT count(*) AS n, max(updated_at) AS version "
+                    f"FROM {table} WHERE embedding IS NOT NULL"
+                )
+                head = cur.fetchone()
+                if state and head["n"] == state["count"] and head["version"] == state["watermark"]:
+                    return
+
+                if state is None or state["watermark"] is None:
+                    cur.execute(
+                        f"SELECT {columns}, embedding FROM {table} WHERE embedding IS NOT NULL"
+                    )
+                    items = {}
+                else:
+                    cur.execute(
+                        f"SELECT {columns}, embedding FROM {table} "
+                        f"WHERE embedding IS NOT NULL AND updated_at >= %s",
+                        (state["watermark"],),
+                    )
+                    items = dict(state["items"])
+                changed = cur.fetchall()
+
+                for row in changed:
+                    vector = _as_float32(row.pop("embedding"))
+                    items[row[id_col]] = (dict(row), vector)
+
+                if len(items) != head["n"]:
+                    # 삭제(또는 embedding NULL 처리)된 행 → 전체 재적재
+                    cur.execute(
+                        f"SELECT {columns}, embedding FROM {table} WHERE embedding IS NOT NULL"
+                    )
+                    items = {}
+                    for row in cur.fetchall():
+                        vector = _as_float32(row.pop("embedding"))
+                        items[row[id_col]] = (dict(row), vector)
+
+        self._writer_state[table] = {
+            "items": items,
+            "count": head["n"],
+            "watermark": head["version"],
+        }
+        self._write_generation(table, items)
+        logger.info(f"[vector_index] {table}: {len(changed)} changed rows, {len(items)} total")
+
+    def _write_generation(self, table: str, items: dict) -> None:
+        generation = time.time_ns()
+        rows = [row for row, _ in items.values()]
+        if items:
+            matrix = np.stack([_normalize(v) for _, v in items.values()]).astype(np.float32)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        prefix = self.dir / f"{table}.{generation}"
+        _atomic_write(Path(f"{prefix}.f32"), matrix.tobytes())
+        _atomic_write(Path(f"{prefix}.rows.json"), json.dumps(rows, ensure_ascii=False, default=str).encode())
+
+        if self.use_hnsw and len(rows):
+            import hnswlib
+            ann = hnswlib.Index(space="cosine", dim=matrix.shape[1])
+            ann.init_index(max_elements=len(rows), ef_construction=200, M=16)
+            ann.add_items(matrix, np.arange(len(rows)))
+            tmp = f"{prefix}.hnsw.tmp"
+            ann.save_index(tmp)
+            os.replace(tmp, f"{prefix}.hnsw")
+
+        manifest = {"generation": generation, "rows": len(rows), "dim": int(matrix.shape[1]) if items else 0}
+        _atomic_write(self.dir / f"{table}.manifest.json", json.dumps(manifest).encode())
+        self._cleanup(table)
+
+    def _cleanup(self, table: str) -> None:
+        generations = sorted(
+            {int(p.name.split(".")[1]) for p in self.dir.glob(f"{table}.*.f32")},
+            reverse=True,
+        )
+        for old in generations[_KEEP_GENERATIONS:]:
+            for path in self.dir.glob(f"{table}.{old}.*"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    # ── reader: 세대 파일 → memmap ────────
+
+    def _load_latest(self, table: str) -> None:
+        manifest_path = self.dir / f"{table}.manifest.json"
+        if not manifest_path.exists():
+            return
+        manifest = json.loads(manifest_path.read_text())
+        generation = manifest["generation"]
+        current = self._snapshots.get(table)
+        if current is not None and current.generation == generation:
+            return
+
+        prefix = self.dir / f"{table}.{generation}"
+        rows = json.loads(Path(f"{prefix}.rows.json").read_text())
+        if manifest["rows"]:
+            matrix = np.memmap(
+                f"{prefix}.f32", dtype=np.float32, mode="r",
+                shape=(manifest["rows"], manifest["dim"]),
+            )
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        ann = None
+        if self.use_hnsw and manifest["rows"] and os.path.exists(f"{prefix}.hnsw"):
+            import hnswlib
+            ann = hnswlib.Index(space="cosine", dim=manifest["dim"])
+            ann.load_index(f"{prefix}.hnsw", max_elements=manifest["rows"])
+
+        self._snapshots[table] = _Snapshot(generation, rows, matrix, ann)
+        logger.info(f"[vector_index] loaded {table} generation={generation} rows={len(rows)}")
+
+
+# ──────────────────────────────────────────
+# 싱글턴
+# ──────────────────────────────────────────
+
+_index_instance: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """VECTOR_INDEX_ENABLED=true면 인덱스 반환 (최초 호출 시 갱신 스레드 시작), 아니면 None"""
+    global _index_instance
+
+    if os.getenv("VECTOR_INDEX_ENABLED", "false").lower() != "true":
+        return None
+    if _index_instance is None:
+        with _index_lock:
+            if _index_instance is None:
+                index = VectorIndex(
+                    os.getenv("VECTOR_INDEX_DIR", "/tmp/ai_agent_vector_index"),
+                    refresh_seconds=float(os.getenv("VECTOR_INDEX_REFRESH_SECONDS", "30")),
+                    ann=os.getenv("VECTOR_INDEX_ANN", "auto").lower(),
+                )
+                index.start()
+                _index_instance = index
+    return _index_instance
+
+
+# ──────────────────────────────────────────
+# 헬퍼
+# ──────────────────────────────────────────
+
+def _hnswlib_available() -> bool:
+    try:
+        import hnswlib  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _as_float32(vector) -> np.ndarray:
+    if isinstance(vector, str):
+        return np.fromstring(vector.strip("[]"), dtype=np.float32, sep=",")
+    return np.asarray(vector, dtype=np.float32)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
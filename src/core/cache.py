@@ -0,0 +1,276 @@
+"""
+프로세스 내 LRU + Redis 2단계 캐시
+
+- LRUCache:   스레드 안전, 최대 항목 수 + TTL, hit/miss 통계
+- TieredCache: LRU(1차) → Redis(2차, 선택) 순으로 조회. Redis 히트는 LRU에 채워 넣음
+- get_redis(): docker-compose의 redis 서비스 클라이언트. REDIS_HOST 미설정/연결 실패 시 None
+
+async 코드에서는 aget()/aset()을 사용: LRU 조회는 이벤트 루프에서 바로, Redis 왕복(최대 소켓 타임아웃)은
+"cache" 스테이지(src/core/stages.py) 전용 스레드 풀에서 실행해 이벤트 루프를 막지 않는다.
+
+환경변수:
+    REDIS_HOST=redis          미설정 시 Redis 계층 비활성화 (LRU만 사용)
+    REDIS_PORT=6379
+    REDIS_DB=0
+    REDIS_PASSWORD=
+    REDIS_SOCKET_TIMEOUT=0.2  Redis 장애가 요청 지연으로 번지지 않도록 짧게 유지
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from src.core.stages import get_stage
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """스레드 안전 LRU 캐시 (항목별 TTL)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()   # key → (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class TieredCache:
+    """LRU(프로세스 내) + Redis(공유) 2단계 캐시
+
+    Redis에는 bytes로 저장하므로 serialize/deserialize 함수를 주입한다.
+    Redis 오류는 캐시 미스로 취급하고 요청 흐름을 막지 않는다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        redis_ttl: Optional[float] = None,
+        serialize: Optional[Callable[[Any], bytes]] = None,
+        deserialize: Optional[Callable[[bytes], Any]] = None,
+        use_redis: bool = True,
+    ):
+        self.name = name
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.redis_ttl = redis_ttl if redis_ttl is not None else ttl
+        self._serialize = serialize
+        self._deserialize = deserialize
+        self._use_redis = use_redis and serialize is not None and deserialize is not None
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_errors = 0
+        _registry[name] = self
+
+    def _redis_key(self, key: str) -> str:
+        return f"ai_agent:{self.name}:{key}"
+
+    @property
+    def _redis_configured(self) -> bool:
+        return self._use_redis and bool(os.getenv("REDIS_HOST"))
+
+    def get(self, key: str) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        return self._redis_get(key)
+
+    async def aget(self, key: str) -> Any:
+        """get의 async 버전. LRU 히트는 바로 반환, Redis 조회만 cache 스테이지 스레드 풀에서."""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if not self._redis_configured:
+            return None
+        return await get_stage("cache").run(self._redis_get, key)
+
+    def _redis_get(self, key: str) -> Any:
+        client = get_redis() if self._use_redis else None
+        if client is None:
+            return None
+        try:
+            raw = client.get(self._redis_key(key))
+        except Exception as e:
+            self.redis_errors += 1
+            logger.debug(f"[cache:{self.name}] redis get failed: {e}")
+            return None
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        value = self._deserialize(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        self._redis_set(key, value)
+
+    async def aset(self, key: str, value: Any) -> None:
+        """set의 async 버전. LRU는 바로, Redis 저장은 cache 스테이지 스레드 풀에서."""
+        self.local.set(key, value)
+        if self._redis_configured:
+            await get_stage("cache").run(self._redis_set, key, value)
+
+    def _redis_set(self, key: str, value: Any) -> None:
+        client = get_redis() if self._use_redis else None
+        if client is None:
+            return
+        try:
+            ttl = int(self.redis_ttl) if self.redis_ttl else None
+            client.set(self._redis_key(key), self._serialize(value), ex=ttl)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.debug(f"[cache:{self.name}] redis set failed: {e}")
+
+    def delete(self, key: str) -> None:
+        """양쪽 계층에서 제거 (다른 프로세스의 LRU는 TTL 만료로 정리됨)"""
+        self.local.delete(key)
+
+        client = get_redis() if self._use_redis else None
+        if client is None:
+            return
+        try:
+            client.delete(self._redis_key(key))
+        except Exception as e:
+            self.redis_errors += 1
+            logger.debug(f"[cache:{self.name}] redis delete failed: {e}")
+
+    def clear(self) -> None:
+        """전체 무효화 (Redis는 이 캐시 prefix의 키만 삭제)"""
+        self.local.clear()
+
+        client = get_redis() if self._use_redis else None
+        if client is None:
+            return
+        try:
+            keys = list(client.scan_iter(match=self._redis_key("*"), count=500))
+            if keys:
+                client.delete(*keys)
+        except Exception as e:
+            self.redis_errors += 1
+            logger.debug(f"[cache:{self.name}] redis clear failed: {e}")
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        redis_total = self.redis_hits + self.redis_misses
+        stats.update({
+            "redis_enabled": self._use_redis and get_redis() is not None,
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+            "redis_errors": self.redis_errors,
+            "redis_hit_rate": round(self.redis_hits / redis_total, 3) if redis_total else 0.0,
+        })
+        return stats
+
+
+# 이름별 캐시 레지스트리 (/health 통계 노출용)
+_registry: Dict[str, TieredCache] = {}
+
+
+def cache_stats() -> dict:
+    """등록된 모든 캐시의 통계"""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+# ──────────────────────────────────────────
+# Redis 클라이언트 (싱글턴)
+# ──────────────────────────────────────────
+
+_redis_client = None
+_redis_retry_at = 0.0
+_redis_lock = threading.Lock()
+
+# 연결 실패 후 재시도까지 대기 시간(초)
+_REDIS_RETRY_INTERVAL = 30.0
+
+
+def get_redis():
+    """공유 Redis 클라이언트 반환. 미설정/장애 시 None (호출자는 LRU만 사용)."""
+    global _redis_client, _redis_retry_at
+
+    if _redis_client is not None:
+        return _redis_client
+    if not os.getenv("REDIS_HOST") or time.monotonic() < _redis_retry_at:
+        return None
+
+    with _redis_lock:
+        if _redis_client is not None:
+            return _redis_client
+        try:
+            import redis
+
+            timeout = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.2"))
+            client = redis.Redis(
+                host=os.getenv("REDIS_HOST"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=int(os.getenv("REDIS_DB", "0")),
+                password=os.getenv("REDIS_PASSWORD") or None,
+                socket_timeout=timeout,
+                socket_connect_timeout=timeout,
+            )
+            client.ping()
+            _redis_client = client
+            logger.info(f"[cache] redis connected: {os.getenv('REDIS_HOST')}")
+        except Exception as e:
+            _redis_retry_at = time.monotonic() + _REDIS_RETRY_INTERVAL
+            logger.warning(f"[cache] redis unavailable, using in-process cache only: {e}")
+            return None
+
+    return _redis_client
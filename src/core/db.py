@@ -1,17 +1,50 @@
 """
 PostgreSQL 연결 관리 (psycopg2)
+
+커넥션 풀:
+    get_connection()은 프로세스 공유 ConnectionPool에서 연결을 빌려주는 컨텍스트 매니저.
+    with 블록이 끝나면 commit(예외 시 rollback) 후 연결을 닫지 않고 풀에 반환.
+    asyncio.to_thread 워커 등 여러 스레드에서 동시에 사용해도 안전.
+
+async 경로:
+    run_db()는 동기 DB 함수를 "db" 스테이지(src/core/stages.py)의 전용 스레드 풀에서 실행한다.
+    DB 대기가 asyncio 기본 executor를 점유하지 않고, 동시 DB 작업 수가 풀 크기로 제한된다
+    (STAGE_DB_WORKERS 기본값 = POSTGRES_POOL_MAX). 대기열 길이 / 대기 시간은 /health의 stages.
+
+환경변수:
+    POSTGRES_POOL_MIN=1                 기동 시 미리 여는 연결 수
+    POSTGRES_POOL_MAX=20                최대 연결 수 (미설정 시 POSTGRES_MAX_CONNECTIONS)
+    POSTGRES_POOL_TIMEOUT=5             풀 포화 시 연결 대기 최대 시간(초)
+    POSTGRES_POOL_HEALTHCHECK_IDLE=30   이 시간(초) 이상 유휴였던 연결은 checkout 시 SELECT 1 검사
+
+pgvector:
+    첫 연결에서 pgvector 타입을 전역 등록해 vector 컬럼은 float32 numpy 배열로 받고,
+    numpy 배열 파라미터는 vector 리터럴로 바로 전달 (ast.literal_eval / list 변환 없음).
 """
 import os
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
 
+from src.core.stages import get_stage
+
 logger = logging.getLogger(__name__)
 
 
-def get_connection():
-    """새 DB 연결 반환. with 문과 함께 사용 권장."""
-    return psycopg2.connect(
+class PoolTimeout(psycopg2.OperationalError):
+    """풀이 포화 상태로 acquire 타임아웃 내에 연결을 얻지 못함"""
+
+
+def _connect():
+    """새 물리 연결 생성 (풀 내부에서만 사용)"""
+    conn = psycopg2.connect(
         host=os.getenv("POSTGRES_HOST", "localhost"),
         port=int(os.getenv("POSTGRES_PORT", "5432")),
         dbname=os.getenv("POSTGRES_DB", "ai_agent"),
@@ -19,3 +52,282 @@ def get_connection():
         password=os.getenv("POSTGRES_PASSWORD", "postgres"),
         cursor_factory=psycopg2.extras.RealDictCursor,
     )
+    _register_vector(conn)
+    return conn
+
+
+_vector_registered = False
+
+
+def _register_vector(conn) -> None:
+    """pgvector 타입 caster/adapter 등록 (프로세스당 1회, 전역 등록).
+
+    psycopg2는 텍스트 프로토콜만 지원하므로 전송 자체는 텍스트지만,
+    파싱/포맷이 numpy 내부에서 벡터화되어 Python 레벨 float 리스트를 만들지 않는다.
+    """
+    global _vector_registered
+    if _vector_registered:
+        return
+    try:
+        from pgvector.psycopg2 import register_vector
+        register_vector(conn)
+        conn.rollback()
+        _vector_registered = True
+    except Exception as e:
+        conn.rollback()
+        logger.warning(f"[db] pgvector type registration skipped: {e}")
+
+
+class ConnectionPool:
+    """스레드 안전 psycopg2 커넥션 풀
+
+    - minconn ~ maxconn 범위에서 연결 수를 관리
+    - 포화 시 timeout 동안 대기 후 PoolTimeout
+    - checkout 시 닫힌 연결 폐기, 오래 유휴였던 연결은 SELECT 1로 검사
+    """
+
+    def __init__(
+        self,
+        minconn: int = 1,
+        maxconn: int = 20,
+        timeout: float = 5.0,
+        healthcheck_idle: float = 30.0,
+    ):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"invalid pool size: min={minconn}, max={maxconn}")
+
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.healthcheck_idle = healthcheck_idle
+
+        self._cond = threading.Condition()
+        self._idle: deque = deque()   # (conn, 반납 시각)
+        self._size = 0                # 열린 연결 수 (idle + in_use + 생성 중)
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "acquired": 0,
+            "created": 0,
+            "discarded": 0,
+            "timeouts": 0,
+            "wait_time_ms_total": 0.0,
+        }
+
+        for _ in range(minconn):
+            try:
+                conn = _connect()
+            except Exception as e:
+                logger.warning(f"[db] pool prefill failed: {e}")
+                break
+            self._size += 1
+            self._stats["created"] += 1
+            self._idle.append((conn, time.monotonic()))
+
+    def acquire(self, timeout: Optional[float] = None):
+        """연결 checkout. 풀 포화 시 timeout(초)까지 대기."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            conn = None
+            idle_since = 0.0
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise psycopg2.InterfaceError("connection pool is closed")
+                    if self._idle:
+                        conn, idle_since = self._idle.pop()
+                        break
+                    if self._size < self.maxconn:
+                        self._size += 1   # 슬롯 예약 후 락 밖에서 연결 생성
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"DB 커넥션 풀 포화: {self.maxconn}개 모두 사용 중 ({timeout}s 대기)"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            if conn is None:
+                try:
+                    conn = _connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._stats["created"] += 1
+            elif not self._is_healthy(conn, idle_since):
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._in_use += 1
+                self._stats["acquired"] += 1
+                self._stats["wait_time_ms_total"] += (time.monotonic() - started) * 1000
+            return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        """연결 반납. 끊겼거나 트랜잭션이 정리되지 않은 연결은 폐기."""
+        with self._cond:
+            self._in_use -= 1
+
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard or conn.closed or self._closed:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.healthcheck_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"[db] stale pooled connection dropped: {e}")
+            return False
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    def close(self) -> None:
+        """유휴 연결을 모두 닫고 이후 checkout을 거부. 사용 중 연결은 반납 시 닫힘."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        """풀 포화도 통계"""
+        with self._cond:
+            acquired = self._stats["acquired"]
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "saturation": round(self._in_use / self.maxconn, 3),
+                "acquired": acquired,
+                "created": self._stats["created"],
+                "discarded": self._stats["discarded"],
+                "timeouts": self._stats["timeouts"],
+                "avg_wait_ms": round(self._stats["wait_time_ms_total"] / acquired, 3) if acquired else 0.0,
+            }
+
+
+# 싱글턴
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """프로세스 공유 커넥션 풀 반환 (최초 호출 시 생성)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    minconn=int(os.getenv("POSTGRES_POOL_MIN", "1")),
+                    maxconn=int(os.getenv(
+                        "POSTGRES_POOL_MAX", os.getenv("POSTGRES_MAX_CONNECTIONS", "20")
+                    )),
+                    timeout=float(os.getenv("POSTGRES_POOL_TIMEOUT", "5")),
+                    healthcheck_idle=float(os.getenv("POSTGRES_POOL_HEALTHCHECK_IDLE", "30")),
+                )
+                logger.info(
+                    f"[db] connection pool ready: min={_pool.minconn}, max={_pool.maxconn}"
+                )
+    return _pool
+
+
+@contextmanager
+def get_connection(timeout: Optional[float] = None) -> Iterator:
+    """풀에서 DB 연결을 빌려주는 컨텍스트 매니저.
+
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                ...
+
+    정상 종료 시 commit, 예외 시 rollback 후 풀에 반환.
+    """
+    pool = get_pool()
+    conn = pool.acquire(timeout)
+    discard = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception as e:
+        discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+        raise
+    finally:
+        pool.release(conn, discard=discard)
+
+
+def pool_stats() -> dict:
+    """풀 통계 (풀 미생성 시 빈 dict)"""
+    return _pool.stats() if _pool is not None else {}
+
+
+def close_pool() -> None:
+    """풀 종료 (앱 shutdown 시 호출)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+    get_stage("db").shutdown()
+
+
+# ──────────────────────────────────────────
+# async 경로
+# ──────────────────────────────────────────
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """동기 DB 함수를 전용 DB 스레드 풀에서 실행하고 결과를 await.
+
+        user = await run_db(get_user, user_id)
+    """
+    return await get_stage("db").run(fn, *args, **kwargs)
@@ -0,0 +1,262 @@
+"""
+공유 HTTP 클라이언트 (keep-alive 커넥션 풀)
+
+Ollama 호출, Replicate 결과 다운로드, 개발 모드 미디어 저장, 작업 webhook 등 모든 외부 HTTP 호출이
+프로세스 공유 httpx 클라이언트를 사용해 호출마다 TCP/TLS 연결을 새로 맺지 않는다.
+
+    resp = http_request("GET", url)                        # 동기 (스레드에서 호출하는 코드)
+    resp = await ahttp_request("POST", url, json=payload)  # async
+    async with ahttp_stream("POST", url, json=payload) as resp:
+        async for line in resp.aiter_lines(): ...
+
+- 커넥션 풀: HTTP_MAX_CONNECTIONS / HTTP_MAX_KEEPALIVE / HTTP_KEEPALIVE_EXPIRY
+- HTTP/2: h2 패키지가 설치돼 있으면 사용 (HTTP_HTTP2=false로 끔). 평문 http://는 HTTP/1.1 keep-alive.
+- 타임아웃: 호출자가 timeout을 주면 그 값, 없으면 HTTP_HOST_TIMEOUTS의 호스트별 값, 없으면 HTTP_TIMEOUT.
+  연결 단계는 HTTP_CONNECT_TIMEOUT으로 따로 제한.
+- 재시도 (HTTP_RETRIES, full jitter 지수 백오프):
+    연결 실패 / 연결 타임아웃 → 요청이 서버에 도달하지 않았으므로 항상 재시도
+    연결이 응답 도중 끊김 (RemoteProtocolError) → GET·HEAD·OPTIONS만 재시도
+        (stale keep-alive일 수도 있지만 서버가 요청을 받은 뒤 끊겼을 수도 있어, 멱등이 아닌 POST
+         — Replicate prediction 생성, Ollama generate, 작업 webhook — 는 중복 실행될 수 있음)
+    429 / 502 / 503 / 504 응답 → GET·HEAD·OPTIONS만 재시도
+  스트리밍은 응답을 받기 전(연결 단계) 실패만 재시도.
+- AsyncClient는 이벤트 루프에 묶이므로 루프별로 하나씩 생성.
+
+환경변수:
+    HTTP_TIMEOUT=30
+    HTTP_CONNECT_TIMEOUT=5
+    HTTP_HOST_TIMEOUTS=localhost:11434=120,api.replicate.com=60   호스트[:포트]=초
+    HTTP_MAX_CONNECTIONS=100
+    HTTP_MAX_KEEPALIVE=20
+    HTTP_KEEPALIVE_EXPIRY=30
+    HTTP_HTTP2=true
+    HTTP_RETRIES=2
+    HTTP_RETRY_BACKOFF=0.2
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.2"))
+
+# 응답 상태로 재시도하는 경우 (멱등 메서드만)
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# 요청이 서버에 도달하지 않은 실패 (어떤 메서드든 재시도해도 안전)
+_CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+# 재시도 후보 전송 오류 (RemoteProtocolError는 멱등 메서드만, _should_retry_error)
+_RETRY_ERRORS = (*_CONNECT_ERRORS, httpx.RemoteProtocolError)
+
+
+def _parse_host_timeouts(raw: str) -> Dict[str, float]:
+    timeouts: Dict[str, float] = {}
+    for item in raw.split(","):
+        host, _, seconds = item.strip().rpartition("=")
+        if host and seconds:
+            timeouts[host.lower()] = float(seconds)
+    return timeouts
+
+
+HOST_TIMEOUTS = _parse_host_timeouts(os.getenv("HTTP_HOST_TIMEOUTS", ""))
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("HTTP_HTTP2", "true").lower() != "true":
+        return False
+    try:
+        import h2  # noqa: F401  (httpx[http2] 선택 의존성)
+        return True
+    except ImportError:
+        return False
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+
+
+def _timeout_for(url: str, timeout: Optional[float]) -> httpx.Timeout:
+    """호출자 지정 → 호스트별 → 기본 순으로 타임아웃 결정"""
+    if timeout is None:
+        parts = urlsplit(url)
+        host = (parts.hostname or "").lower()
+        netloc = f"{host}:{parts.port}" if parts.port else host
+        timeout = HOST_TIMEOUTS.get(netloc, HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT))
+    return httpx.Timeout(timeout, connect=min(CONNECT_TIMEOUT, timeout))
+
+
+def _backoff(attempt: int) -> float:
+    """full jitter: [0, RETRY_BACKOFF * 2^attempt)"""
+    return random.uniform(0, RETRY_BACKOFF * (2 ** attempt))
+
+
+def _should_retry_error(method: str, error: Exception, attempt: int, retries: int) -> bool:
+    return attempt < retries and (
+        isinstance(error, _CONNECT_ERRORS) or method.upper() in _IDEMPOTENT_METHODS
+    )
+
+
+def _should_retry_status(method: str, response: httpx.Response, attempt: int, retries: int) -> bool:
+    return (
+        attempt < retries
+        and response.status_code in _RETRY_STATUSES
+        and method.upper() in _IDEMPOTENT_METHODS
+    )
+
+
+class _Stats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict:
+        return {"requests": self.requests, "retries": self.retries, "errors": self.errors}
+
+
+_stats = _Stats()
+
+
+# ──────────────────────────────────────────
+# 클라이언트 싱글턴
+# ──────────────────────────────────────────
+
+_sync_client: Optional[httpx.Client] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """프로세스 공유 동기 클라이언트 (스레드 안전)"""
+    global _sync_client
+    if _sync_client is None:
+        with _client_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(
+                    http2=_http2_enabled(), limits=_limits(), timeout=DEFAULT_TIMEOUT, follow_redirects=True,
+                )
+                logger.info(f"[http] shared client ready (http2={_http2_enabled()})")
+    return _sync_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프의 공유 async 클라이언트"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=_http2_enabled(), limits=_limits(), timeout=DEFAULT_TIMEOUT, follow_redirects=True,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+# ──────────────────────────────────────────
+# 요청 헬퍼 (타임아웃 + 재시도)
+# ──────────────────────────────────────────
+
+def http_request(
+    method: str, url: str, *, timeout: Optional[float] = None, retries: int = RETRIES, **kwargs
+) -> httpx.Response:
+    """공유 동기 클라이언트로 요청. 상태 코드 검사는 호출자가 (raise_for_status)."""
+    client = get_http_client()
+    for attempt in range(retries + 1):
+        _stats.requests += 1
+        try:
+            response = client.request(method, url, timeout=_timeout_for(url, timeout), **kwargs)
+        except _RETRY_ERRORS as e:
+            if not _should_retry_error(method, e, attempt, retries):
+                _stats.errors += 1
+                raise
+            logger.debug(f"[http] {method} {url} failed ({type(e).__name__}), retrying")
+        else:
+            if not _should_retry_status(method, response, attempt, retries):
+                return response
+            response.close()
+        _stats.retries += 1
+        time.sleep(_backoff(attempt))
+    raise AssertionError("unreachable")
+
+
+async def ahttp_request(
+    method: str, url: str, *, timeout: Optional[float] = None, retries: int = RETRIES, **kwargs
+) -> httpx.Response:
+    """공유 async 클라이언트로 요청. 상태 코드 검사는 호출자가 (raise_for_status)."""
+    client = get_async_http_client()
+    for attempt in range(retries + 1):
+        _stats.requests += 1
+        try:
+            response = await client.request(method, url, timeout=_timeout_for(url, timeout), **kwargs)
+        except _RETRY_ERRORS as e:
+            if not _should_retry_error(method, e, attempt, retries):
+                _stats.errors += 1
+                raise
+            logger.debug(f"[http] {method} {url} failed ({type(e).__name__}), retrying")
+        else:
+            if not _should_retry_status(method, response, attempt, retries):
+                return response
+            await response.aclose()
+        _stats.retries += 1
+        await asyncio.sleep(_backoff(attempt))
+    raise AssertionError("unreachable")
+
+
+@asynccontextmanager
+async def ahttp_stream(
+    method: str, url: str, *, timeout: Optional[float] = None, retries: int = RETRIES, **kwargs
+) -> AsyncIterator[httpx.Response]:
+    """공유 async 클라이언트로 스트리밍 요청. 응답 헤더를 받기 전 연결 실패만 재시도."""
+    client = get_async_http_client()
+    for attempt in range(retries + 1):
+        _stats.requests += 1
+        request = client.build_request(method, url, timeout=_timeout_for(url, timeout), **kwargs)
+        try:
+            response = await client.send(request, stream=True)
+            break
+        except _RETRY_ERRORS as e:
+            if not _should_retry_error(method, e, attempt, retries):
+                _stats.errors += 1
+                raise
+            logger.debug(f"[http] stream {method} {url} failed ({type(e).__name__}), retrying")
+        _stats.retries += 1
+        await asyncio.sleep(_backoff(attempt))
+    try:
+        yield response
+    finally:
+        await response.aclose()
+
+
+def http_stats() -> dict:
+    """요청 / 재시도 / 최종 실패 수 (/health)"""
+    return {**_stats.as_dict(), "http2": _http2_enabled()}
+
+
+async def aclose_http_clients() -> None:
+    """공유 클라이언트 종료 (앱 shutdown)"""
+    global _sync_client
+    for client in list(_async_clients.values()):
+        await client.aclose()
+    _async_clients.clear()
+    with _client_lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
@@ -0,0 +1,79 @@
+"""
+동시 중복 요청 합치기 (single-flight)
+
+같은 키의 작업이 진행 중이면 새로 시작하지 않고 진행 중인 작업의 결과를 함께 기다린다.
+
+    flight = SingleFlight("feed_generation")
+    result = await flight.run(key, lambda: expensive(...))
+
+- 작업은 호출자와 분리된 태스크로 실행: 먼저 온 호출자가 취소(클라이언트 연결 끊김 등)돼도
+  기다리는 다른 호출자를 위해 끝까지 실행된다.
+- 작업이 끝나면 키를 즉시 제거 (결과 보관은 하지 않음 — 짧은 재사용은 TieredCache 등으로 별도 처리).
+- 예외도 기다리던 모든 호출자에게 그대로 전달.
+- token을 주면 진행 중인 작업과 token이 같은 호출자만 합류하고, 다르면 SingleFlightConflict
+  (예: Idempotency-Key는 같은데 요청 본문이 다른 경우).
+- 이벤트 루프 하나(프로세스 하나) 범위. 여러 워커 간 중복은 Idempotency-Key 결과 저장소가 담당.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightConflict(Exception):
+    """같은 키의 진행 중 작업이 다른 token으로 시작됨"""
+
+
+class SingleFlight:
+    """키별 진행 중 작업을 공유하는 async single-flight"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._tokens: Dict[Hashable, Optional[Hashable]] = {}
+        self.started = 0
+        self.coalesced = 0
+        _registry[name] = self
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]], token: Optional[Hashable] = None) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._tokens[key] = token
+            task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+            self.started += 1
+        else:
+            if self._tokens.get(key) != token:
+                raise SingleFlightConflict(f"in-flight '{key}' was started with a different token")
+            self.coalesced += 1
+            logger.info(f"[singleflight:{self.name}] joined in-flight request")
+        # shield: 이 호출자가 취소돼도 공유 태스크는 계속 실행
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._tokens.pop(key, None)
+        # 기다리는 호출자가 모두 취소된 뒤 실패하면 "exception never retrieved" 경고가 나므로 여기서 소비
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        total = self.started + self.coalesced
+        return {
+            "inflight": len(self._inflight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / total, 3) if total else 0.0,
+        }
+
+
+# 이름별 레지스트리 (/health 통계 노출용)
+_registry: Dict[str, SingleFlight] = {}
+
+
+def singleflight_stats() -> dict:
+    """등록된 모든 single-flight의 통계"""
+    return {name: flight.stats() for name, flight in _registry.items()}
@@ -0,0 +1,210 @@
+"""
+스테이지별 동시 실행 제한 + 대기열 지표 (backpressure)
+
+LLM / DB / 이미지 / 영상 작업이 asyncio 기본 executor와 무제한 동시 실행을 공유하면, 느린 미디어 호출이
+텍스트만 필요한 요청까지 밀어내고 과부하가 빠른 429 대신 끝없는 지연으로 나타난다.
+스테이지마다 동시 실행 수(workers)와 허용 대기열 길이(max_queue)를 따로 둔다.
+
+    async with get_stage("media").slot():        # async 작업: 동시 실행 수 제한
+        result = await provider.agenerate_image(...)
+
+    user = await get_stage("db").run(get_user, user_id)    # 블로킹 함수: 제한 + 전용 스레드 풀
+
+    run_in_pool(fn)  이미 slot을 잡은 호출자가 블로킹 함수를 스테이지 전용 스레드 풀에서 실행
+                     (slot을 다시 잡지 않음 → 중첩 대기로 인한 교착 없음)
+
+대기열 길이 제한은 입구(API 요청 수락 시점)에서 적용한다: overloaded()면 요청을 429로 거절하거나
+media_type을 낮춰 받는다 (src/api/main.py _admit). 이미 수락된 작업은 slot을 기다린다.
+
+스테이지 (기본 workers / max_queue):
+    llm     16 / 64
+    db      POSTGRES_POOL_MAX / 100   (연결 수보다 많은 스레드는 풀 대기만 하므로 맞춤)
+    media    4 / 16                   이미지 생성 + 결과 저장/다운로드
+    video    4 / 8                    영상 생성 (Veo 폴링은 수 분간 slot 점유)
+    checkpoint 1 / 100                sqlite 체크포인트 저장소 I/O (연결 하나를 lock으로 공유하므로 1)
+    cache    8 / 200                  TieredCache.aget/aset의 Redis 왕복 (LRU 히트는 스테이지를 거치지 않음)
+
+환경변수:
+    STAGE_<NAME>_WORKERS, STAGE_<NAME>_QUEUE   예) STAGE_MEDIA_WORKERS=2, STAGE_MEDIA_QUEUE=8
+"""
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 대기 시간 통계에 쓰는 최근 샘플 수
+_WAIT_SAMPLES = 1000
+
+
+def _default_db_workers() -> int:
+    return int(os.getenv("POSTGRES_POOL_MAX", os.getenv("POSTGRES_MAX_CONNECTIONS", "20")))
+
+
+# 이름 → (기본 workers, 기본 max_queue)
+_DEFAULTS: Dict[str, tuple] = {
+    "llm": (lambda: 16, 64),
+    "db": (_default_db_workers, 100),
+    "media": (lambda: 4, 16),
+    "video": (lambda: 4, 8),
+    "checkpoint": (lambda: 1, 100),
+    "cache": (lambda: 8, 200),
+}
+
+
+class StageOverloaded(Exception):
+    """스테이지 대기열이 가득 차 요청을 받을 수 없음"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"stage '{stage}' is overloaded")
+        self.stage = stage
+
+
+class Stage:
+    """동시 실행 수 제한 + 전용 스레드 풀 + 대기열 지표"""
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # asyncio.Semaphore는 이벤트 루프에 묶이므로 루프별로 생성 (동기 run()이 별도 루프를 돌리는 경우 대비)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._waits: deque = deque(maxlen=_WAIT_SAMPLES)
+        self.active = 0
+        self.queued = 0
+        self.acquired = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """동시 실행 수 안에서 실행 (자리가 없으면 대기)"""
+        semaphore = self._semaphore()
+        start = time.monotonic()
+        self.queued += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self._waits.append(time.monotonic() - start)
+        self.acquired += 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            semaphore.release()
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """블로킹 함수를 slot 안에서 스테이지 전용 스레드 풀로 실행"""
+        async with self.slot():
+            return await self.run_in_pool(fn, *args, **kwargs)
+
+    async def run_in_pool(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """블로킹 함수를 스테이지 전용 스레드 풀에서 실행 (slot 없이, 이미 slot을 잡은 호출자용)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+
+    def overloaded(self) -> bool:
+        """대기열이 max_queue 이상이면 True (입구에서 새 요청 거절/저하 판단)"""
+        return self.queued >= self.max_queue
+
+    def reject(self) -> None:
+        """입구에서 거절/저하한 요청 수 기록"""
+        self.rejected += 1
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0,
+            "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.workers)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix=f"stage-{self.name}"
+                    )
+        return self._executor
+
+
+# ──────────────────────────────────────────
+# 레지스트리
+# ──────────────────────────────────────────
+
+_stages: Dict[str, Stage] = {}
+_stages_lock = threading.Lock()
+
+
+def get_stage(name: str) -> Stage:
+    """이름별 싱글턴 스테이지 (처음 요청 시 STAGE_<NAME>_WORKERS / _QUEUE로 생성)"""
+    stage = _stages.get(name)
+    if stage is not None:
+        return stage
+    with _stages_lock:
+        if name not in _stages:
+            default_workers, default_queue = _DEFAULTS.get(name, (lambda: 4, 16))
+            key = name.upper()
+            _stages[name] = Stage(
+                name,
+                workers=int(os.getenv(f"STAGE_{key}_WORKERS", str(default_workers()))),
+                max_queue=int(os.getenv(f"STAGE_{key}_QUEUE", str(default_queue))),
+            )
+            logger.info(
+                f"[stages] {name}: workers={_stages[name].workers}, max_queue={_stages[name].max_queue}"
+            )
+        return _stages[name]
+
+
+def ensure_capacity(*names: str) -> None:
+    """대기열이 가득 찬 스테이지가 있으면 거절 기록 후 StageOverloaded"""
+    for name in names:
+        stage = get_stage(name)
+        if stage.overloaded():
+            stage.reject()
+            raise StageOverloaded(name)
+
+
+def stage_stats() -> dict:
+    """생성된 모든 스테이지의 동시 실행 / 대기열 / 대기 시간 지표 (/health)"""
+    return {name: stage.stats() for name, stage in _stages.items()}
+
+
+def shutdown_stages() -> None:
+    """모든 스테이지의 스레드 풀 종료 (앱 shutdown)"""
+    for stage in list(_stages.values()):
+        stage.shutdown()
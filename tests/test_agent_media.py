@@ -0,0 +1,106 @@
+"""FeedAgent: media_generator에 도달하지 못한 선행 미디어 태스크 취소"""
+import asyncio
+import json
+from contextlib import aclosing
+
+import pytest
+
+from src.core.ai_agent import agent as agent_module
+from src.core.ai_agent.providers.base import ModelProvider
+
+CREATIVE_HEAD = '{"image_prompt": "sunny cafe", "negative_prompt": "blurry", "text_content": "'
+
+
+class FakeProvider(ModelProvider):
+    """creative_generator 응답은 image_prompt까지 보낸 뒤 fail이면 실패"""
+
+    def __init__(self, fail: bool):
+        self.fail = fail
+
+    def generate(self, prompt, system=None, schema=None):
+        raise NotImplementedError
+
+    async def agenerate_stream(self, prompt, system=None, schema=None):
+        if "image_prompt" not in prompt:
+            yield json.dumps({"intent": "x"})
+            return
+        yield CREATIVE_HEAD
+        await asyncio.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("llm died")
+        yield 'hi"}'
+
+    @property
+    def name(self):
+        return "fake"
+
+
+class FakeMedia:
+    name = "fake-media"
+    supports_video = False
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+
+    async def agenerate_image(self, prompt, negative_prompt):
+        self.started += 1
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    async def get_user(user_id):
+        return {"interests": ["cafe"], "recent_activities": [], "long_term_vector": None}
+
+    async def retrieve(*args, **kwargs):
+        ad = {"ad_id": "ad_1", "brand": "b", "product": "p", "description": "d", "relevance_score": 1}
+        return {"ads": [ad], "products": [], "contents": []}
+
+    monkeypatch.setattr(agent_module, "EARLY_MEDIA", True)
+    monkeypatch.setattr(agent_module, "COALESCE", False)
+    monkeypatch.setattr(agent_module, "aget_user", get_user)
+    monkeypatch.setattr(agent_module, "aretrieve_all_candidates", retrieve)
+
+    def make(provider, media):
+        monkeypatch.setattr(agent_module, "get_provider", lambda: provider)
+        monkeypatch.setattr(agent_module, "get_media_provider", lambda: media)
+        return agent_module.FeedAgent()
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_stream_closed_on_error_cancels_media(make_agent):
+    media = FakeMedia()
+    agent = make_agent(FakeProvider(fail=True), media)
+
+    async with aclosing(agent.astream("u", "p", "image")) as stream:
+        async for node, state in stream:
+            if state.get("error"):
+                break
+    await asyncio.sleep(0)
+
+    assert node == "creative_generator"
+    assert media.started == 1
+    assert media.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_run_cancels_media(make_agent):
+    media = FakeMedia()
+    agent = make_agent(FakeProvider(fail=False), media)
+
+    run = asyncio.create_task(agent.arun("u", "p", "image"))
+    while media.started == 0:
+        await asyncio.sleep(0.01)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    await asyncio.sleep(0)
+
+    assert media.cancelled == 1
@@ -0,0 +1,68 @@
+"""TieredCache.aget/aset: LRU는 이벤트 루프에서, Redis 왕복은 cache 스테이지 스레드에서"""
+import threading
+
+import pytest
+
+from src.core import cache as cache_module
+from src.core.cache import TieredCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.threads.append(threading.get_ident())
+        self.data[key] = value
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setenv("REDIS_HOST", "redis")
+    monkeypatch.setattr(cache_module, "get_redis", lambda: client)
+    return client
+
+
+def _make_cache(name):
+    return TieredCache(name, maxsize=8, ttl=60, serialize=str.encode, deserialize=bytes.decode)
+
+
+@pytest.mark.asyncio
+async def test_redis_round_trips_leave_the_event_loop(redis):
+    cache = _make_cache("test_async_redis")
+    loop_thread = threading.get_ident()
+
+    await cache.aset("k", "v")
+    cache.local.clear()
+    assert await cache.aget("k") == "v"
+    assert await cache.aget("missing") is None
+
+    assert len(redis.threads) == 3
+    assert loop_thread not in redis.threads
+    assert cache.redis_hits == 1 and cache.redis_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_local_hit_skips_redis(redis):
+    cache = _make_cache("test_async_local")
+    cache.local.set("k", "v")
+
+    assert await cache.aget("k") == "v"
+    assert redis.threads == []
+
+
+@pytest.mark.asyncio
+async def test_without_redis_host_stays_local(redis, monkeypatch):
+    monkeypatch.delenv("REDIS_HOST")
+    cache = _make_cache("test_async_no_redis")
+
+    await cache.aset("k", "v")
+    assert await cache.aget("k") == "v"
+    assert await cache.aget("missing") is None
+    assert redis.threads == []
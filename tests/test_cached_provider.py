@@ -0,0 +1,99 @@
+"""CachedProvider: 완료된 응답만 캐시"""
+import asyncio
+
+import pytest
+
+from src.core.ai_agent.providers.base import ModelProvider
+from src.core.ai_agent.providers import cached as cached_module
+from src.core.ai_agent.providers.cached import CachedProvider, with_response_cache
+from src.core.ai_agent.providers.staged import StagedProvider
+
+DOC = '{"intent": "x"} 설명 문장이 이어짐'
+
+
+class FakeProvider(ModelProvider):
+    temperature = 0.0
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def generate(self, prompt, system=None, schema=None):
+        raise NotImplementedError
+
+    async def agenerate_stream(self, prompt, system=None, schema=None):
+        self.calls += 1
+        for i in range(0, len(DOC), 4):
+            await asyncio.sleep(self.delay)
+            yield DOC[i:i + 4]
+
+    @property
+    def name(self):
+        return "fake"
+
+
+@pytest.mark.asyncio
+async def test_early_stop_result_is_cached():
+    inner = FakeProvider()
+    provider = CachedProvider(inner, "test_early_stop")
+    provider.cache.clear()
+
+    first = await provider.agenerate_json("p")
+    assert first == '{"intent": "x"}'
+    second = await provider.agenerate_json("p")
+    assert second == first
+    assert inner.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_does_not_cache_partial_response():
+    inner = FakeProvider(delay=0.02)
+    provider = CachedProvider(inner, "test_timeout")
+    provider.cache.clear()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(provider.agenerate_json("p"), 0.07)
+    assert await provider.agenerate_json("p") == '{"intent": "x"}'
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_closed_early_is_not_cached():
+    inner = FakeProvider()
+    provider = CachedProvider(inner, "test_close")
+    provider.cache.clear()
+
+    stream = provider.agenerate_stream("p")
+    await stream.__anext__()
+    await stream.aclose()
+    assert "".join([chunk async for chunk in provider.agenerate_stream("p")]) == DOC
+    assert inner.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_nodes_run_at_node_temperature(monkeypatch):
+    monkeypatch.setattr(cached_module, "CACHE_NODES", frozenset({"test_node_temperature"}))
+    monkeypatch.setattr(cached_module, "NODE_TEMPERATURE", 0.0)
+    inner = FakeProvider()
+    inner.temperature = 0.7
+    shared = StagedProvider(inner)
+
+    provider = with_response_cache(shared, "test_node_temperature")
+    provider.cache.clear()
+
+    assert provider.cacheable and provider.temperature == 0.0
+    assert shared.temperature == 0.7   # 다른 노드는 프로바이더 temperature 그대로
+    await provider.agenerate_json("p")
+    await provider.agenerate_json("p")
+    assert provider.inner.inner.calls == 1   # temperature만 바꾼 사본으로 호출
+    assert with_response_cache(shared, "creative_generator") is shared
+
+
+def test_empty_node_temperature_keeps_provider_temperature(monkeypatch):
+    monkeypatch.setattr(cached_module, "CACHE_NODES", frozenset({"test_bypass"}))
+    monkeypatch.setattr(cached_module, "NODE_TEMPERATURE", None)
+    inner = FakeProvider()
+    inner.temperature = 0.7
+
+    provider = with_response_cache(inner, "test_bypass")
+    assert provider.temperature == 0.7 and not provider.cacheable
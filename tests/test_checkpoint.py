@@ -0,0 +1,108 @@
+"""FeedAgent 체크포인트: 저하/실패한 실행 뒤 같은 generation_id로 재시도"""
+import asyncio
+import json
+
+import pytest
+
+from src.core.ai_agent import agent as agent_module
+from src.core.ai_agent import budget
+from src.core.ai_agent.checkpoint import SqliteCheckpointStore
+from src.core.ai_agent.providers.base import ModelProvider
+
+
+class FakeProvider(ModelProvider):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, system=None, schema=None):
+        raise NotImplementedError
+
+    async def agenerate_stream(self, prompt, system=None, schema=None):
+        self.calls += 1
+        if "image_prompt" in prompt:
+            yield json.dumps({"image_prompt": "sunny cafe", "negative_prompt": "blurry", "text_content": "hi"})
+        else:
+            yield json.dumps({"intent": "x"})
+
+    @property
+    def name(self):
+        return "fake"
+
+
+class FakeResult:
+    data = "QUJD"
+
+    def to_dict(self):
+        return {"data": self.data, "mime_type": "video/mp4"}
+
+
+class FakeMedia:
+    """영상 지원. fail_image면 이미지 생성 실패."""
+    name = "fake-media"
+    supports_video = True
+
+    def __init__(self):
+        self.fail_image = True
+        self.videos = 0
+
+    async def agenerate_image(self, prompt, negative_prompt, **kwargs):
+        if self.fail_image:
+            raise RuntimeError("imagen down")
+        return FakeResult()
+
+    async def agenerate_video(self, prompt, negative_prompt):
+        self.videos += 1
+        return FakeResult()
+
+
+@pytest.fixture
+def agent(monkeypatch, tmp_path):
+    async def get_user(user_id):
+        return {"interests": ["cafe"], "recent_activities": [], "long_term_vector": None}
+
+    async def retrieve(*args, **kwargs):
+        ad = {"ad_id": "ad_1", "brand": "b", "product": "p", "description": "d", "relevance_score": 1}
+        return {"ads": [ad], "products": [], "contents": []}
+
+    provider, media = FakeProvider(), FakeMedia()
+    monkeypatch.setattr(agent_module, "COALESCE", False)
+    monkeypatch.setattr(agent_module, "EARLY_MEDIA", False)
+    monkeypatch.setattr(agent_module, "aget_user", get_user)
+    monkeypatch.setattr(agent_module, "aretrieve_all_candidates", retrieve)
+    monkeypatch.setattr(agent_module, "get_provider", lambda: provider)
+    monkeypatch.setattr(agent_module, "get_media_provider", lambda: media)
+    monkeypatch.setattr(agent_module, "get_checkpoint_store", lambda: store)
+    store = SqliteCheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    return agent_module.FeedAgent(), provider, media, store
+
+
+@pytest.mark.asyncio
+async def test_retry_after_degraded_run_resumes_with_requested_media_type(agent, monkeypatch):
+    feed_agent, provider, media, store = agent
+
+    # 예산 부족으로 video → image 저하, 이미지 생성 실패 → 실행 끝에 한 번 저장
+    monkeypatch.setattr(budget, "MIN_VIDEO_SECONDS", 1000.0)
+    first = await feed_agent.arun("u", "p", "video", latency_budget=60, generation_id="g1", resume=False)
+    assert first["media_type"] == "image"
+    assert first["degradations"] == ["media:video_to_image"]
+    assert first["error"]
+
+    payload = await store.aload("g1")
+    assert payload["media_type"] == "video"
+    assert "degradations" not in payload["state"]
+    assert "media_metadata" not in payload["state"]
+
+    # 같은 요청으로 재시도 → LLM 스테이지는 복원, 요청한 영상으로 media_generator만 실행
+    monkeypatch.setattr(budget, "MIN_VIDEO_SECONDS", 120.0)
+    media.fail_image = False
+    calls_before = provider.calls
+    retry = await feed_agent.arun("u", "p", "video", latency_budget=0, generation_id="g1")
+    await asyncio.sleep(0)
+
+    assert provider.calls == calls_before
+    assert media.videos == 1
+    assert retry["media_type"] == "video"
+    assert retry["degradations"] == []
+    assert retry["error"] is None
+    assert retry["media_data"] == "QUJD"
+    assert await store.aload("g1") is None
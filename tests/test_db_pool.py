@@ -0,0 +1,93 @@
+"""ConnectionPool: 포화 시 타임아웃, 끊긴 연결 폐기"""
+import threading
+import time
+
+import psycopg2.extensions
+import pytest
+
+from src.core import db
+from src.core.db import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    created = []
+
+    def connect():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(db, "_connect", connect)
+    return created
+
+
+def test_saturated_pool_times_out(connections):
+    pool = ConnectionPool(minconn=0, maxconn=1, timeout=0.05)
+    conn = pool.acquire()
+
+    started = time.monotonic()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert time.monotonic() - started >= 0.05
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["in_use"] == 1 and stats["saturation"] == 1.0
+    pool.release(conn)
+
+
+def test_waiter_gets_released_connection(connections):
+    pool = ConnectionPool(minconn=0, maxconn=1, timeout=1.0)
+    conn = pool.acquire()
+    threading.Timer(0.02, pool.release, args=(conn,)).start()
+
+    assert pool.acquire() is conn
+    assert len(connections) == 1
+
+
+def test_discarded_connection_frees_its_slot(connections):
+    pool = ConnectionPool(minconn=0, maxconn=1, timeout=0.05)
+    first = pool.acquire()
+    pool.release(first, discard=True)
+
+    assert first.closed
+    second = pool.acquire()
+    assert second is not first
+    stats = pool.stats()
+    assert stats["discarded"] == 1 and stats["size"] == 1
+
+
+def test_closed_idle_connection_is_replaced_on_checkout(connections):
+    pool = ConnectionPool(minconn=1, maxconn=1, timeout=0.05)
+    connections[0].closed = 1
+
+    conn = pool.acquire()
+    assert conn is connections[1]
+    assert pool.stats()["discarded"] == 1
+
+
+def test_open_transaction_is_rolled_back_on_release(connections):
+    pool = ConnectionPool(minconn=0, maxconn=1)
+    conn = pool.acquire()
+    conn.status = psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    pool.release(conn)
+
+    assert conn.rollbacks == 1
+    assert pool.acquire() is conn
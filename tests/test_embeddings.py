@@ -0,0 +1,65 @@
+"""EmbeddingService 마이크로 배칭 / 취소 처리"""
+import asyncio
+import threading
+
+import pytest
+
+from src.core.ai_agent.embeddings import EmbeddingService, LocalHashEmbeddingBackend
+
+
+class SlowBackend(LocalHashEmbeddingBackend):
+    """release가 set될 때까지 배치 호출을 붙잡는 백엔드"""
+
+    def __init__(self):
+        super().__init__(dim=8)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = []
+
+    def embed_batch(self, texts, task_type="RETRIEVAL_QUERY"):
+        self.calls.append(list(texts))
+        self.started.set()
+        self.release.wait(5)
+        return super().embed_batch(texts, task_type)
+
+
+def test_concurrent_requests_share_one_batch():
+    backend = LocalHashEmbeddingBackend(dim=8)
+    service = EmbeddingService(backend, batch_window_ms=50)
+    futures = [service.submit(text) for text in ("a", "b", "a")]
+    vectors = [f.result(timeout=2) for f in futures]
+    assert (vectors[0] == vectors[2]).all()
+    assert service.stats()["batches"] == 1
+    assert service.stats()["backend_inputs"] == 2
+
+
+@pytest.mark.asyncio
+async def test_timeout_while_batch_in_flight_keeps_worker_alive():
+    backend = SlowBackend()
+    service = EmbeddingService(backend, batch_window_ms=1, timeout=0.05)
+
+    future = service.submit("slow")
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(asyncio.wrap_future(future), service.timeout)
+    assert backend.started.is_set()
+    backend.release.set()
+
+    vector = await asyncio.wait_for(asyncio.wrap_future(service.submit("next")), 2)
+    assert vector.shape == (8,)
+    assert service._worker.is_alive()
+
+
+def test_cancelled_before_dispatch_is_skipped():
+    backend = SlowBackend()
+    service = EmbeddingService(backend, batch_window_ms=1)
+
+    first = service.submit("first")
+    assert backend.started.wait(2)
+    queued = service.submit("cancelled")   # 앞 배치가 진행 중이라 아직 대기열에 있음
+    assert queued.cancel()
+    backend.release.set()
+
+    assert first.result(timeout=2).shape == (8,)
+    assert service.submit("after").result(timeout=2).shape == (8,)
+    assert all("cancelled" not in texts for texts in backend.calls)
+    assert service._worker.is_alive()
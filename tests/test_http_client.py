@@ -0,0 +1,43 @@
+"""http_client 재시도: 응답 도중 끊긴 연결은 멱등 메서드만 재시도"""
+import httpx
+import pytest
+
+from src.core import http_client
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """요청 수를 세고 정해진 오류를 던지는 MockTransport 클라이언트"""
+    state = {"calls": 0, "error": httpx.RemoteProtocolError("server disconnected")}
+
+    def handler(request):
+        state["calls"] += 1
+        raise state["error"]
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "get_async_http_client", lambda: client)
+    monkeypatch.setattr(http_client, "_backoff", lambda attempt: 0)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_dropped_connection_is_not_retried_for_post(transport):
+    with pytest.raises(httpx.RemoteProtocolError):
+        await http_client.ahttp_request("POST", "http://replicate.test/v1/predictions", retries=2)
+    assert transport["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dropped_connection_is_retried_for_get(transport):
+    with pytest.raises(httpx.RemoteProtocolError):
+        await http_client.ahttp_request("GET", "http://replicate.test/v1/predictions/1", retries=2)
+    assert transport["calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_connect_error_is_retried_for_post(transport):
+    transport["error"] = httpx.ConnectError("refused")
+    with pytest.raises(httpx.ConnectError):
+        async with http_client.ahttp_stream("POST", "http://ollama.test/api/generate", retries=2):
+            pass
+    assert transport["calls"] == 3
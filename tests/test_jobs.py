@@ -0,0 +1,65 @@
+"""JobManager: 대기/실행 중 작업 상한, webhook 대상 제한"""
+import asyncio
+
+import pytest
+
+from src.core.ai_agent import jobs
+from src.core.ai_agent.jobs import JobManager, JobQueueFull, SqliteJobStore, WebhookRejected, check_webhook_url
+
+
+@pytest.mark.asyncio
+async def test_submit_beyond_max_active_is_rejected(tmp_path):
+    release = asyncio.Event()
+
+    async def executor(job):
+        await release.wait()
+        return {"ok": True}
+
+    manager = JobManager(SqliteJobStore(str(tmp_path / "jobs.sqlite3")), executor, max_active=2)
+    first = await manager.submit("u", {"prompt": "a", "media_type": "video"})
+    await manager.submit("u", {"prompt": "b", "media_type": "video"})
+
+    with pytest.raises(JobQueueFull):
+        await manager.submit("u", {"prompt": "c", "media_type": "video"})
+    assert manager.stats()["active"] == 2 and manager.submitted == 2
+
+    release.set()
+    while manager.stats()["active"]:
+        await asyncio.sleep(0.01)
+    assert (await manager.get(first["job_id"]))["status"] == "succeeded"
+    await manager.submit("u", {"prompt": "c", "media_type": "video"})
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", [
+    "ftp://203.0.113.10/hook",
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.10/hook",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+])
+async def test_internal_webhook_targets_are_rejected(url):
+    with pytest.raises(WebhookRejected):
+        await check_webhook_url(url)
+
+
+@pytest.mark.asyncio
+async def test_public_webhook_target_is_accepted():
+    await check_webhook_url("https://8.8.8.8/hook")
+
+
+@pytest.mark.asyncio
+async def test_allow_list_restricts_hosts(monkeypatch):
+    monkeypatch.setattr(jobs, "WEBHOOK_ALLOWED_HOSTS", frozenset({"hooks.example.com"}))
+
+    await check_webhook_url("https://hooks.example.com/a")
+    await check_webhook_url("https://eu.hooks.example.com/a")
+    with pytest.raises(WebhookRejected):
+        await check_webhook_url("https://8.8.8.8/hook")
+    with pytest.raises(WebhookRejected):
+        await check_webhook_url("https://evilhooks.example.com/a")
@@ -0,0 +1,66 @@
+"""JsonObjectStream: 스트리밍 중 최상위 필드 증분 파싱"""
+import json
+
+from src.core.ai_agent.json_stream import JsonObjectStream, extract_object
+
+DOC = {
+    "image_prompt": 'sunny "cafe", {latte}',
+    "count": 3,
+    "nested": {"a": [1, 2, {"b": "}"}]},
+    "ok": True,
+    "text_content": "가나다 \\ 끝",
+}
+
+
+def _feed_all(parser: JsonObjectStream, text: str, size: int) -> list:
+    """size 글자씩 feed하고 chunk마다 새로 완성된 필드를 모은다"""
+    return [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+
+
+def test_fields_match_json_loads_for_any_chunking():
+    text = json.dumps(DOC, ensure_ascii=False)
+    for size in (1, 2, 7, len(text)):
+        parser = JsonObjectStream()
+        _feed_all(parser, text, size)
+        assert parser.done
+        assert parser.fields == DOC
+        assert parser.object_text == text
+
+
+def test_string_field_is_emitted_before_object_closes():
+    parser = JsonObjectStream()
+    assert parser.feed('{"image_prompt": "sunny ca') == {}
+    assert parser.feed('fe", "text_content": "long') == {"image_prompt": "sunny cafe"}
+    assert not parser.done
+    assert parser.object_text is None
+
+
+def test_non_string_values_complete_on_delimiter():
+    parser = JsonObjectStream()
+    assert parser.feed('{"n": 12') == {}
+    assert parser.feed('3, "nested": {"a": 1}') == {"n": 123}
+    assert parser.feed('}') == {"nested": {"a": 1}}
+    assert parser.done
+
+
+def test_fence_and_trailing_chatter_are_ignored():
+    parser = JsonObjectStream()
+    _feed_all(parser, '```json\n{"intent": "a}b"}\n``` 설명이 이어짐 {"x": 1}', 5)
+    assert parser.done
+    assert parser.fields == {"intent": "a}b"}
+    assert parser.object_text == '{"intent": "a}b"}'
+    assert parser.feed('더 들어온 텍스트') == {}
+
+
+def test_unparseable_value_is_skipped():
+    parser = JsonObjectStream()
+    parser.feed('{"bad": nope, "good": "yes"}')
+    assert parser.fields == {"good": "yes"}
+    assert parser.done
+
+
+def test_extract_object_strips_fence_and_keeps_unclosed_text():
+    text = json.dumps(DOC, ensure_ascii=False)
+    assert extract_object("```json\n" + text + "\n```") == text
+    assert extract_object("not json") == "not json"
+    assert extract_object('{"a": "b') == '{"a": "b'
@@ -0,0 +1,75 @@
+"""키워드 fallback 역색인: 스코어링 / 버전 확인"""
+import pytest
+
+from src.core.ai_agent import keyword_index
+from src.core.ai_agent.keyword_index import get_keyword_index, invalidate_keyword_index
+
+CAMPAIGNS = [
+    {"campaign_id": "c1", "brand_id": "b1", "campaign_data": {"category": "cafe", "bid": 1.0},
+     "targeting_rules": {"tags": ["coffee"]}},
+    {"campaign_id": "c2", "brand_id": "b2", "campaign_data": {"category": "travel", "bid": 2.0},
+     "targeting_rules": {"tags": ["trip", "beach"]}},
+]
+
+
+class FakeCursor:
+    """psycopg2 RealDictCursor 흉내. updated_at 컬럼이 없으면 그 컬럼 조회는 오류."""
+
+    def __init__(self, has_updated_at: bool):
+        self.has_updated_at = has_updated_at
+        self.queries = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        if "information_schema.columns" in sql:
+            self._result = [{"?column?": 1}] if self.has_updated_at else []
+        elif "max(updated_at)" in sql:
+            if not self.has_updated_at:
+                raise RuntimeError('column "updated_at" does not exist')
+            self._result = [{"n": len(CAMPAIGNS), "version": "2024-01-01"}]
+        elif "count(*)" in sql:
+            self._result = [{"n": len(CAMPAIGNS), "version": None}]
+        else:
+            self._result = CAMPAIGNS
+
+    def fetchone(self):
+        return self._result[0] if self._result else None
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture(autouse=True)
+def _clean_index():
+    invalidate_keyword_index()
+    yield
+    invalidate_keyword_index()
+
+
+def test_top_k_scores_tags_and_bid():
+    cur = FakeCursor(has_updated_at=True)
+    ranked = get_keyword_index(cur, "campaigns").top_k(["coffee"], "beach trip", 2)
+    assert [row["campaign_id"] for row, _ in ranked] == ["c2", "c1"]
+    assert ranked[0][1] == pytest.approx(0.3 * 2 + 0.2)
+    assert ranked[1][1] == pytest.approx(0.4 + 0.1)
+
+
+def test_missing_updated_at_uses_count_version():
+    cur = FakeCursor(has_updated_at=False)
+    index = get_keyword_index(cur, "campaigns")
+    assert len(index.rows) == 2
+    assert index.version == (2, None)
+    assert not any("max(updated_at)" in sql for sql in cur.queries)
+
+
+def test_index_is_reused_until_version_changes(monkeypatch):
+    monkeypatch.setattr(keyword_index, "CHECK_SECONDS", 0)
+    cur = FakeCursor(has_updated_at=True)
+    first = get_keyword_index(cur, "campaigns")
+    assert get_keyword_index(cur, "campaigns") is first
+    CAMPAIGNS.append({**CAMPAIGNS[0], "campaign_id": "c3"})
+    try:
+        assert len(get_keyword_index(cur, "campaigns").rows) == 3
+    finally:
+        CAMPAIGNS.pop()
@@ -0,0 +1,84 @@
+"""plan_stages / make_parallel_node: reads/writes 선언 기반 스테이지 계획"""
+import pytest
+
+from src.core.ai_agent.pipeline import NodeSpec, make_parallel_node, plan_stages, stage_name
+
+
+async def _noop(state):
+    return state
+
+
+def _spec(name, reads=(), writes=(), fn=_noop):
+    return NodeSpec(name, fn, reads, writes)
+
+
+def _names(stages):
+    return [stage_name(stage) for stage in stages]
+
+
+FEED_SPECS = [
+    _spec("load_context", ["user_id"], ["user_context", "user_vector"]),
+    _spec("state_interpreter", ["prompt", "user_context"], ["state_analysis"]),
+    _spec("retrieve_candidates", ["prompt", "user_vector"], ["ad_candidates"]),
+    _spec("strategy_planner", ["state_analysis", "ad_candidates"], ["strategy"]),
+    _spec("creative_generator", ["strategy"], ["generated_content", "image_prompt"]),
+]
+
+
+def test_independent_neighbours_share_a_stage():
+    assert _names(plan_stages(FEED_SPECS, parallel=True)) == [
+        "load_context",
+        "state_interpreter+retrieve_candidates",
+        "strategy_planner",
+        "creative_generator",
+    ]
+
+
+def test_parallel_disabled_is_a_serial_chain():
+    assert _names(plan_stages(FEED_SPECS, parallel=False)) == [spec.name for spec in FEED_SPECS]
+
+
+@pytest.mark.parametrize("reads, writes", [
+    (["a"], ["b"]),   # read-after-write
+    ([], ["a"]),      # write-after-write
+    ([], ["x"]),      # write-after-read
+])
+def test_hazards_split_stages(reads, writes):
+    first = _spec("first", ["x"], ["a"])
+    second = _spec("second", reads, writes)
+    assert _names(plan_stages([first, second], parallel=True)) == ["first", "second"]
+
+
+def test_shared_keys_do_not_create_dependencies():
+    first = _spec("first", [], ["a", "error", "degradations"])
+    second = _spec("second", [], ["b", "error", "degradations"])
+    assert _names(plan_stages([first, second], parallel=True)) == ["first+second"]
+
+
+def test_declaration_order_is_kept():
+    # c는 a에만 의존하지만 b보다 앞 스테이지로 당겨지지 않음
+    specs = [_spec("a", [], ["x"]), _spec("b", ["x"], ["y"]), _spec("c", [], ["z"])]
+    assert _names(plan_stages(specs, parallel=True)) == ["a", "b+c"]
+
+
+@pytest.mark.asyncio
+async def test_parallel_node_merges_declared_writes_only():
+    async def left(state):
+        state["a"] = 1
+        state["stray"] = "left"
+        state["degradations"] = [*state["degradations"], "left:fallback"]
+        return state
+
+    async def right(state):
+        state["b"] = 2
+        state["error"] = "right failed"
+        state["degradations"] = [*state["degradations"], "right:fallback"]
+        return state
+
+    node = make_parallel_node([_spec("left", [], ["a"], left), _spec("right", [], ["b"], right)])
+    merged = await node({"degradations": ["earlier"], "error": None})
+
+    assert merged["a"] == 1 and merged["b"] == 2
+    assert "stray" not in merged
+    assert merged["error"] == "right failed"
+    assert merged["degradations"] == ["earlier", "left:fallback", "right:fallback"]
@@ -0,0 +1,66 @@
+"""schemas: LLM 출력 검증 / 응답 스키마"""
+import json
+
+from src.core.ai_agent import schemas
+from src.core.ai_agent.schemas import Creative, FusedPlan, Strategy, coerce, parse_output
+
+STRATEGY = {
+    "selected_ad_id": "ad_1",
+    "selected_product": "p",
+    "selected_brand": "b",
+    "combination_method": "inline",
+    "rationale": "r",
+    "key_message": "k",
+    "visual_direction": "v",
+}
+
+
+def test_parse_output_strips_fence_and_chatter():
+    text = "```json\n" + json.dumps(STRATEGY) + "\n```\n이 광고를 고른 이유는..."
+    strategy = parse_output("test_fence", Strategy, text)
+    assert strategy is not None
+    assert strategy.model_dump() == STRATEGY
+    assert schemas.output_stats()["test_fence"] == {"parsed": 1, "failures": 0, "failure_rate": 0.0}
+
+
+def test_parse_output_ignores_braces_in_trailing_text():
+    text = json.dumps(STRATEGY) + "\n참고: {선택 이유는 위와 같음}"
+    assert parse_output("test_trailing", Strategy, text).model_dump() == STRATEGY
+
+
+def test_parse_output_failure_returns_none_and_is_counted():
+    assert parse_output("test_fail", Strategy, "not json") is None
+    assert parse_output("test_fail", Strategy, json.dumps({"selected_ad_id": "ad_1"})) is None
+    assert parse_output("test_fail", Strategy, json.dumps(STRATEGY)) is not None
+    assert schemas.output_stats()["test_fail"] == {"parsed": 1, "failures": 2, "failure_rate": 0.6667}
+
+
+def test_unknown_combination_method_defaults_to_subtle():
+    def method(value):
+        text = json.dumps({**STRATEGY, "combination_method": value})
+        return parse_output("test_method", Strategy, text).combination_method
+
+    assert method(" Inline ") == "inline"
+    assert method("banner") == "subtle"
+
+
+def test_creative_negative_prompt_is_optional():
+    creative = coerce(Creative, {"image_prompt": "i", "text_content": "t"})
+    assert creative is not None and creative.negative_prompt
+    assert coerce(Creative, {"image_prompt": "i"}) is None
+
+
+def test_response_schema_is_inlined_and_ordered(monkeypatch):
+    monkeypatch.setattr(schemas, "STRUCTURED_OUTPUT", True)
+    schema = schemas.response_schema(FusedPlan)
+
+    assert "$defs" not in schema and "$ref" not in json.dumps(schema)
+    assert list(schema["properties"]) == list(FusedPlan.model_fields)
+    assert list(schema["properties"]["strategy"]["properties"]) == list(Strategy.model_fields)
+    assert "property_ordering" not in json.dumps(schema)
+    assert schema["properties"]["strategy"]["properties"]["combination_method"]["enum"] == [
+        "story_blend", "inline", "subtle",
+    ]
+
+    monkeypatch.setattr(schemas, "STRUCTURED_OUTPUT", False)
+    assert schemas.response_schema(FusedPlan) is None
@@ -0,0 +1,96 @@
+"""SingleFlight: 동시 중복 요청 합치기"""
+import asyncio
+
+import pytest
+
+from src.core.singleflight import SingleFlight, SingleFlightConflict
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test_share")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.run("k", work) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert calls == 1
+    stats = flight.stats()
+    assert stats["started"] == 1 and stats["coalesced"] == 4 and stats["inflight"] == 0
+    assert stats["coalesce_rate"] == 0.8
+
+
+@pytest.mark.asyncio
+async def test_key_is_forgotten_after_completion():
+    flight = SingleFlight("test_forget")
+
+    async def work():
+        return object()
+
+    first = await flight.run("k", work)
+    second = await flight.run("k", work)
+    assert first is not second
+    assert flight.stats()["started"] == 2
+
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_waiter():
+    flight = SingleFlight("test_error")
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(flight.run("k", work), flight.run("k", work), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test_cancel")
+    finished = asyncio.Event()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        finished.set()
+        return "done"
+
+    leader = asyncio.create_task(flight.run("k", work))
+    follower = asyncio.create_task(flight.run("k", work))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
+    assert finished.is_set()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_join_with_different_token_conflicts():
+    flight = SingleFlight("test_token")
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "first"
+
+    leader = asyncio.create_task(flight.run("k", work, token="body-a"))
+    await asyncio.sleep(0)
+    with pytest.raises(SingleFlightConflict):
+        await flight.run("k", work, token="body-b")
+    assert await flight.run("k", work, token="body-a") == "first"
+    assert await leader == "first"
+    assert calls == 1
+
+    # 끝난 뒤에는 다른 token으로 새로 시작
+    assert await flight.run("k", work, token="body-b") == "first"
+    assert calls == 2
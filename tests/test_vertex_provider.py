@@ -0,0 +1,53 @@
+"""VertexProvider: response_schema의 property_ordering (SDK는 가짜 모듈로 대체)"""
+import sys
+import types
+
+import pytest
+
+from src.core.ai_agent.providers import vertex
+from src.core.ai_agent.schemas import FusedPlan, Strategy, _json_schema
+
+
+class FakeGenerationConfig:
+    """reject_ordering이면 property_ordering이 든 스키마를 구버전 SDK처럼 거부"""
+    reject_ordering = False
+
+    def __init__(self, **kwargs):
+        schema = kwargs.get("response_schema")
+        if self.reject_ordering and schema and "property_ordering" in str(schema):
+            raise ValueError("Unknown field for Schema: property_ordering")
+        self.kwargs = kwargs
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    generative_models = types.ModuleType("vertexai.generative_models")
+    generative_models.GenerationConfig = FakeGenerationConfig
+    monkeypatch.setitem(sys.modules, "vertexai", types.ModuleType("vertexai"))
+    monkeypatch.setitem(sys.modules, "vertexai.generative_models", generative_models)
+    monkeypatch.setattr(vertex, "_property_ordering", True)
+    monkeypatch.setattr(FakeGenerationConfig, "reject_ordering", False)
+    return vertex.VertexProvider()
+
+
+def test_schema_gets_property_ordering_in_field_order(provider):
+    schema = provider._generation_config(_json_schema(FusedPlan)).kwargs["response_schema"]
+
+    assert schema["property_ordering"] == list(FusedPlan.model_fields)
+    assert schema["properties"]["strategy"]["property_ordering"] == list(Strategy.model_fields)
+    assert "property_ordering" not in str(_json_schema(FusedPlan))
+
+
+def test_rejected_property_ordering_falls_back_once(provider):
+    FakeGenerationConfig.reject_ordering = True
+    schema = _json_schema(FusedPlan)
+
+    config = provider._generation_config(schema)
+    assert config.kwargs["response_schema"] == schema
+    assert config.kwargs["response_mime_type"] == "application/json"
+    assert vertex._property_ordering is False
+
+    # 이후 호출은 시도 없이 바로 키 없는 스키마
+    FakeGenerationConfig.reject_ordering = False
+    assert provider._generation_config(schema).kwargs["response_schema"] == schema
+    assert "response_schema" not in provider._generation_config().kwargs